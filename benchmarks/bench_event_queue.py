@@ -0,0 +1,117 @@
+"""Microbenchmark of the simulator's event queues.
+
+Replays a steady-state pattern of the simulation: job arrivals are pushed up
+front, then each popped executor event is followed by a push of that
+executor's next event. Reports push+pop throughput of the binary heap
+(`EventQueue`) and the tournament tree (`ExecutorEventQueue`), and the cost
+of dispatching typed events compared to the former dataclass-plus-dict events.
+
+usage: python benchmarks/bench_event_queue.py [--num-events N]
+"""
+
+import sys
+import os.path as osp
+import time
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+from dataclasses import dataclass
+
+import numpy as np
+
+sys.path.insert(0, osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from spark_sched_sim.components import Stage
+from spark_sched_sim.components.event import (
+    EventQueue,
+    ExecutorEventQueue,
+    JobArrival,
+    TaskFinished,
+)
+
+
+def make_tasks(num_executors):
+    """returns one task per executor, with the task's id equal to the executor's"""
+    stage = Stage(0, 0, num_executors, 0.0)
+    tasks = [stage.get_task(i) for i in range(num_executors)]
+    for task in tasks:
+        task.executor_id = task.id_
+    return tasks
+
+
+def run_queue(queue, num_executors, num_events, num_arrivals, seed=0):
+    rng = np.random.default_rng(seed)
+    durations = rng.exponential(1000.0, num_events + num_executors).tolist()
+    arrival_times = np.cumsum(rng.exponential(25e3, num_arrivals)).tolist()
+    tasks = make_tasks(num_executors)
+
+    t_start = time.perf_counter()
+
+    queue.reset()
+    for t in arrival_times:
+        queue.push(t, JobArrival(None))
+    for i, task in enumerate(tasks):
+        queue.push(durations[i], TaskFinished(None, task))
+
+    k = num_executors
+    for _ in range(num_events):
+        t, event = queue.pop()
+        if type(event) is TaskFinished:
+            queue.push(t + durations[k], event)
+            k += 1
+
+    return time.perf_counter() - t_start
+
+
+@dataclass
+class DictEvent:
+    type: int
+    data: dict
+
+
+def run_dispatch(num_events):
+    def handler(stage, task):
+        pass
+
+    handlers = {0: handler, TaskFinished: handler}
+    dict_events = [DictEvent(0, {"stage": None, "task": None})] * num_events
+    typed_events = [TaskFinished(None, None)] * num_events
+
+    t_start = time.perf_counter()
+    for event in dict_events:
+        handlers[event.type](**event.data)
+    t_dict = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    for event in typed_events:
+        handlers[type(event)](*event)
+    t_typed = time.perf_counter() - t_start
+
+    return t_dict, t_typed
+
+
+def main():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--num-events", type=int, default=200_000)
+    parser.add_argument("--num-arrivals", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'executors':>10} {'EventQueue':>14} {'ExecutorEventQueue':>20}")
+    for num_executors in [10, 50, 100, 500, 1000]:
+        rates = []
+        for queue in [EventQueue(), ExecutorEventQueue()]:
+            elapsed = run_queue(
+                queue, num_executors, args.num_events, args.num_arrivals
+            )
+            rates += [args.num_events / elapsed]
+        print(f"{num_executors:>10} {rates[0]:>10.0f} ev/s {rates[1]:>16.0f} ev/s")
+
+    t_dict, t_typed = run_dispatch(args.num_events)
+    print(
+        f"\ndispatch: dict events {1e9 * t_dict / args.num_events:.0f} ns/event, "
+        f"typed events {1e9 * t_typed / args.num_events:.0f} ns/event"
+    )
+
+
+if __name__ == "__main__":
+    main()
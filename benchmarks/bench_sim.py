@@ -0,0 +1,220 @@
+"""Benchmark suite of the simulator across cluster and workload sizes.
+
+Drives `SparkSchedSimEnv` headlessly with the `RandomScheduler` and
+`RoundRobinScheduler` heuristics over a sweep of the number of executors, the
+job arrival cap, the job arrival rate and the episode time limit. For every
+configuration, reports the reset latency, step latency percentiles, simulated
+events and decisions per second, and peak RSS. Each configuration runs in a
+fresh process, so that its peak RSS is its own.
+
+Results are written as JSON to `--out`. If a `--baseline` file from an earlier
+run is given, then every configuration is compared against it, and the script
+exits with status 1 if any metric regressed by more than `--tolerance`.
+
+Must be run from a directory that contains the TPC-H dataset under data/tpch.
+
+usage: python benchmarks/bench_sim.py [--num-executors 10 100 1000]
+    [--job-arrival-caps 50 200] [--job-arrival-rates 4e-5]
+    [--time-limits 0] [--num-episodes N] [--out FILE] [--baseline FILE]
+"""
+
+import sys
+import os.path as osp
+import itertools
+import json
+import platform
+import resource
+import time
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from spark_sched_sim import SparkSchedSimEnv
+from schedulers.heuristics import RandomScheduler, RoundRobinScheduler
+
+SCHEDULERS = ["RandomScheduler", "RoundRobinScheduler"]
+
+# metric -> whether larger is better, for comparisons against a baseline
+METRICS = {
+    "reset_ms": False,
+    "step_us_p50": False,
+    "step_us_p90": False,
+    "step_us_p99": False,
+    "events_per_sec": True,
+    "decisions_per_sec": True,
+    "peak_rss_mb": False,
+}
+
+
+def make_scheduler(scheduler_cls, num_executors):
+    if scheduler_cls == "RandomScheduler":
+        return RandomScheduler(seed=0)
+    return RoundRobinScheduler(num_executors)
+
+
+def run_config(cfg, num_episodes):
+    """runs `num_episodes` episodes of a configuration and returns its metrics"""
+    env_cfg = {
+        "num_executors": cfg["num_executors"],
+        "job_arrival_cap": cfg["job_arrival_cap"] or None,
+        "job_arrival_rate": cfg["job_arrival_rate"],
+        "moving_delay": 2000.0,
+        "warmup_delay": 1000.0,
+        "data_sampler_cls": "TPCHDataSampler",
+        "instrument": True,
+    }
+    options = {"time_limit": cfg["time_limit"]} if cfg["time_limit"] else None
+
+    env = SparkSchedSimEnv(env_cfg)
+    scheduler = make_scheduler(cfg["scheduler"], cfg["num_executors"])
+
+    reset_times = []
+    step_times = []
+    for seed in range(num_episodes):
+        t_start = time.perf_counter()
+        obs, _ = env.reset(seed=seed, options=options)
+        reset_times += [time.perf_counter() - t_start]
+
+        terminated = False
+        while not terminated:
+            action, _ = scheduler.schedule(obs)
+            t_start = time.perf_counter()
+            obs, _, terminated, *_ = env.step(action)
+            step_times += [time.perf_counter() - t_start]
+
+    rates = env.stats()["rates"]
+    step_us = 1e6 * np.percentile(step_times, [50, 90, 99])
+    return cfg | {
+        "num_steps": len(step_times),
+        "reset_ms": 1e3 * float(np.mean(reset_times)),
+        "step_us_p50": float(step_us[0]),
+        "step_us_p90": float(step_us[1]),
+        "step_us_p99": float(step_us[2]),
+        "events_per_sec": rates["events_per_sec"],
+        "decisions_per_sec": rates["decisions_per_sec"],
+        # `ru_maxrss` is in KB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def config_key(result):
+    return (
+        result["scheduler"],
+        result["num_executors"],
+        result["job_arrival_cap"],
+        result["job_arrival_rate"],
+        result["time_limit"],
+    )
+
+
+def compare(results, baseline, tolerance):
+    """prints the ratio of each metric to its baseline, and returns whether
+    any metric regressed by more than `tolerance`
+    """
+    baseline_results = {config_key(result): result for result in baseline["results"]}
+
+    regressed = False
+    print("\nratios to baseline (* marks a regression):")
+    for result in results:
+        base = baseline_results.get(config_key(result))
+        if base is None:
+            print(f"{config_key(result)}: not in baseline")
+            continue
+
+        cells = []
+        for metric, higher_is_better in METRICS.items():
+            ratio = result[metric] / base[metric] if base[metric] else 1.0
+            worse = ratio < 1 - tolerance if higher_is_better else ratio > 1 + tolerance
+            regressed |= worse
+            cells += [f"{metric}={ratio:.2f}{'*' if worse else ''}"]
+        print(f"{config_key(result)}: {' '.join(cells)}")
+
+    return regressed
+
+
+def main():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--num-executors", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--job-arrival-caps", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--job-arrival-rates", type=float, nargs="+", default=[4e-5])
+    parser.add_argument(
+        "--time-limits",
+        type=float,
+        nargs="+",
+        default=[0],
+        help="episode time limits in ms, where 0 means no limit",
+    )
+    parser.add_argument("--num-episodes", type=int, default=3)
+    parser.add_argument("--out", default="bench_sim.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    configs = [
+        {
+            "scheduler": scheduler,
+            "num_executors": num_executors,
+            "job_arrival_cap": job_arrival_cap,
+            "job_arrival_rate": job_arrival_rate,
+            "time_limit": time_limit,
+        }
+        for scheduler, num_executors, job_arrival_cap, job_arrival_rate, time_limit in (
+            itertools.product(
+                SCHEDULERS,
+                args.num_executors,
+                args.job_arrival_caps,
+                args.job_arrival_rates,
+                args.time_limits,
+            )
+        )
+    ]
+
+    results = []
+    print(
+        f"{'scheduler':>20} {'execs':>6} {'cap':>5} {'rate':>8} {'limit':>8} "
+        f"{'reset ms':>9} {'p50 us':>8} {'p99 us':>8} {'events/s':>9} {'rss MB':>7}"
+    )
+    for cfg in configs:
+        # a fresh process per configuration, for an accurate peak RSS
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(run_config, cfg, args.num_episodes).result()
+        results += [result]
+        print(
+            f"{result['scheduler']:>20} {result['num_executors']:>6} "
+            f"{result['job_arrival_cap']:>5} {result['job_arrival_rate']:>8.1e} "
+            f"{result['time_limit']:>8.1e} {result['reset_ms']:>9.1f} "
+            f"{result['step_us_p50']:>8.1f} {result['step_us_p99']:>8.1f} "
+            f"{result['events_per_sec']:>9.0f} {result['peak_rss_mb']:>7.1f}",
+            flush=True,
+        )
+
+    with open(args.out, "w") as fp:
+        json.dump(
+            {
+                "meta": {
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "machine": platform.machine(),
+                    "num_episodes": args.num_episodes,
+                },
+                "results": results,
+            },
+            fp,
+            indent=2,
+        )
+    print(f"\nresults written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark of the per-step overhead of the env's step paths.
+
+Runs the same episodes with a cheap heuristic through three paths: the env as
+created by `gym.make`, which adds the env checker and order-enforcing
+wrappers, the bare env's validated `step()`, and `trusted_step()` on an env
+that doesn't keep its spaces up to date. Reports the mean time per step, and
+checks that all the paths produce the same rewards.
+
+Must be run from a directory that contains the TPC-H dataset under data/tpch.
+
+usage: python benchmarks/bench_step.py [--num-episodes N]
+"""
+
+import sys
+import os.path as osp
+import time
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+
+import gymnasium as gym
+
+sys.path.insert(0, osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from spark_sched_sim import SparkSchedSimEnv
+
+ENV_CFG = {
+    "num_executors": 50,
+    "job_arrival_cap": 50,
+    "job_arrival_rate": 4.0e-5,
+    "moving_delay": 2000.0,
+    "warmup_delay": 1000.0,
+    "data_sampler_cls": "TPCHDataSampler",
+}
+
+
+def run_episodes(env, num_episodes, trusted):
+    """runs episodes with a heuristic that always commits all the executors to
+    the first schedulable stage, and returns the time spent stepping, the
+    number of steps and the rewards
+    """
+    elapsed = 0.0
+    rewards = []
+    for seed in range(num_episodes):
+        obs, _ = env.reset(seed=seed)
+        terminated = False
+        while not terminated:
+            t_start = time.perf_counter()
+            if trusted:
+                obs, reward, terminated, *_ = env.trusted_step(
+                    0, obs["num_committable_execs"]
+                )
+            else:
+                action = {"stage_idx": 0, "num_exec": obs["num_committable_execs"]}
+                obs, reward, terminated, *_ = env.step(action)
+            elapsed += time.perf_counter() - t_start
+            rewards += [reward]
+
+    return elapsed, len(rewards), rewards
+
+
+def main():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--num-episodes", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = {
+        "gym.make + step()": (
+            gym.make("spark_sched_sim:SparkSchedSimEnv-v0", env_cfg=ENV_CFG),
+            False,
+        ),
+        "step()": (SparkSchedSimEnv(ENV_CFG), False),
+        "trusted_step()": (
+            SparkSchedSimEnv(ENV_CFG | {"update_spaces": False}),
+            True,
+        ),
+    }
+
+    all_rewards = []
+    for name, (env, trusted) in paths.items():
+        elapsed, num_steps, rewards = run_episodes(env, args.num_episodes, trusted)
+        all_rewards += [rewards]
+        print(
+            f"{name:>20}: {1e6 * elapsed / num_steps:7.1f} us/step ({num_steps} steps)"
+        )
+
+    assert all(rewards == all_rewards[0] for rewards in all_rewards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""Converts a CSV trace of jobs into the chunked binary format that
+`TraceDataSampler` streams, if given its path as `trace_path`
+"""
+
+from spark_sched_sim.data_samplers.trace import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""Ingests Spark event logs into a packed dataset, which `EventLogDataSampler`
+samples from if given its path as `packed_dataset_path`
+"""
+
+from spark_sched_sim.data_samplers.event_log import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""Packs the extracted TPC-H dataset into a single memory-mappable file, which
+`TPCHDataSampler` samples from if given its path as `packed_dataset_path`
+"""
+
+from spark_sched_sim.data_samplers.tpch_packed import main
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ import networkx as nx
 from torch.distributions.utils import clamp_probs
 import numpy as np
 
+from spark_sched_sim.utils import topological_generations
+
 
 def sample(logits: Tensor) -> tuple[int, float]:
     pi = F.softmax(logits, 0).numpy()
@@ -244,23 +246,25 @@ def make_dag_layer_edge_masks(
     """
     if isinstance(graph_or_data, nx.DiGraph):
         G = graph_or_data
+        edge_links = np.array(G.edges, dtype=int).reshape(-1, 2)
+        num_nodes = len(G)
     else:
         edge_links, num_nodes = graph_or_data
-        G = np_to_nx(edge_links, num_nodes)
 
-    node_levels = list(nx.topological_generations(G))
+    node_levels = topological_generations(edge_links, num_nodes)
+    num_levels = node_levels.max(initial=-1) + 1
 
-    if len(node_levels) <= 1:
+    if num_levels <= 1:
         # no message passing to do
         return np.zeros((0, edge_links.shape[0]), dtype=bool)
 
-    node_mask = np.zeros(len(G), dtype=bool)
+    src, dst = edge_links[:, 0], edge_links[:, 1]
 
     edge_masks = []
-    for node_level in node_levels[:-1]:
-        succ = set.union(*[set(G.successors(n)) for n in node_level])
-        node_mask[:] = 0
-        node_mask[node_level + list(succ)] = True
+    for level in range(num_levels - 1):
+        # nodes in this level along with their successors
+        node_mask = node_levels == level
+        node_mask[dst[node_mask[src]]] = True
         edge_mask = make_edge_mask(edge_links, node_mask)
         edge_masks += [edge_mask]
 
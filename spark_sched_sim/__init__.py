@@ -1,6 +1,7 @@
-__all__ = ["SparkSchedSimEnv"]
+__all__ = ["SparkSchedSimEnv", "SparkSchedSimVecEnv"]
 
 from gymnasium.envs.registration import register
 from .spark_sched_sim import SparkSchedSimEnv
+from .vec_env import SparkSchedSimVecEnv
 
 register(id="SparkSchedSimEnv-v0", entry_point="spark_sched_sim:SparkSchedSimEnv")
@@ -1,6 +1,7 @@
-__all__ = ["Job", "Stage", "Task", "Executor"]
+__all__ = ["Job", "JobTemplate", "Stage", "Task", "Executor"]
 
 from .job import Job
+from .job_template import JobTemplate
 from .stage import Stage
 from .task import Task
 from .executor import Executor
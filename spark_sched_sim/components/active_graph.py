@@ -0,0 +1,63 @@
+import numpy as np
+from numpy import ndarray
+
+
+class ActiveGraph:
+    """Compacted index of the currently active stages, i.e. the stages whose
+    job has arrived and which have not completed yet, along with the
+    dependencies among them. Stages are identified by their global stage
+    index, and are kept in increasing order, which is the order in which they
+    appear in observations.
+
+    The index is updated when jobs arrive and when stages complete, so the
+    cost of building an observation's graph scales with the active workload
+    rather than with the whole episode's history.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        # sorted global indices of the active stages
+        self.stage_idx = np.zeros(0, dtype=int)
+
+        # array of shape (num active edges, 2) of dependencies among the active
+        # stages, in terms of global stage indices
+        self.edge_links = np.zeros((0, 2), dtype=int)
+
+    @property
+    def num_stages(self) -> int:
+        return self.stage_idx.size
+
+    def add_job(
+        self, base_stage_idx: int, num_stages: int, edge_links: ndarray
+    ) -> None:
+        """adds a newly arrived job's stages and dependencies. Jobs arrive in
+        order of their global stage indices, so they are simply appended.
+        """
+        self.stage_idx = np.concatenate(
+            [self.stage_idx, np.arange(base_stage_idx, base_stage_idx + num_stages)]
+        )
+        self.edge_links = np.concatenate([self.edge_links, base_stage_idx + edge_links])
+
+    def remove_stage(self, stage_idx: int) -> None:
+        """removes a completed stage along with all of its dependencies. Once
+        all of a job's stages are removed, nothing of the job remains.
+        """
+        self.stage_idx = np.delete(
+            self.stage_idx, np.searchsorted(self.stage_idx, stage_idx)
+        )
+        self.edge_links = self.edge_links[(self.edge_links != stage_idx).all(1)]
+
+    def relabelled_edge_links(self) -> ndarray:
+        """returns the active edges in terms of the stages' positions among
+        the active stages
+        """
+        return np.searchsorted(self.stage_idx, self.edge_links)
+
+    def get_state(self) -> tuple[ndarray, ndarray]:
+        # the arrays are never modified in place, so they can be shared
+        return self.stage_idx, self.edge_links
+
+    def set_state(self, state: tuple[ndarray, ndarray]) -> None:
+        self.stage_idx, self.edge_links = state
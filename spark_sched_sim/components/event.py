@@ -1,19 +1,39 @@
 import heapq
 import itertools
-from enum import Enum, auto
-from dataclasses import dataclass
+from bisect import insort
+from typing import NamedTuple
 
+from .job import Job
+from .stage import Stage
+from .task import Task
+from .executor import Executor
 
-@dataclass
-class Event:
-    class Type(Enum):
-        JOB_ARRIVAL = auto()
-        TASK_FINISHED = auto()
-        EXECUTOR_READY = auto()
 
-    type: Type
+class JobArrival(NamedTuple):
+    job: Job
 
-    data: dict
+
+class TaskFinished(NamedTuple):
+    stage: Stage
+    task: Task
+
+    @property
+    def executor_id(self) -> int:
+        assert self.task.executor_id is not None
+        return self.task.executor_id
+
+
+class ExecutorReady(NamedTuple):
+    executor: Executor
+    stage: Stage
+
+    @property
+    def executor_id(self) -> int:
+        return self.executor.id_
+
+
+# events are typed records whose fields are the arguments of their handlers
+Event = JobArrival | TaskFinished | ExecutorReady
 
 
 class EventQueue:
@@ -47,3 +67,206 @@ class EventQueue:
 
         t, _, event = heapq.heappop(self._pq)
         return t, event
+
+    def get_state(self) -> tuple:
+        # read the tie breaker's next value without consuming it
+        seq = next(self._counter)
+        self._counter = itertools.count(seq)
+        return self._pq.copy(), seq
+
+    def set_state(self, state: tuple) -> None:
+        pq, seq = state
+        self._pq = pq.copy()
+        self._counter = itertools.count(seq)
+
+
+class ExecutorEventQueue:
+    """Event queue that exploits the fact that each executor has at most one
+    pending event at a time, which is either `TaskFinished` or `ExecutorReady`.
+
+    The executors' next event times are kept in an array-backed tournament
+    tree, where each internal node stores the index of the executor with the
+    earliest event in its subtree, so that the next executor event is always
+    at the root. Job arrivals are kept in a separate stream that is sorted by
+    time. Ties are broken by push order, exactly like `EventQueue`.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._allocate(capacity)
+
+        # sorted stream of pending job arrivals, and the position of its head
+        self._arrivals: list[tuple[float, int, JobArrival]] = []
+        self._arrivals_head = 0
+
+        # tie breaker
+        self._counter = itertools.count()
+
+        # executor whose event was just popped, but whose leaf has not been
+        # replayed through the tree yet. Usually, the next push is a new event
+        # for this same executor, in which case only one replay is needed.
+        self._stale_leaf: int | None = None
+
+    def reset(self) -> None:
+        self._allocate(self._capacity)
+        self._arrivals.clear()
+        self._arrivals_head = 0
+        self._counter = itertools.count()
+        self._stale_leaf = None
+
+    def __bool__(self) -> bool:
+        return self._num_pending > 0 or self._arrivals_head < len(self._arrivals)
+
+    def push(self, t: float, event: Event) -> None:
+        seq = next(self._counter)
+
+        if type(event) is JobArrival:
+            if not self._arrivals or (t, seq) > self._arrivals[-1][:2]:
+                self._arrivals.append((t, seq, event))
+            else:
+                insort(self._arrivals, (t, seq, event), lo=self._arrivals_head)
+            return
+
+        leaf = event.executor_id
+        if leaf >= self._capacity:
+            self._flush()
+            self._grow(leaf + 1)
+
+        assert self._events[leaf] is None, "executor already has a pending event"
+        self._times[leaf] = t
+        self._seqs[leaf] = seq
+        self._events[leaf] = event
+        self._num_pending += 1
+
+        if self._stale_leaf is not None and self._stale_leaf != leaf:
+            self._flush()
+        self._stale_leaf = None
+        self._replay(leaf)
+
+    def top(self) -> tuple[float, Event] | None:
+        self._flush()
+        item = self._peek()
+        if item is None:
+            return None
+
+        t, _, event = item
+        return t, event
+
+    def pop(self) -> tuple[float, Event] | None:
+        self._flush()
+        item = self._peek()
+        if item is None:
+            return None
+
+        t, _, event = item
+        if type(event) is JobArrival:
+            self._arrivals_head += 1
+            if self._arrivals_head == len(self._arrivals):
+                self._arrivals.clear()
+                self._arrivals_head = 0
+        else:
+            leaf = self._tree[1]
+            self._times[leaf] = float("inf")
+            self._events[leaf] = None
+            self._num_pending -= 1
+            self._stale_leaf = leaf
+
+        return t, event
+
+    def get_state(self) -> tuple:
+        self._flush()
+        seq = next(self._counter)
+        self._counter = itertools.count(seq)
+        return (
+            self._times.copy(),
+            self._seqs.copy(),
+            self._events.copy(),
+            self._tree.copy(),
+            self._num_pending,
+            self._arrivals[self._arrivals_head :],
+            seq,
+        )
+
+    def set_state(self, state: tuple) -> None:
+        times, seqs, events, tree, self._num_pending, arrivals, seq = state
+        self._capacity = len(times)
+        self._times = times.copy()
+        self._seqs = seqs.copy()
+        self._events = events.copy()
+        self._tree = tree.copy()
+        self._arrivals = arrivals.copy()
+        self._arrivals_head = 0
+        self._counter = itertools.count(seq)
+        self._stale_leaf = None
+
+    # internal methods
+
+    def _allocate(self, capacity: int) -> None:
+        # round up to a power of two, so that the tree is complete
+        self._capacity = 1 << max(0, capacity - 1).bit_length()
+
+        # executor id -> time, push order, and payload of its pending event
+        self._times = [float("inf")] * self._capacity
+        self._seqs = [0] * self._capacity
+        self._events: list[Event | None] = [None] * self._capacity
+        self._num_pending = 0
+
+        # implicit binary tree with the root at index 1 and the leaf of
+        # executor `i` at index `capacity + i`. Each node stores the id of the
+        # executor with the earliest event in its subtree.
+        self._tree = [0] * self._capacity + list(range(self._capacity))
+        for node in range(self._capacity - 1, 0, -1):
+            self._tree[node] = self._tree[2 * node]
+
+    def _grow(self, min_capacity: int) -> None:
+        old_events = [
+            (t, seq, event)
+            for t, seq, event in zip(self._times, self._seqs, self._events)
+            if event is not None
+        ]
+        self._allocate(max(min_capacity, 2 * self._capacity))
+        for t, seq, event in old_events:
+            leaf = event.executor_id
+            self._times[leaf] = t
+            self._seqs[leaf] = seq
+            self._events[leaf] = event
+            self._num_pending += 1
+            self._replay(leaf)
+
+    def _replay(self, leaf: int) -> None:
+        """recomputes the winners along the path from a leaf to the root"""
+        times, seqs, tree = self._times, self._seqs, self._tree
+        node = (leaf + self._capacity) >> 1
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            t_left, t_right = times[left], times[right]
+            if t_left < t_right or (t_left == t_right and seqs[left] <= seqs[right]):
+                tree[node] = left
+            else:
+                tree[node] = right
+            node >>= 1
+
+    def _flush(self) -> None:
+        if self._stale_leaf is not None:
+            self._replay(self._stale_leaf)
+            self._stale_leaf = None
+
+    def _peek(self) -> tuple[float, int, Event] | None:
+        winner = self._tree[1]
+        event = self._events[winner]
+
+        if self._arrivals_head < len(self._arrivals):
+            arrival = self._arrivals[self._arrivals_head]
+            if event is None or arrival[:2] < (self._times[winner], self._seqs[winner]):
+                return arrival
+
+        if event is None:
+            return None
+
+        return self._times[winner], self._seqs[winner], event
+
+
+def make_event_queue(env_cfg: dict) -> EventQueue | ExecutorEventQueue:
+    glob = globals()
+    event_queue_cls = env_cfg.get("event_queue_cls", "EventQueue")
+    assert event_queue_cls in glob, f"'{event_queue_cls}' is not a valid event queue."
+    return glob[event_queue_cls]()
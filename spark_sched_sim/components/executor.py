@@ -18,12 +18,6 @@ class Executor:
         # if the executor just finished executing
         self.is_executing = False
 
-        # list of pairs [t, job_id], where `t` is the wall time that this executor
-        # was released from job with id `job_id`, or `None` if it has not been released
-        # yet. `job_id` is -1 if the executor is at the general pool.
-        # NOTE: only used for rendering
-        self.history: list[list] = [[None, -1]]
-
     @property
     def is_idle(self) -> bool:
         return self.task is None
@@ -31,14 +25,8 @@ class Executor:
     def is_at_job(self, job_id: int) -> bool:
         return self.job_id == job_id
 
-    def add_history(self, wall_time: float, job_id: int) -> None:
-        """should be called whenever this executor is released from a job"""
-        if self.history is None:
-            self.history = []
-
-        if len(self.history) > 0:
-            # add release time to most recent history
-            self.history[-1][0] = wall_time
+    def get_state(self) -> tuple:
+        return self.task, self.job_id, self.is_executing
 
-        # add new history
-        self.history += [[None, job_id]]
+    def set_state(self, state: tuple) -> None:
+        self.task, self.job_id, self.is_executing = state
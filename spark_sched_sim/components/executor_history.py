@@ -0,0 +1,73 @@
+from bisect import bisect_left
+
+import numpy as np
+
+
+class ExecutorHistory:
+    """Cluster-wide record of the executors' moves between jobs, stored in
+    preallocated NumPy buffers that grow geometrically and are reused across
+    episodes. Each entry `(t, executor_id, job_id)` means that the executor
+    arrived at the job at wall time `t`, where `job_id` is -1 for the general
+    pool. All executors start out in the general pool at time 0. The indices
+    of each executor's entries are also kept, so that an executor's history
+    can be read without scanning everyone else's.
+
+    NOTE: only used for rendering, or if requested via the env's
+    `record_executor_history` option
+    """
+
+    def __init__(self, num_executors: int, capacity: int = 1024) -> None:
+        self.num_executors = num_executors
+        self._allocate(capacity)
+        self.size = 0
+
+        # executor id -> indices of the executor's entries, in order
+        self._executor_entries: list[list[int]] = [[] for _ in range(num_executors)]
+
+    def reset(self) -> None:
+        self.truncate(0)
+
+    def truncate(self, size: int) -> None:
+        """drops all the entries after the first `size`, e.g. when a snapshot
+        is restored
+        """
+        self.size = size
+        for entries in self._executor_entries:
+            del entries[bisect_left(entries, size) :]
+
+    def record(self, wall_time: float, executor_id: int, job_id: int) -> None:
+        """should be called whenever an executor moves to a job, or is
+        released to the general pool
+        """
+        if self.size == self.times.size:
+            self._grow()
+
+        i = self.size
+        self.times[i] = wall_time
+        self.executor_ids[i] = executor_id
+        self.job_ids[i] = job_id
+        self._executor_entries[executor_id] += [i]
+        self.size += 1
+
+    def executor_history(self, executor_id: int) -> list[list]:
+        """returns the history of an executor as a list of pairs [t, job_id],
+        where `t` is the wall time that the executor was released from job
+        with id `job_id`, or `None` if it has not been released yet
+        """
+        entries = self._executor_entries[executor_id]
+        release_times = self.times[entries].tolist() + [None]
+        job_ids = [-1] + self.job_ids[entries].tolist()
+        return [[t, job_id] for t, job_id in zip(release_times, job_ids)]
+
+    # internal methods
+
+    def _allocate(self, capacity: int) -> None:
+        self.times = np.zeros(capacity)
+        self.executor_ids = np.zeros(capacity, dtype=int)
+        self.job_ids = np.zeros(capacity, dtype=int)
+
+    def _grow(self) -> None:
+        old = self.times, self.executor_ids, self.job_ids
+        self._allocate(2 * self.times.size)
+        for new_arr, old_arr in zip((self.times, self.executor_ids, self.job_ids), old):
+            new_arr[: old_arr.size] = old_arr
@@ -1,5 +1,7 @@
+from collections.abc import Iterator
 from typing import cast
 
+from ..utils import grow
 
 PoolKey = tuple[int | None, int | None]
 OptPoolKey = PoolKey | None
@@ -69,6 +71,37 @@ class ExecutorTracker:
         # initialize executor source
         self._curr_source: OptPoolKey = COMMON_POOL_KEY
 
+    def get_state(self) -> tuple:
+        return (
+            self._executor_locations.copy(),
+            {pool_key: pool.copy() for pool_key, pool in self._pools.items()},
+            {src: dsts.copy() for src, dsts in self._commitments.items()},
+            self._num_commitments_from.copy(),
+            self._num_commitments_to_stage.copy(),
+            self._num_moving_to_stage.copy(),
+            self._total_executor_count.copy(),
+            self._curr_source,
+        )
+
+    def set_state(self, state: tuple) -> None:
+        (
+            executor_locations,
+            pools,
+            commitments,
+            num_commitments_from,
+            num_commitments_to_stage,
+            num_moving_to_stage,
+            total_executor_count,
+            self._curr_source,
+        ) = state
+        self._executor_locations = executor_locations.copy()
+        self._pools = {pool_key: pool.copy() for pool_key, pool in pools.items()}
+        self._commitments = {src: dsts.copy() for src, dsts in commitments.items()}
+        self._num_commitments_from = num_commitments_from.copy()
+        self._num_commitments_to_stage = num_commitments_to_stage.copy()
+        self._num_moving_to_stage = num_moving_to_stage.copy()
+        self._total_executor_count = total_executor_count.copy()
+
     def add_job_pool(self, pool_key: JobPoolKey) -> None:
         if pool_key in self._pools:
             raise ValueError("job pool already exists")
@@ -140,6 +173,15 @@ class ExecutorTracker:
     def get_source_pool(self) -> set[int]:
         return self.get_pool(self._curr_source)
 
+    def iter_pool(self, pool_key: OptPoolKey) -> Iterator[int]:
+        """iterates over the executors at `pool_key` without copying them. The
+        pool must not be modified while iterating.
+        """
+        return iter(self._pools[pool_key])
+
+    def iter_source_pool(self) -> Iterator[int]:
+        return self.iter_pool(self._curr_source)
+
     def executor_location(self, executor_id: int) -> OptPoolKey:
         return self._executor_locations[executor_id]
 
@@ -247,3 +289,346 @@ class ExecutorTracker:
 
         if self._commitments[src_pool_key][dst_pool_key] == 0:
             self._commitments[src_pool_key].pop(dst_pool_key)
+
+
+# reserved ids of the placeholder pool (key `None`) and the common pool
+NULL_POOL_ID = 0
+COMMON_POOL_ID = 1
+
+
+class ArrayExecutorTracker:
+    """Array-backed variant of `ExecutorTracker` with the same public methods.
+
+    Every pool is assigned a dense integer id when it is added, and all of the
+    executor locations, commitment counts, moving counts and job executor
+    supplies are stored in flat arrays indexed by those ids. Pool keys are only
+    used at the interface, to look up a pool's id. The arrays grow geometrically
+    as pools and jobs are added, and are reused across episodes. They are plain
+    lists, because the tracker reads and writes single entries at a time, which
+    is several times faster on lists than on NumPy arrays.
+
+    The members of each pool are kept in a dense list, from which executors are
+    removed by swapping them with the last member, so that looking up a pool
+    takes time proportional to its size rather than to the number of executors.
+    """
+
+    def __init__(
+        self, num_executors: int, pool_capacity: int = 1024, job_capacity: int = 128
+    ) -> None:
+        self.num_executors = num_executors
+
+        # executor id -> id of pool where the executor currently resides
+        self._executor_locations = [COMMON_POOL_ID] * num_executors
+
+        # pool id -> total number of outgoing commitments from this pool
+        self._num_commitments_from = [0] * pool_capacity
+
+        # pool id -> total number of commitments to this pool
+        self._num_commitments_to_stage = [0] * pool_capacity
+
+        # pool id -> number of executors moving to this pool
+        self._num_moving_to_stage = [0] * pool_capacity
+
+        # pool id -> id of the job that the pool belongs to, or -1
+        self._pool_job_ids = [-1] * pool_capacity
+
+        # job id -> size of job's pool plus the total number of external
+        # commitments and executors moving to any of its stages
+        self._total_executor_count = [0] * job_capacity
+
+    def reset(self) -> None:
+        # pool key -> pool id, and vice versa
+        self._pool_ids: dict[OptPoolKey, int] = {
+            None: NULL_POOL_ID,
+            COMMON_POOL_KEY: COMMON_POOL_ID,
+        }
+        self._pool_keys: list[OptPoolKey] = [None, COMMON_POOL_KEY]
+
+        # pool id -> ids of the executors who reside at this pool, and
+        # executor id -> index of the executor within its pool's list
+        self._pool_members: list[list[int]] = [[], list(range(self.num_executors))]
+        self._executor_slots: list[int] = list(range(self.num_executors))
+
+        # pool id A ->
+        #   (pool id B ->
+        #       number of commitments from
+        #       pool A to pool B)
+        # only pools with outgoing commitments have an entry
+        self._commitments: dict[int, dict[int, int]] = {}
+
+        self._executor_locations[:] = [COMMON_POOL_ID] * self.num_executors
+        for counts in [
+            self._num_commitments_from,
+            self._num_commitments_to_stage,
+            self._num_moving_to_stage,
+            self._total_executor_count,
+        ]:
+            counts[:] = [0] * len(counts)
+        self._pool_job_ids[:] = [-1] * len(self._pool_job_ids)
+
+        # initialize executor source
+        self._curr_source: int = COMMON_POOL_ID
+
+    def get_state(self) -> tuple:
+        return (
+            self._pool_ids.copy(),
+            self._pool_keys.copy(),
+            [members.copy() for members in self._pool_members],
+            self._executor_slots.copy(),
+            {src: dsts.copy() for src, dsts in self._commitments.items()},
+            self._executor_locations.copy(),
+            self._num_commitments_from.copy(),
+            self._num_commitments_to_stage.copy(),
+            self._num_moving_to_stage.copy(),
+            self._pool_job_ids.copy(),
+            self._total_executor_count.copy(),
+            self._curr_source,
+        )
+
+    def set_state(self, state: tuple) -> None:
+        (
+            pool_ids,
+            pool_keys,
+            pool_members,
+            executor_slots,
+            commitments,
+            executor_locations,
+            num_commitments_from,
+            num_commitments_to_stage,
+            num_moving_to_stage,
+            pool_job_ids,
+            total_executor_count,
+            self._curr_source,
+        ) = state
+        self._pool_ids = pool_ids.copy()
+        self._pool_keys = pool_keys.copy()
+        self._pool_members = [members.copy() for members in pool_members]
+        self._executor_slots = executor_slots.copy()
+        self._commitments = {src: dsts.copy() for src, dsts in commitments.items()}
+        self._executor_locations = executor_locations.copy()
+        self._num_commitments_from = num_commitments_from.copy()
+        self._num_commitments_to_stage = num_commitments_to_stage.copy()
+        self._num_moving_to_stage = num_moving_to_stage.copy()
+        self._pool_job_ids = pool_job_ids.copy()
+        self._total_executor_count = total_executor_count.copy()
+
+    def add_job_pool(self, pool_key: JobPoolKey) -> None:
+        if pool_key in self._pool_ids:
+            raise ValueError("job pool already exists")
+
+        job_id, _ = pool_key
+        if job_id >= len(self._total_executor_count):
+            self._total_executor_count = grow(self._total_executor_count, job_id + 1)
+
+        self._new_pool(pool_key, job_id)
+        self._total_executor_count[job_id] = 0
+
+    def add_stage_pool(self, pool_key: StagePoolKey) -> None:
+        if pool_key in self._pool_ids:
+            raise ValueError("stage pool already exists")
+
+        job_id, _ = pool_key
+        if (job_id, None) not in self._pool_ids:
+            raise ValueError(f"job with id {job_id} does not exist")
+
+        self._new_pool(pool_key, job_id)
+
+    def get_source(self) -> OptPoolKey:
+        return self._pool_keys[self._curr_source]
+
+    def source_job_id(self) -> int | None:
+        job_id = self._pool_job_ids[self._curr_source]
+        return None if job_id < 0 else job_id
+
+    def num_committable_execs(self) -> int:
+        src = self._curr_source
+        num_uncommitted = len(self._pool_members[src]) - self._num_commitments_from[src]
+        assert num_uncommitted >= 0, "[num_committable_execs]"
+        return num_uncommitted
+
+    def common_pool_has_executors(self) -> bool:
+        return bool(self._pool_members[COMMON_POOL_ID])
+
+    def num_executors_moving_to_stage(self, stage_pool_key: StagePoolKey) -> int:
+        return self._num_moving_to_stage[self._pool_ids[stage_pool_key]]
+
+    def num_commitments_to_stage(self, stage_pool_key: StagePoolKey) -> int:
+        return self._num_commitments_to_stage[self._pool_ids[stage_pool_key]]
+
+    def exec_supply(self, job_id: int) -> int:
+        return self._total_executor_count[job_id]
+
+    def update_executor_source(self, pool_key: PoolKey) -> None:
+        self._curr_source = self._pool_ids[pool_key]
+
+    def clear_executor_source(self) -> None:
+        self._curr_source = NULL_POOL_ID
+
+    def get_source_commitments(self) -> dict[OptPoolKey, int]:
+        return {
+            self._pool_keys[dst]: n
+            for dst, n in self._commitments.get(self._curr_source, {}).items()
+        }
+
+    def get_pool(self, pool_key: OptPoolKey) -> set[int]:
+        return set(self._pool_members[self._pool_ids[pool_key]])
+
+    def pool_size(self, pool_key: OptPoolKey) -> int:
+        return len(self._pool_members[self._pool_ids[pool_key]])
+
+    def get_source_pool(self) -> set[int]:
+        return self.get_pool(self._pool_keys[self._curr_source])
+
+    def iter_pool(self, pool_key: OptPoolKey) -> Iterator[int]:
+        """iterates over the executors at `pool_key` without copying them. The
+        pool must not be modified while iterating.
+        """
+        return iter(self._pool_members[self._pool_ids[pool_key]])
+
+    def iter_source_pool(self) -> Iterator[int]:
+        return iter(self._pool_members[self._curr_source])
+
+    def executor_location(self, executor_id: int) -> OptPoolKey:
+        return self._pool_keys[self._executor_locations[executor_id]]
+
+    def add_commitment(self, num_executors: int, dst_pool_key: PoolKey) -> None:
+        src = self._curr_source
+        assert src != NULL_POOL_ID, "[add_commitment]"
+        dst = self._pool_ids[dst_pool_key]
+
+        self._increment_commitments(dst, n=num_executors)
+
+        dst_job_id = self._pool_job_ids[dst]
+        if dst_job_id >= 0 and dst_job_id != self._pool_job_ids[src]:
+            self._total_executor_count[dst_job_id] += num_executors
+
+    def remove_commitment(self, executor_id: int, dst_pool_key: PoolKey) -> PoolKey:
+        src = self._executor_locations[executor_id]
+        assert src != NULL_POOL_ID, "[remove_commitment]"
+        dst = self._pool_ids[dst_pool_key]
+
+        if dst not in self._commitments.get(src, ()):
+            src_pool_key = self._pool_keys[src]
+            raise ValueError(f"no commitments from {src_pool_key} to {dst_pool_key}")
+
+        # update commitment from source to dest stage
+        self._decrement_commitments(src, dst)
+
+        dst_job_id = self._pool_job_ids[dst]
+        if dst_job_id >= 0 and dst_job_id != self._pool_job_ids[src]:
+            self._total_executor_count[dst_job_id] -= 1
+            assert self._total_executor_count[dst_job_id] >= 0
+
+        return self._pool_keys[src]
+
+    def peek_commitment(self, pool_key: OptPoolKey) -> OptPoolKey:
+        commitments = self._commitments.get(self._pool_ids.get(pool_key, -1))
+        if not commitments:
+            # no outgoing commitments from this pool
+            return None
+        return self._pool_keys[next(iter(commitments))]
+
+    def record_executor_arrival(self, stage_pool_key: StagePoolKey) -> None:
+        pool_id = self._pool_ids[stage_pool_key]
+        self._num_moving_to_stage[pool_id] -= 1
+        assert self._num_moving_to_stage[pool_id] >= 0
+
+    def move_executor_to_pool(
+        self, executor_id: int, new_pool_key: OptPoolKey, send: bool = False
+    ) -> None:
+        if send and (
+            not new_pool_key or new_pool_key[0] is None or new_pool_key[1] is None
+        ):
+            raise ValueError("can only send executors to stages")
+
+        new = self._pool_ids[new_pool_key]
+        old = self._executor_locations[executor_id]
+
+        if old != NULL_POOL_ID:
+            # remove executor from old pool
+            self._remove_pool_member(old, executor_id)
+            self._executor_locations[executor_id] = NULL_POOL_ID
+
+        if not send:
+            # directly move executor into new pool
+            self._executor_locations[executor_id] = new
+            self._add_pool_member(new, executor_id)
+            return
+
+        # send the executor to the stage
+
+        self._num_moving_to_stage[new] += 1
+
+        old_job_id = self._pool_job_ids[old]
+        new_job_id = self._pool_job_ids[new]
+        assert old_job_id != new_job_id
+
+        self._total_executor_count[new_job_id] += 1
+        if old_job_id >= 0:
+            self._total_executor_count[old_job_id] -= 1
+            assert self._total_executor_count[old_job_id] >= 0
+
+    # internal methods
+
+    def _new_pool(self, pool_key: PoolKey, job_id: int) -> None:
+        pool_id = len(self._pool_keys)
+        if pool_id >= len(self._pool_job_ids):
+            size = pool_id + 1
+            self._num_commitments_from = grow(self._num_commitments_from, size)
+            self._num_commitments_to_stage = grow(self._num_commitments_to_stage, size)
+            self._num_moving_to_stage = grow(self._num_moving_to_stage, size)
+            self._pool_job_ids = grow(self._pool_job_ids, size, fill_value=-1)
+
+        self._pool_ids[pool_key] = pool_id
+        self._pool_keys.append(pool_key)
+        self._pool_members.append([])
+        self._pool_job_ids[pool_id] = job_id
+
+    def _add_pool_member(self, pool_id: int, executor_id: int) -> None:
+        members = self._pool_members[pool_id]
+        self._executor_slots[executor_id] = len(members)
+        members.append(executor_id)
+
+    def _remove_pool_member(self, pool_id: int, executor_id: int) -> None:
+        # the pool's last member takes the removed executor's slot
+        members = self._pool_members[pool_id]
+        last_executor_id = members.pop()
+        if last_executor_id != executor_id:
+            slot = self._executor_slots[executor_id]
+            members[slot] = last_executor_id
+            self._executor_slots[last_executor_id] = slot
+
+    def _increment_commitments(self, dst: int, n: int) -> None:
+        src = self._curr_source
+        commitments = self._commitments.setdefault(src, {})
+        commitments[dst] = commitments.get(dst, 0) + n
+
+        self._num_commitments_from[src] += n
+        self._num_commitments_to_stage[dst] += n
+
+        supply = len(self._pool_members[src])
+        demand = self._num_commitments_from[src]
+        assert supply >= demand
+
+    def _decrement_commitments(self, src: int, dst: int) -> None:
+        commitments = self._commitments[src]
+        commitments[dst] -= 1
+        self._num_commitments_from[src] -= 1
+        self._num_commitments_to_stage[dst] -= 1
+
+        assert self._num_commitments_from[src] >= 0
+        assert self._num_commitments_to_stage[dst] >= 0
+
+        if commitments[dst] == 0:
+            commitments.pop(dst)
+            if not commitments:
+                self._commitments.pop(src)
+
+
+def make_executor_tracker(env_cfg: dict) -> ExecutorTracker | ArrayExecutorTracker:
+    glob = globals()
+    exec_tracker_cls = env_cfg.get("exec_tracker_cls", "ExecutorTracker")
+    assert (
+        exec_tracker_cls in glob
+    ), f"'{exec_tracker_cls}' is not a valid executor tracker."
+    return glob[exec_tracker_cls](env_cfg["num_executors"])
@@ -1,16 +1,18 @@
 from collections.abc import Generator
 import numpy as np
+from numpy import ndarray
 import networkx as nx
 
 from .stage import Stage
 from .executor import Executor
+from .job_template import JobTemplate
 
 
 class Job:
     """An object representing a job in the system, containing a set of stages with dependencies stored in a dag."""
 
     def __init__(
-        self, id_: int, stages: list[Stage], dag: nx.DiGraph, t_arrival: float
+        self, id_: int, stages: list[Stage], template: JobTemplate, t_arrival: float
     ) -> None:
         # unique identifier of this job
         self.id_ = id_
@@ -24,8 +26,9 @@ class Job:
         # incomplete stages whose parents have completed
         self.frontier_stages: set[Stage] = set()
 
-        # networkx dag storing the stage dependencies
-        self.dag = dag
+        # immutable structure of this job, which is shared with all the other
+        # jobs that were sampled from the same query
+        self.template = template
 
         # time that this job arrived into the system
         self.t_arrival = t_arrival
@@ -40,6 +43,9 @@ class Job:
         # count of stages who have no remaining tasks
         self.saturated_stage_count = 0
 
+        # stage id -> number of parents that have not completed yet
+        self._num_unmet_dependencies: list[int] = template.in_degrees.tolist()
+
         self._init_frontier()
 
     @property
@@ -62,6 +68,18 @@ class Job:
     def num_active_stages(self) -> int:
         return len(self.active_stages)
 
+    @property
+    def edge_links(self) -> ndarray:
+        return self.template.edge_links
+
+    @property
+    def dag(self) -> nx.DiGraph:
+        """networkx dag storing the stage dependencies. It is not used by the
+        simulator, so it is built lazily for anyone who still needs it, and is
+        shared by all the jobs with the same template.
+        """
+        return self.template.dag
+
     def record_stage_completion(self, stage: Stage) -> bool:
         """increments the count of completed stages"""
         self.active_stages.remove(stage)
@@ -73,10 +91,16 @@ class Job:
         return bool(new_stages)
 
     def get_children_stages(self, stage: Stage) -> Generator[Stage, None, None]:
-        return (self.stages[stage_id] for stage_id in self.dag.successors(stage.id_))
+        i = stage.id_
+        child_ptr = self.template.child_ptr
+        child_ids = self.template.child_idx[child_ptr[i] : child_ptr[i + 1]]
+        return (self.stages[stage_id] for stage_id in child_ids)
 
     def get_parent_stages(self, stage: Stage) -> Generator[Stage, None, None]:
-        return (self.stages[stage_id] for stage_id in self.dag.predecessors(stage.id_))
+        i = stage.id_
+        parent_ptr = self.template.parent_ptr
+        parent_ids = self.template.parent_idx[parent_ptr[i] : parent_ptr[i + 1]]
+        return (self.stages[stage_id] for stage_id in parent_ids)
 
     def attach_executor(self, executor: Executor) -> None:
         assert executor.task is None
@@ -88,6 +112,44 @@ class Job:
         executor.job_id = None
         executor.task = None
 
+    def get_state(self) -> tuple:
+        """captures the state of this job and its stages, excluding its local
+        executors, which are determined by the executors' own state
+        """
+        return (
+            [stage.get_state() for stage in self.stages],
+            self.frontier_stages.copy(),
+            self._num_unmet_dependencies.copy(),
+            self.saturated_stage_count,
+            self.t_completed,
+        )
+
+    def set_state(self, state: tuple) -> None:
+        (
+            stage_states,
+            frontier_stages,
+            num_unmet_dependencies,
+            self.saturated_stage_count,
+            self.t_completed,
+        ) = state
+        for stage, stage_state in zip(self.stages, stage_states):
+            stage.set_state(stage_state)
+        self.active_stages = [stage for stage in self.stages if not stage.completed]
+        self.frontier_stages = frontier_stages.copy()
+        self._num_unmet_dependencies = num_unmet_dependencies.copy()
+
+    def reset_state(self) -> None:
+        """returns this job to its state from before it arrived"""
+        for stage in self.stages:
+            stage.reset_state()
+        self.active_stages = self.stages.copy()
+        self.frontier_stages = set()
+        self._init_frontier()
+        self._num_unmet_dependencies = self.template.in_degrees.tolist()
+        self.t_completed = np.inf
+        self.local_executors.clear()
+        self.saturated_stage_count = 0
+
     # internal methods
 
     def _init_frontier(self) -> None:
@@ -98,17 +160,11 @@ class Job:
         self.frontier_stages |= self._get_source_stages()
 
     def _check_dependencies(self, stage_id: int) -> bool:
-        """searches to see if all the dependencies of stage with id `stage_id` are satisfied."""
-        for dep_id in self.dag.predecessors(stage_id):
-            if not self.stages[dep_id].completed:
-                return False
-
-        return True
+        """checks whether all the dependencies of stage with id `stage_id` are satisfied."""
+        return self._num_unmet_dependencies[stage_id] == 0
 
     def _get_source_stages(self) -> set[Stage]:
-        return set(
-            self.stages[node] for node, in_deg in self.dag.in_degree() if in_deg == 0
-        )
+        return set(self.stages[stage_id] for stage_id in self.template.source_ids)
 
     def _find_new_frontier_stages(self, stage: Stage) -> set[Stage]:
         """if ` stage` is completed, returns all of its successors whose other dependencies are also
@@ -119,10 +175,11 @@ class Job:
 
         new_stages = set()
         # search through stage's children
-        for suc_stage_id in self.dag.successors(stage.id_):
-            # if all dependencies are satisfied, then add this child to the frontier
-            new_stage = self.stages[suc_stage_id]
-            if not new_stage.completed and self._check_dependencies(suc_stage_id):
-                new_stages.add(new_stage)
+        for suc_stage in self.get_children_stages(stage):
+            # this dependency is now met. If it was the last one, then add
+            # this child to the frontier
+            self._num_unmet_dependencies[suc_stage.id_] -= 1
+            if not suc_stage.completed and self._check_dependencies(suc_stage.id_):
+                new_stages.add(suc_stage)
 
         return new_stages
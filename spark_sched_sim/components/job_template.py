@@ -0,0 +1,98 @@
+import numpy as np
+from numpy import ndarray
+import networkx as nx
+
+from ..utils import topological_generations, counts_to_ptr
+
+
+class JobTemplate:
+    """Immutable structure of a job, i.e. its stages' dependencies and rough
+    durations, which is shared by every job that is sampled from the same
+    query. Everything here is computed once per template, so that creating and
+    observing jobs involves no structural work. Arrays are read-only, and must
+    not be modified.
+    """
+
+    def __init__(
+        self,
+        edge_links: ndarray,
+        num_tasks: list[int],
+        rough_task_durations: list[float],
+    ) -> None:
+        self.num_stages = len(num_tasks)
+
+        # array of dependencies of shape (num_edges, 2), where each row
+        # `(u, v)` means that stage `u` must complete before stage `v` can
+        # begin. Rows are sorted.
+        self.edge_links = edge_links
+
+        # stage id -> number of tasks, and mean duration of its tasks
+        self.num_tasks = np.array(num_tasks, dtype=int)
+        self.rough_task_durations = np.array(rough_task_durations, dtype=float)
+
+        # CSR arrays of each stage's children and parents, such that e.g. the
+        # children of stage `i` are `child_idx[child_ptr[i]:child_ptr[i+1]]`
+        src, dst = edge_links[:, 0], edge_links[:, 1]
+        self.in_degrees = np.bincount(dst, minlength=self.num_stages)
+        self.child_idx = dst
+        self.child_ptr = counts_to_ptr(np.bincount(src, minlength=self.num_stages))
+        self.parent_idx = src[np.argsort(dst, kind="stable")]
+        self.parent_ptr = counts_to_ptr(self.in_degrees)
+
+        # ids of the stages without any dependencies
+        self.source_ids = (self.in_degrees == 0).nonzero()[0]
+
+        # stage id -> length of the longest chain of dependencies leading up to
+        # the stage, as in `nx.topological_generations`
+        self.generations = topological_generations(edge_links, self.num_stages)
+
+        # stage id -> rough duration of the longest chain of stages from the
+        # stage to the end of the job, if every stage ran all of its tasks at
+        # once
+        self.critical_path_durations = self._critical_path_durations()
+
+        for arr in self._arrays():
+            arr.flags.writeable = False
+
+        # networkx dag storing the stage dependencies, only built on demand
+        self._dag: nx.DiGraph | None = None
+
+    @property
+    def dag(self) -> nx.DiGraph:
+        if self._dag is None:
+            self._dag = nx.DiGraph()
+            self._dag.add_nodes_from(range(self.num_stages))
+            self._dag.add_edges_from(self.edge_links.tolist())
+        return self._dag
+
+    # internal methods
+
+    def _critical_path_durations(self) -> ndarray:
+        src, dst = self.edge_links[:, 0], self.edge_links[:, 1]
+        durations = self.rough_task_durations.copy()
+
+        # the children of a stage are all in later generations, so visiting
+        # the generations in reverse finalizes them before their parents
+        for generation in range(self.generations.max(initial=0), -1, -1):
+            stage_mask = self.generations == generation
+            edge_mask = stage_mask[src]
+            longest_child_path = np.zeros(self.num_stages)
+            np.maximum.at(longest_child_path, src[edge_mask], durations[dst[edge_mask]])
+            durations[stage_mask] += longest_child_path[stage_mask]
+
+        return durations
+
+    def _arrays(self) -> list[ndarray]:
+        return [
+            self.edge_links,
+            self.num_tasks,
+            self.rough_task_durations,
+            self.in_degrees,
+            self.child_idx,
+            self.child_ptr,
+            self.parent_idx,
+            self.parent_ptr,
+            self.source_ids,
+            self.generations,
+            self.critical_path_durations,
+        ]
@@ -1,3 +1,6 @@
+import numpy as np
+from numpy import ndarray
+
 from .task import Task
 
 
@@ -7,15 +10,20 @@ class Stage:
     ) -> None:
         self.id_ = id
         self.job_id = job_id
+        self.rough_task_duration = rough_task_duration
         self.most_recent_duration = rough_task_duration
         self.num_tasks = num_tasks
-        self.remaining_tasks = [
-            Task(id_=i, stage_id=self.id_, job_id=self.job_id) for i in range(num_tasks)
-        ]
         self.num_remaining_tasks = num_tasks
+
+        # task id -> id of executor that ran the task (-1 if none yet), and the
+        # times that the task was accepted and completed. Allocated when the
+        # first task is launched, since many stages never get to run.
+        self.task_executor_ids: ndarray | None = None
+        self.task_t_accepted: ndarray | None = None
+        self.task_t_completed: ndarray | None = None
+
         self.num_executing_tasks = 0
         self.num_completed_tasks = 0
-        self.is_schedulable = False
 
     def __hash__(self) -> int:
         return hash(self.pool_key)
@@ -50,13 +58,54 @@ class Stage:
     def approx_remaining_work(self) -> float:
         return self.most_recent_duration * self.num_remaining_tasks
 
+    def get_task(self, task_id: int) -> Task:
+        if self.task_executor_ids is None:
+            self._allocate_tasks()
+        return Task(self, task_id)
+
     def launch_next_task(self) -> Task:
         assert self.num_saturated_tasks < self.num_tasks
-        task = self.remaining_tasks.pop()
+        # tasks are launched in decreasing order of their ids, so the remaining
+        # tasks are always the ones with the lowest ids
         self.num_remaining_tasks -= 1
         self.num_executing_tasks += 1
-        return task
+        return self.get_task(self.num_remaining_tasks)
 
     def record_task_completion(self) -> None:
         self.num_executing_tasks -= 1
         self.num_completed_tasks += 1
+
+    def get_state(self) -> tuple[int, int, float]:
+        return (
+            self.num_executing_tasks,
+            self.num_completed_tasks,
+            self.most_recent_duration,
+        )
+
+    def set_state(self, state: tuple[int, int, float]) -> None:
+        (
+            self.num_executing_tasks,
+            self.num_completed_tasks,
+            self.most_recent_duration,
+        ) = state
+        num_remaining_tasks = (
+            self.num_tasks - self.num_executing_tasks - self.num_completed_tasks
+        )
+        self.num_remaining_tasks = num_remaining_tasks
+
+        # tasks that were launched since the state was captured are cleared
+        if self.task_executor_ids is not None:
+            self.task_executor_ids[:num_remaining_tasks] = -1
+            self.task_t_accepted[:num_remaining_tasks] = np.inf
+            self.task_t_completed[:num_remaining_tasks] = np.inf
+
+    def reset_state(self) -> None:
+        """returns the stage to its state from before its job arrived"""
+        self.set_state((0, 0, self.rough_task_duration))
+
+    # internal methods
+
+    def _allocate_tasks(self) -> None:
+        self.task_executor_ids = np.full(self.num_tasks, -1, dtype=int)
+        self.task_t_accepted = np.full(self.num_tasks, np.inf)
+        self.task_t_completed = np.full(self.num_tasks, np.inf)
@@ -0,0 +1,104 @@
+import numpy as np
+
+from .stage import Stage
+
+# columns of the node feature matrix: num remaining tasks, most recent task
+# duration, is stage schedulable
+NUM_NODE_FEATURES = 3
+
+
+class StageTable:
+    """Struct-of-arrays table that holds the per-stage state of every stage in
+    an episode. Rows are indexed by global stage index, i.e. the offset of the
+    stage's job in the episode's job pointer array, plus the stage's id.
+
+    The columns are preallocated and updated in place by the simulation, so
+    that observations can be built by slicing rather than by visiting stages
+    one at a time. The columns of the ready stage index are only ever accessed
+    one entry at a time, so they are plain sequences, which are much faster to
+    access than NumPy arrays.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._allocate(capacity)
+
+        # number of rows in use
+        self.num_stages = 0
+
+    def reset(self, num_stages: int = 0) -> None:
+        self.num_stages = 0
+        self.extend(num_stages)
+
+    def extend(self, num_stages: int) -> None:
+        """adds cleared rows to the table until it has `num_stages` rows, e.g.
+        when the stages of a newly sampled job are indexed. The existing rows
+        are kept.
+        """
+        if num_stages > self.capacity:
+            self._grow(max(num_stages, 2 * self.capacity))
+
+        rows = slice(self.num_stages, num_stages)
+        num_rows = max(num_stages - self.num_stages, 0)
+        self.features[rows] = 0
+        self.active[rows] = False
+        self.saturated[rows] = bytes(num_rows)
+        self.num_unsaturated_parents[rows] = [0] * num_rows
+        self.num_stages = max(self.num_stages, num_stages)
+
+    def add_job(self, base_stage_idx: int, stages: list[Stage]) -> None:
+        """fills in the rows of a newly arrived job's stages"""
+        for stage in stages:
+            stage_idx = base_stage_idx + stage.id_
+            self.num_remaining_tasks[stage_idx] = stage.num_remaining_tasks
+            self.most_recent_duration[stage_idx] = stage.most_recent_duration
+
+        self.active[base_stage_idx : base_stage_idx + len(stages)] = True
+
+    def get_state(self, num_stages: int) -> tuple:
+        return (
+            self.features[:num_stages].copy(),
+            self.active[:num_stages].copy(),
+            bytes(self.saturated[:num_stages]),
+            self.num_unsaturated_parents[:num_stages],
+        )
+
+    def set_state(self, state: tuple) -> None:
+        features, active, saturated, num_unsaturated_parents = state
+        num_stages = active.size
+        self.reset(num_stages)
+        self.features[:num_stages] = features
+        self.active[:num_stages] = active
+        self.saturated[:num_stages] = saturated
+        self.num_unsaturated_parents[:num_stages] = num_unsaturated_parents
+
+    @property
+    def capacity(self) -> int:
+        return self.active.size
+
+    # internal methods
+
+    def _allocate(self, capacity: int) -> None:
+        # node features of each stage, as they appear in observations
+        self.features = np.zeros((capacity, NUM_NODE_FEATURES), dtype=np.float32)
+
+        # column views into `features`
+        self.num_remaining_tasks = self.features[:, 0]
+        self.most_recent_duration = self.features[:, 1]
+        self.schedulable = self.features[:, 2]
+
+        # whether the stage's job has arrived and the stage is incomplete
+        self.active = np.zeros(capacity, dtype=bool)
+
+        # whether the stage's executor demand is non-positive
+        self.saturated = bytearray(capacity)
+
+        # number of the stage's parents that are unsaturated
+        self.num_unsaturated_parents = [0] * capacity
+
+    def _grow(self, capacity: int) -> None:
+        n = self.num_stages
+        old = self.features, self.active, self.saturated, self.num_unsaturated_parents
+        self._allocate(capacity)
+        new = self.features, self.active, self.saturated, self.num_unsaturated_parents
+        for new_arr, old_arr in zip(new, old):
+            new_arr[:n] = old_arr[:n]
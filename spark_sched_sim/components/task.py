@@ -1,16 +1,55 @@
-from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-import numpy as np
+if TYPE_CHECKING:
+    from .stage import Stage
 
 
-@dataclass
 class Task:
-    id_: int
-    stage_id: int
-    job_id: int
-    executor_id: int | None = None
-    t_accepted: float = np.inf
-    t_completed: float = np.inf
+    """View of one of a stage's tasks. The state of all of a stage's tasks is
+    stored in the stage's task arrays, so task objects hold no state of their
+    own, and are only created on demand, e.g. when a task is launched.
+    """
+
+    __slots__ = ("stage", "id_")
+
+    def __init__(self, stage: "Stage", id_: int) -> None:
+        self.stage = stage
+        self.id_ = id_
+
+    @property
+    def stage_id(self) -> int:
+        return self.stage.id_
+
+    @property
+    def job_id(self) -> int:
+        return self.stage.job_id
+
+    @property
+    def executor_id(self) -> int | None:
+        executor_id = self.stage.task_executor_ids[self.id_]
+        return int(executor_id) if executor_id >= 0 else None
+
+    @executor_id.setter
+    def executor_id(self, executor_id: int | None) -> None:
+        self.stage.task_executor_ids[self.id_] = (
+            executor_id if executor_id is not None else -1
+        )
+
+    @property
+    def t_accepted(self) -> float:
+        return float(self.stage.task_t_accepted[self.id_])
+
+    @t_accepted.setter
+    def t_accepted(self, t: float) -> None:
+        self.stage.task_t_accepted[self.id_] = t
+
+    @property
+    def t_completed(self) -> float:
+        return float(self.stage.task_t_completed[self.id_])
+
+    @t_completed.setter
+    def t_completed(self, t: float) -> None:
+        self.stage.task_t_completed[self.id_] = t
 
     @property
     def __unique_id(self) -> tuple[int, int, int]:
@@ -24,3 +63,9 @@ class Task:
             return self.__unique_id == other.__unique_id
         else:
             return False
+
+    def __repr__(self) -> str:
+        return (
+            f"Task(id_={self.id_}, stage_id={self.stage_id}, job_id={self.job_id}, "
+            f"executor_id={self.executor_id})"
+        )
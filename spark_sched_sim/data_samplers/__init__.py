@@ -1,9 +1,22 @@
-__all__ = ["DataSampler", "TPCHDataSampler", "make_data_sampler"]
+__all__ = [
+    "DataSampler",
+    "TPCHDataSampler",
+    "SyntheticDataSampler",
+    "TraceDataSampler",
+    "EventLogDataSampler",
+    "TraceRecorder",
+    "ReplayDataSampler",
+    "make_data_sampler",
+]
 
 from copy import deepcopy
 
 from .data_sampler import DataSampler
 from .tpch import TPCHDataSampler
+from .synthetic import SyntheticDataSampler
+from .trace import TraceDataSampler
+from .event_log import EventLogDataSampler
+from .replay import TraceRecorder, ReplayDataSampler
 
 
 def make_data_sampler(data_sampler_cfg):
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
+from typing import Any
 
 import numpy as np
 
@@ -9,9 +10,22 @@ from spark_sched_sim.components import Job, Stage, Task, Executor
 class DataSampler(ABC):
     np_random: np.random.Generator | None
 
+    # whether `job_sequence()` ends on its own, e.g. at the end of a trace, in
+    # which case episodes may run without any limit on job arrivals or time
+    finite: bool = False
+
     def reset(self, np_random: np.random.Generator):
         self.np_random = np_random
 
+    def get_state(self) -> Any:
+        """returns the sampler's state within an episode beyond that of
+        `np_random`, if any, for snapshots of the env
+        """
+        return None
+
+    def set_state(self, state: Any) -> None:
+        pass
+
     @abstractmethod
     def job_sequence(self, max_time: float) -> Iterable[tuple[float, Job]]:
         pass
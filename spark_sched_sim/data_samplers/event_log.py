@@ -0,0 +1,360 @@
+"""Ingestion of Spark event logs into packed datasets.
+
+Spark applications that run with `spark.eventLog.enabled` write a log with one
+JSON event per line. Ingesting a log reconstructs the stage dag of each of its
+successful jobs, along with the durations of its stages' tasks, keyed by wave
+and executor count as in the TPC-H dataset, and packs them into the same
+format as `tpch_packed.py` with one template per job. Logs are read one line
+at a time, and only the state of the jobs that are running at any point in
+the log is held, so logs of any size can be ingested.
+
+Each task's wave is determined by the previous task that its executor
+completed: 'fresh_durations' if there was none, or if it belonged to another
+job, 'rest_wave' if it belonged to the same stage, and 'first_wave' otherwise.
+Its executor key is the number of executors that were alive when it completed,
+rounded to the nearest of `EXECUTOR_LEVELS`. Stages that were skipped, e.g.
+because their output was reused from an earlier job, are dropped from their
+job's dag.
+
+The ingestion is run via `ingest_event_log.py EVENT_LOG [...] --out FILE`, or
+on demand by `EventLogDataSampler`, which caches its result.
+"""
+
+import gzip
+import json
+import os
+import os.path as osp
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+from collections import defaultdict
+from collections.abc import Iterator
+from functools import lru_cache
+
+import numpy as np
+
+from .tpch import TPCHDataSampler, EXECUTOR_LEVELS
+from .tpch_packed import (
+    WAVES,
+    load_packed_metadata,
+    pack_templates,
+    write_packed_dataset,
+)
+
+# events that are needed to reconstruct jobs. All others are skipped without
+# being parsed.
+INGESTED_EVENTS = {
+    "SparkListenerJobStart",
+    "SparkListenerJobEnd",
+    "SparkListenerTaskEnd",
+    "SparkListenerExecutorAdded",
+    "SparkListenerExecutorRemoved",
+}
+
+EVENT_PREFIX = '{"Event":"'
+
+# version of the ingestion, which is stored along with every ingested dataset.
+# Must be bumped whenever the ingestion changes, so that cached datasets are
+# ingested again.
+INGESTION_VERSION = 1
+
+
+class EventLogDataSampler(TPCHDataSampler):
+    """Samples jobs from the templates of a packed dataset that was ingested
+    from Spark event logs, and samples their task durations in the same way as
+    `TPCHDataSampler`. Jobs either arrive as a Poisson process with templates
+    sampled uniformly at random, or replay the jobs of the logs in the order
+    and at the times that they were submitted.
+    """
+
+    def __init__(
+        self,
+        job_arrival_rate: float,
+        job_arrival_cap: int,
+        num_executors: int,
+        warmup_delay: int,
+        event_log_paths: list[str] | None = None,
+        packed_dataset_path: str | None = None,
+        replay_arrivals: bool = False,
+        query_cache_size: int | None = 1024,
+        **kwargs,
+    ):
+        """
+        event_log_paths (optional list[str]): paths of Spark event logs, which
+            may be gzipped, to ingest into `packed_dataset_path`. Ingestion is
+            skipped if the packed dataset was ingested from exactly these logs,
+            with the same sizes and modification times, by the current version
+            of the ingestion.
+        packed_dataset_path (optional str): path of the packed dataset to
+            sample from, as written by `ingest_event_log.py`. Defaults to the
+            first event log's path with a `.packed` suffix.
+        replay_arrivals (bool): if set, then each of the logged jobs arrives
+            once, in the order and at the times that it was submitted, relative
+            to the first job. Otherwise, jobs arrive as a Poisson process
+            parameterized by `job_arrival_rate`.
+        query_cache_size (optional int): number of parsed job templates that
+            are kept in memory, as in `TPCHDataSampler`
+
+        The remaining arguments are the same as those of `TPCHDataSampler`.
+        """
+        # `TPCHDataSampler` would otherwise fall back to the TPC-H dataset,
+        # and download it if needed
+        if not (
+            event_log_paths or packed_dataset_path or kwargs.get("shared_dataset_name")
+        ):
+            raise ValueError("must provide either event logs or a packed dataset")
+
+        if event_log_paths:
+            if isinstance(event_log_paths, str):
+                event_log_paths = [event_log_paths]
+            packed_dataset_path = packed_dataset_path or f"{event_log_paths[0]}.packed"
+            if _is_stale(packed_dataset_path, event_log_paths):
+                ingest_event_logs(event_log_paths, packed_dataset_path)
+
+        super().__init__(
+            job_arrival_rate,
+            job_arrival_cap,
+            num_executors,
+            warmup_delay,
+            packed_dataset_path=packed_dataset_path,
+            query_cache_size=query_cache_size,
+            **kwargs,
+        )
+
+        # template index -> parsed template
+        self._load_parsed_query = lru_cache(maxsize=query_cache_size)(
+            self._parse_packed_template
+        )
+
+        self.replay_arrivals = replay_arrivals
+        self.num_templates = self.packed_dataset["template_stage_ptr"].size - 1
+
+    def _generate_job_sequence(self, max_time):
+        if not self.replay_arrivals:
+            yield from super()._generate_job_sequence(max_time)
+            return
+
+        submission_times = self.packed_dataset["template_submission_times"]
+        for job_idx in range(self.num_templates):
+            t = float(submission_times[job_idx] - submission_times[0])
+            if t >= max_time or job_idx == self.job_arrival_cap:
+                break
+            yield t, self._build_template_job(job_idx, t, job_idx)
+
+    def _sample_job(self, job_id, t_arrival):
+        template_idx = self.job_np_random.integers(self.num_templates)
+        return self._build_template_job(job_id, t_arrival, template_idx)
+
+    def _build_template_job(self, job_id, t_arrival, template_idx):
+        template, stage_params = self._load_parsed_query(template_idx)
+        job = self._build_job(job_id, t_arrival, template, stage_params)
+        job.template_idx = template_idx
+        return job
+
+
+def ingest_event_logs(event_log_paths: list[str], out_path: str) -> int:
+    """ingests the jobs of the Spark event logs at `event_log_paths` into a
+    packed dataset at `out_path`, and returns the number of ingested jobs
+    """
+    templates = []
+    submission_times = []
+    for path in event_log_paths:
+        for t_submitted, edge_links, stage_params in parse_event_log(path):
+            submission_times += [t_submitted]
+            templates += [(edge_links, stage_params)]
+
+    if not templates:
+        raise ValueError("no successful jobs found in the event logs")
+
+    # jobs are ordered by submission, across all the logs
+    order = np.argsort(submission_times, kind="stable")
+    arrays = pack_templates(templates[i] for i in order)
+    arrays["template_submission_times"] = np.array(submission_times)[order]
+    write_packed_dataset(out_path, arrays, _ingestion_metadata(event_log_paths))
+    return len(templates)
+
+
+def parse_event_log(path: str) -> Iterator[tuple[float, np.ndarray, list[tuple]]]:
+    """streams the Spark event log at `path`, and generates the submission
+    time, edge links and stage params (see `pack_templates()`) of each of its
+    successful jobs, as each job ends
+    """
+    # job id -> submission time, and stage id -> info, for the running jobs
+    job_submission_times: dict[int, float] = {}
+    job_stage_infos: dict[int, dict[int, dict]] = {}
+
+    # stage id -> id of the running job that submitted it
+    stage_job_ids: dict[int, int] = {}
+
+    # stage id -> wave -> executor key -> durations of its successful tasks
+    stage_durations: dict[int, dict[str, defaultdict]] = {}
+
+    # ids of the executors that are alive, and executor id -> job id and
+    # stage id of the last task that it completed
+    executor_ids: set[str] = set()
+    last_tasks: dict[str, tuple[int, int]] = {}
+
+    for event_name, event in _read_events(path):
+        if event_name == "SparkListenerExecutorAdded":
+            executor_ids.add(event["Executor ID"])
+
+        elif event_name == "SparkListenerExecutorRemoved":
+            executor_ids.discard(event["Executor ID"])
+            last_tasks.pop(event["Executor ID"], None)
+
+        elif event_name == "SparkListenerJobStart":
+            job_id = event["Job ID"]
+            job_submission_times[job_id] = float(event["Submission Time"])
+            job_stage_infos[job_id] = {
+                info["Stage ID"]: info for info in event["Stage Infos"]
+            }
+            for info in event["Stage Infos"]:
+                # stages that an earlier running job also depends on are
+                # run by that job
+                stage_job_ids.setdefault(info["Stage ID"], job_id)
+
+        elif event_name == "SparkListenerTaskEnd":
+            task_info = event["Task Info"]
+            stage_id = event["Stage ID"]
+            job_id = stage_job_ids.get(stage_id)
+            if (
+                job_id is None
+                or task_info.get("Failed")
+                or task_info.get("Killed")
+                or event["Task End Reason"]["Reason"] != "Success"
+            ):
+                continue
+
+            executor_id = task_info["Executor ID"]
+            last_task = last_tasks.get(executor_id)
+            if last_task is None or last_task[0] != job_id:
+                wave = "fresh_durations"
+            elif last_task[1] == stage_id:
+                wave = "rest_wave"
+            else:
+                wave = "first_wave"
+            last_tasks[executor_id] = (job_id, stage_id)
+
+            executor_key = _executor_key(max(len(executor_ids), 1))
+            duration = task_info["Finish Time"] - task_info["Launch Time"]
+            durations = stage_durations.setdefault(
+                stage_id, {wave: defaultdict(list) for wave in WAVES}
+            )
+            durations[wave][executor_key] += [float(duration)]
+
+        elif event_name == "SparkListenerJobEnd":
+            job_id = event["Job ID"]
+            t_submitted = job_submission_times.pop(job_id, None)
+            stage_infos = job_stage_infos.pop(job_id, {})
+            job_durations = {}
+            for stage_id in stage_infos:
+                if stage_job_ids.get(stage_id) == job_id:
+                    del stage_job_ids[stage_id]
+                    if stage_id in stage_durations:
+                        job_durations[stage_id] = stage_durations.pop(stage_id)
+
+            succeeded = event["Job Result"]["Result"] == "JobSucceeded"
+            if succeeded and t_submitted is not None and job_durations:
+                yield (
+                    t_submitted,
+                    *_build_template(stage_infos, job_durations),
+                )
+
+
+def _read_events(path: str) -> Iterator[tuple[str, dict]]:
+    """generates the name and contents of the events in the log at `path`
+    that are needed for ingestion, one line at a time
+    """
+    open_fn = gzip.open if path.endswith(".gz") else open
+    with open_fn(path, "rt") as fp:
+        for line in fp:
+            # Spark writes compact JSON, whose event name can be read without
+            # parsing the rest of the line, which is much faster for the many
+            # events that are skipped
+            if line.startswith(EVENT_PREFIX):
+                end = line.find('"', len(EVENT_PREFIX))
+                event_name = line[len(EVENT_PREFIX) : end]
+                if event_name in INGESTED_EVENTS:
+                    yield event_name, json.loads(line)
+            elif line.strip():
+                event = json.loads(line)
+                if event.get("Event") in INGESTED_EVENTS:
+                    yield event["Event"], event
+
+
+def _build_template(
+    stage_infos: dict[int, dict], stage_durations: dict[int, dict[str, defaultdict]]
+) -> tuple[np.ndarray, list[tuple]]:
+    """returns the edge links and stage params of a job, among the stages
+    that ran any tasks, whose ids are relabelled in increasing order
+    """
+    stage_ids = sorted(stage_durations)
+    local_ids = {stage_id: i for i, stage_id in enumerate(stage_ids)}
+
+    edge_links = np.array(
+        [
+            (local_ids[parent_id], local_ids[stage_id])
+            for stage_id in stage_ids
+            for parent_id in stage_infos[stage_id]["Parent IDs"]
+            if parent_id in local_ids
+        ],
+        dtype=int,
+    ).reshape(-1, 2)
+    edge_links = np.unique(edge_links, axis=0)
+
+    stage_params = []
+    for stage_id in stage_ids:
+        data = {wave: dict(stage_durations[stage_id][wave]) for wave in WAVES}
+        all_durations = [d for wave in WAVES for ds in data[wave].values() for d in ds]
+
+        # every executor key needs first wave durations to fall back to, which
+        # are borrowed from the other waves where missing
+        executor_keys = set().union(*(data[wave] for wave in WAVES))
+        for key in executor_keys:
+            if not data["first_wave"].get(key):
+                fresh, rest = data["fresh_durations"], data["rest_wave"]
+                data["first_wave"][key] = fresh.get(key) or rest.get(key)
+
+        num_tasks = stage_infos[stage_id]["Number of Tasks"]
+        stage_params += [(num_tasks, float(np.mean(all_durations)), data)]
+
+    return edge_links, stage_params
+
+
+def _executor_key(num_executors: int) -> int:
+    levels = np.array(EXECUTOR_LEVELS)
+    return int(levels[np.abs(levels - num_executors).argmin()])
+
+
+def _ingestion_metadata(event_log_paths: list[str]) -> dict:
+    """returns what a packed dataset that is ingested from the logs at
+    `event_log_paths` is stored with, to tell whether it is stale later on
+    """
+    event_logs = []
+    for path in event_log_paths:
+        stat = os.stat(path)
+        event_logs += [[osp.abspath(path), stat.st_size, stat.st_mtime_ns]]
+    return {"ingestion_version": INGESTION_VERSION, "event_logs": event_logs}
+
+
+def _is_stale(packed_dataset_path: str, event_log_paths: list[str]) -> bool:
+    """a packed dataset is stale unless it was ingested from exactly the logs at
+    `event_log_paths`, as they are now, by the current version of the ingestion
+    """
+    if not osp.exists(packed_dataset_path):
+        return True
+    try:
+        metadata = load_packed_metadata(packed_dataset_path)
+    except ValueError:
+        return True
+    return metadata != _ingestion_metadata(event_log_paths)
+
+
+def main():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("event_logs", nargs="+")
+    parser.add_argument("--out", default="data/eventlog.packed")
+    args = parser.parse_args()
+
+    num_jobs = ingest_event_logs(args.event_logs, args.out)
+    print(f"{num_jobs} jobs written to {args.out}")
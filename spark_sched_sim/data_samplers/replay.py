@@ -0,0 +1,187 @@
+import os.path as osp
+import pathlib
+from typing import Any
+
+import numpy as np
+
+from .data_sampler import DataSampler
+from ..components import Job, JobTemplate, Stage
+from ..utils import counts_to_ptr
+
+# names of the arrays that make up a trace, each stored as `<name>.npy`
+TRACE_ARRAYS = [
+    # job index -> arrival time
+    "job_arrival_times",
+    # CSR offsets of each job's stages, edges and tasks, such that e.g. the
+    # stages of job `j` are `job_stage_ptr[j]:job_stage_ptr[j+1]`
+    "job_stage_ptr",
+    "job_edge_ptr",
+    "stage_task_ptr",
+    # stage index -> number of tasks, and mean task duration
+    "stage_num_tasks",
+    "stage_rough_durations",
+    # edge index -> (parent stage id, child stage id), local to each job
+    "edge_links",
+    # task index -> duration that was sampled for the task, or NaN if the task
+    # never ran while recording
+    "task_durations",
+]
+
+
+class TraceRecorder(DataSampler):
+    """Wraps another data sampler, and records every job arrival and task
+    duration that it samples during an episode, so that the episode's trace can
+    be saved via `save()` and replayed by `ReplayDataSampler`.
+
+    Enabled by setting `data_sampler_cls` to 'TraceRecorder', and
+    `recorded_data_sampler_cls` to the class of the data sampler to record.
+    A new trace is started upon every reset.
+    """
+
+    def __init__(self, recorded_data_sampler_cls: str, **kwargs):
+        from . import make_data_sampler
+
+        self.data_sampler = make_data_sampler(
+            kwargs | {"data_sampler_cls": recorded_data_sampler_cls}
+        )
+        self.np_random = None
+        self.jobs: list[Job] = []
+
+        # job id -> array of the sampled durations of all of its tasks
+        self.task_durations: dict[int, np.ndarray] = {}
+
+    def reset(self, np_random: np.random.Generator):
+        self.np_random = np_random
+        self.data_sampler.reset(np_random)
+        self.jobs = []
+        self.task_durations = {}
+
+    def job_sequence(self, max_time):
+        # jobs are recorded as they are consumed, so the recorded sampler's
+        # job sequence can still be streamed
+        for t, job in self.data_sampler.job_sequence(max_time):
+            self.jobs += [job]
+            num_tasks = sum(stage.num_tasks for stage in job.stages)
+            self.task_durations[job.id_] = np.full(num_tasks, np.nan)
+
+            # offset of each stage's first task within its job's durations
+            offset = 0
+            for stage in job.stages:
+                stage.trace_offset = offset
+                offset += stage.num_tasks
+
+            yield t, job
+
+    def get_state(self):
+        return self.data_sampler.get_state()
+
+    def set_state(self, state):
+        self.data_sampler.set_state(state)
+
+    def task_duration(self, job, stage, task, executor):
+        duration = self.data_sampler.task_duration(job, stage, task, executor)
+        self.task_durations[job.id_][stage.trace_offset + task.id_] = duration
+        return duration
+
+    def save(self, trace_dir: str) -> None:
+        """writes the current episode's trace to the directory `trace_dir`"""
+        stages = [stage for job in self.jobs for stage in job.stages]
+        arrays = {
+            "job_arrival_times": np.array([job.t_arrival for job in self.jobs]),
+            "job_stage_ptr": counts_to_ptr([job.num_stages for job in self.jobs]),
+            "job_edge_ptr": counts_to_ptr([len(job.edge_links) for job in self.jobs]),
+            "stage_task_ptr": counts_to_ptr([stage.num_tasks for stage in stages]),
+            "stage_num_tasks": np.array([stage.num_tasks for stage in stages]),
+            "stage_rough_durations": np.array(
+                [stage.rough_task_duration for stage in stages]
+            ),
+            "edge_links": np.vstack(
+                [np.empty((0, 2), dtype=int)] + [job.edge_links for job in self.jobs]
+            ),
+            "task_durations": np.concatenate(
+                [np.empty(0)] + [self.task_durations[job.id_] for job in self.jobs]
+            ),
+        }
+
+        pathlib.Path(trace_dir).mkdir(parents=True, exist_ok=True)
+        for name in TRACE_ARRAYS:
+            np.save(osp.join(trace_dir, f"{name}.npy"), arrays[name])
+
+
+class ReplayDataSampler(DataSampler):
+    """Replays a trace that was saved by `TraceRecorder`, without loading any
+    query files or drawing any random numbers. Every episode sees the same job
+    sequence, and each task takes the duration that it took while recording,
+    regardless of which executor runs it. Tasks that never ran while recording
+    take their stage's mean task duration.
+    """
+
+    finite = True
+
+    def __init__(
+        self, trace_dir: str, job_arrival_cap: int | None = None, **kwargs: Any
+    ):
+        """
+        trace_dir (str): directory of the trace to replay
+        job_arrival_cap: (optional int): limit on the number of jobs that
+            arrive throughout the simulation. If set to `None`, then all the
+            jobs in the trace arrive, subject to the episode's time limit, if
+            any. Without a time limit, the episode ends once every job in the
+            trace has completed.
+        """
+        self.job_arrival_cap = job_arrival_cap
+        self.np_random = None
+
+        # the arrays are memory-mapped, so only the pages that are used get
+        # loaded, and they are shared among all processes replaying the trace.
+        # They are viewed as plain arrays, which are faster to index.
+        self.trace = {
+            name: np.load(osp.join(trace_dir, f"{name}.npy"), mmap_mode="r").view(
+                np.ndarray
+            )
+            for name in TRACE_ARRAYS
+        }
+
+    def job_sequence(self, max_time):
+        """jobs are loaded lazily, as the simulation reaches their arrival"""
+        arrival_times = self.trace["job_arrival_times"]
+        num_jobs = arrival_times.size
+        if self.job_arrival_cap:
+            num_jobs = min(num_jobs, self.job_arrival_cap)
+
+        for job_id in range(num_jobs):
+            t_arrival = float(arrival_times[job_id])
+            if t_arrival >= max_time:
+                break
+            yield t_arrival, self._load_job(job_id, t_arrival)
+
+    def task_duration(self, job, stage, task, executor):
+        duration = self.trace["task_durations"][stage.trace_offset + task.id_]
+        if np.isnan(duration):
+            return stage.rough_task_duration
+        return float(duration)
+
+    def _load_job(self, job_id: int, t_arrival: float) -> Job:
+        trace = self.trace
+        stage_start, stage_end = trace["job_stage_ptr"][job_id : job_id + 2]
+        edge_start, edge_end = trace["job_edge_ptr"][job_id : job_id + 2]
+
+        template = JobTemplate(
+            np.array(trace["edge_links"][edge_start:edge_end]),
+            trace["stage_num_tasks"][stage_start:stage_end].tolist(),
+            trace["stage_rough_durations"][stage_start:stage_end].tolist(),
+        )
+
+        stages = []
+        for stage_id, i in enumerate(range(stage_start, stage_end)):
+            stage = Stage(
+                stage_id,
+                job_id,
+                int(trace["stage_num_tasks"][i]),
+                float(trace["stage_rough_durations"][i]),
+            )
+            # offset of the stage's first task in the trace's durations
+            stage.trace_offset = int(trace["stage_task_ptr"][i])
+            stages += [stage]
+
+        return Job(job_id, stages, template, t_arrival)
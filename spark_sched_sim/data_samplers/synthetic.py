@@ -0,0 +1,219 @@
+import numpy as np
+
+from .data_sampler import DataSampler
+from ..components import Job, JobTemplate, Stage
+
+# names of the dag families that jobs can be sampled from
+DAG_FAMILIES = ["fan_out", "chain", "layered", "diamond"]
+
+
+class SyntheticDataSampler(DataSampler):
+    """Samples jobs with synthetic dags from parameterized families, along
+    with their task durations, without needing any dataset. Meant for stress
+    testing the simulator and schedulers at larger stage counts than those of
+    the TPC-H queries.
+
+    Every random quantity of a job is drawn in bulk when the job is sampled,
+    including the durations of all of its tasks, so jobs are streamed as the
+    simulation reaches their arrival, and sampling a task's duration draws no
+    random numbers.
+    """
+
+    def __init__(
+        self,
+        job_arrival_rate: float,
+        job_arrival_cap: int,
+        warmup_delay: int,
+        dag_families: list[str] = DAG_FAMILIES,
+        num_stages: tuple[int, int] = (10, 100),
+        num_tasks: tuple[int, int] = (1, 200),
+        task_duration: tuple[float, float] = (1e3, 1e4),
+        task_duration_sigma: float = 0.5,
+        layered_extra_parents: float = 1.0,
+        diamond_width: tuple[int, int] = (2, 8),
+        **kwargs,
+    ):
+        """
+        job_arrival_rate (float): non-negative number that controls how
+            quickly new jobs arrive into the system. This is the parameter
+            of an exponential distributions, and so its inverse is the
+            mean job inter-arrival time in ms.
+        job_arrival_cap: (optional int): limit on the number of jobs that
+            arrive throughout the simulation. If set to `None`, then the
+            episode ends when a time limit is reached.
+        warmup_delay (int): an executor is slower on its first task from
+            a stage if it was previously idle or moving jobs, which is
+            caputred by adding a warmup delay (ms) to the task duration
+        dag_families (list[str]): families that each job's dag is sampled
+            from uniformly at random, among
+            - 'fan_out': a single stage on which all the others depend
+            - 'chain': each stage depends on the previous one
+            - 'layered': stages are split into random layers, where every
+                stage depends on a random stage of the previous layer, and
+                on `layered_extra_parents` stages of earlier layers on average
+            - 'diamond': alternating layers of a single stage and of
+                `diamond_width` parallel stages, where every stage depends on
+                all the stages of the previous layer
+        num_stages (tuple[int, int]): range of the number of stages per job
+        num_tasks (tuple[int, int]): range of the number of tasks per stage
+        task_duration (tuple[float, float]): range of the mean task duration
+            (ms) of each stage, which is sampled log-uniformly
+        task_duration_sigma (float): the task durations of a stage follow a
+            lognormal distribution around its mean, with this shape parameter
+        layered_extra_parents (float): expected number of additional
+            dependencies of each stage on stages of earlier layers in 'layered'
+            dags, which keeps the number of edges linear in the number of
+            stages
+        diamond_width (tuple[int, int]): range of the number of parallel
+            stages per layer in 'diamond' dags
+        """
+        for family in dag_families:
+            assert family in DAG_FAMILIES, f"'{family}' is not a valid dag family."
+
+        self.job_arrival_cap = job_arrival_cap
+        self.mean_interarrival_time = 1 / job_arrival_rate
+        self.warmup_delay = warmup_delay
+        self.dag_families = list(dag_families)
+        self.num_stages = num_stages
+        self.num_tasks = num_tasks
+        self.log_task_duration = np.log(task_duration)
+        self.task_duration_sigma = task_duration_sigma
+        self.layered_extra_parents = layered_extra_parents
+        self.diamond_width = diamond_width
+        self.np_random = None
+
+    def job_sequence(self, max_time):
+        """generates a sequence of job arrivals over time, which follow a
+        Poisson process parameterized by `self.job_arrival_rate`
+        """
+        assert self.np_random
+        t = 0
+        job_idx = 0
+        while t < max_time and (
+            not self.job_arrival_cap or job_idx < self.job_arrival_cap
+        ):
+            yield t, self._sample_job(job_idx, t)
+
+            # sample time in ms until next arrival
+            t += self.np_random.exponential(self.mean_interarrival_time)
+            job_idx += 1
+
+    def task_duration(self, job, stage, task, executor):
+        duration = stage.task_durations[task.id_]
+        if executor.is_idle:
+            duration += self.warmup_delay
+        return float(duration)
+
+    def _sample_job(self, job_id, t_arrival):
+        rng = self.np_random
+        family = self.dag_families[rng.integers(len(self.dag_families))]
+        num_stages = rng.integers(self.num_stages[0], self.num_stages[1] + 1)
+        edge_links = getattr(self, f"_sample_{family}_edges")(num_stages)
+
+        num_tasks = rng.integers(
+            self.num_tasks[0], self.num_tasks[1] + 1, size=num_stages
+        )
+        rough_durations = np.exp(rng.uniform(*self.log_task_duration, size=num_stages))
+
+        # lognormal durations whose mean is their stage's rough duration
+        sigma = self.task_duration_sigma
+        task_durations = np.repeat(rough_durations, num_tasks) * rng.lognormal(
+            -(sigma**2) / 2, sigma, size=num_tasks.sum()
+        )
+        task_ptr = np.concatenate([[0], np.cumsum(num_tasks)])
+
+        template = JobTemplate(edge_links, num_tasks.tolist(), rough_durations.tolist())
+
+        stages = []
+        for stage_id in range(num_stages):
+            stage = Stage(
+                stage_id,
+                job_id,
+                int(num_tasks[stage_id]),
+                float(rough_durations[stage_id]),
+            )
+            stage.task_durations = task_durations[
+                task_ptr[stage_id] : task_ptr[stage_id + 1]
+            ]
+            stages += [stage]
+
+        job = Job(job_id, stages, template, t_arrival)
+        job.dag_family = family
+        return job
+
+    # dag families, which return sorted edge links whose parents have lower
+    # stage ids than their children
+
+    def _sample_fan_out_edges(self, num_stages):
+        children = np.arange(1, num_stages)
+        return np.column_stack((np.zeros_like(children), children))
+
+    def _sample_chain_edges(self, num_stages):
+        parents = np.arange(num_stages - 1)
+        return np.column_stack((parents, parents + 1))
+
+    def _sample_layered_edges(self, num_stages):
+        rng = self.np_random
+
+        # random layer boundaries, with the first layer starting at stage 0
+        num_layers = rng.integers(1, num_stages + 1)
+        boundaries = np.sort(
+            rng.choice(np.arange(1, num_stages), size=num_layers - 1, replace=False)
+        )
+        layer_ptr = np.concatenate([[0], boundaries, [num_stages]])
+        layers = np.repeat(np.arange(num_layers), np.diff(layer_ptr))
+
+        # every stage past the first layer depends on a random stage of the
+        # previous layer
+        children = np.arange(layer_ptr[1], num_stages)
+        prev_layers = layers[children] - 1
+        parents = rng.integers(layer_ptr[prev_layers], layer_ptr[prev_layers + 1])
+
+        # each stage also gets a binomial number of random additional parents
+        # among the stages of the earlier layers, with `layered_extra_parents`
+        # of them on average (or all of them, if there are fewer), of which
+        # duplicates are dropped
+        num_earlier = layer_ptr[layers]
+        edge_prob = np.minimum(
+            self.layered_extra_parents / np.maximum(num_earlier, 1), 1
+        )
+        num_extra = rng.binomial(num_earlier, edge_prob)
+        extra_children = np.repeat(np.arange(num_stages), num_extra)
+        extra_parents = (
+            rng.random(extra_children.size) * num_earlier[extra_children]
+        ).astype(int)
+
+        edge_links = np.concatenate(
+            [
+                np.column_stack((parents, children)),
+                np.column_stack((extra_parents, extra_children)),
+            ]
+        )
+        return np.unique(edge_links.reshape(-1, 2), axis=0)
+
+    def _sample_diamond_edges(self, num_stages):
+        width = self.np_random.integers(
+            self.diamond_width[0], self.diamond_width[1] + 1
+        )
+
+        # layer sizes alternate between 1 and `width`, truncated to the number
+        # of stages
+        num_layers = 1 + 2 * -(-num_stages // (width + 1))
+        layer_sizes = np.where(np.arange(num_layers) % 2, width, 1)
+        layer_ptr = np.minimum(
+            np.concatenate([[0], np.cumsum(layer_sizes)]), num_stages
+        )
+
+        edge_links = [
+            np.array(
+                np.meshgrid(
+                    np.arange(layer_ptr[i], layer_ptr[i + 1]),
+                    np.arange(layer_ptr[i + 1], layer_ptr[i + 2]),
+                    indexing="ij",
+                )
+            )
+            .reshape(2, -1)
+            .T
+            for i in range(num_layers - 1)
+        ]
+        return np.concatenate(edge_links)
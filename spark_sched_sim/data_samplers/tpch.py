@@ -1,19 +1,45 @@
 import os.path as osp
 import pathlib
+from functools import lru_cache
 from io import BytesIO
 from zipfile import ZipFile
 from urllib.request import urlopen
 
 import numpy as np
-import networkx as nx
 
 from .data_sampler import DataSampler
-from ..components import Job, Stage
+from .tpch_packed import (
+    WAVES,
+    attach_packed_dataset,
+    load_packed_dataset,
+    template_id,
+)
+from ..components import Job, JobTemplate, Stage
 
 TPCH_URL = "https://bit.ly/3F1Go8t"
 QUERY_SIZES = ["2g", "5g", "10g", "20g", "50g", "80g", "100g"]
 NUM_QUERIES = 22
 
+# numbers of executors at which task durations were recorded
+EXECUTOR_LEVELS = [5, 10, 20, 40, 50, 60, 80, 100]
+
+# what an executor was doing before it got a task, which determines the waves
+# that the task's duration is sampled from
+IDLE, SAME_STAGE, OTHER_STAGE = range(3)
+
+# executor situation -> waves to sample from in order of preference, and
+# whether a warmup delay is added to durations from that wave
+WAVE_PREFERENCES = [
+    # the executor was just sitting idly or moving between jobs, so it needs
+    # time to warm up
+    [("fresh_durations", False), ("first_wave", True)],
+    # the executor is continuing work on the same stage, which is relatively
+    # fast
+    [("rest_wave", False), ("first_wave", False), ("fresh_durations", False)],
+    # the executor is new to this stage
+    [("first_wave", False), ("fresh_durations", False)],
+]
+
 
 class TPCHDataSampler(DataSampler):
     def __init__(
@@ -22,6 +48,11 @@ class TPCHDataSampler(DataSampler):
         job_arrival_cap: int,
         num_executors: int,
         warmup_delay: int,
+        stream_job_arrivals: bool = False,
+        query_cache_size: int | None = len(QUERY_SIZES) * NUM_QUERIES,
+        packed_dataset_path: str | None = None,
+        shared_dataset_name: str | None = None,
+        task_duration_block_size: int = 0,
         **kwargs,
     ):
         """
@@ -37,40 +68,90 @@ class TPCHDataSampler(DataSampler):
         warmup_delay (int): an executor is slower on its first task from
             a stage if it was previously idle or moving jobs, which is
             caputred by adding a warmup delay (ms) to the task duration
+        stream_job_arrivals (bool): if set, then jobs are sampled lazily as
+            the simulation reaches their arrival, rather than all at once upon
+            reset. Streamed jobs are sampled from their own random number
+            generator, so the task durations differ from those of the same
+            seed without streaming.
+        query_cache_size (optional int): number of parsed and preprocessed
+            queries that are kept in memory, with least recently used ones
+            evicted first. Defaults to all of them. If set to `None`, then the
+            cache is unbounded, and if set to 0, then every sampled job is
+            loaded from disk.
+        packed_dataset_path (optional str): path of a packed dataset, as built
+            by `tpch_packed.py`, which is memory-mapped and sampled from
+            instead of the extracted dataset. In that case, the extracted
+            dataset is neither needed nor downloaded.
+        shared_dataset_name (optional str): name of a shared memory block that
+            holds a packed dataset, as created by `share_packed_dataset()`,
+            which is attached to and sampled from instead of any dataset on
+            disk. Takes precedence over `packed_dataset_path`.
+        task_duration_block_size (int): if positive, then the random numbers
+            behind task durations are drawn from the generator in blocks of
+            this size, rather than one or two at a time. This changes the
+            sampled durations relative to the default of 0.
         """
         self.job_arrival_cap = job_arrival_cap
         self.mean_interarrival_time = 1 / job_arrival_rate
         self.warmup_delay = warmup_delay
+        self.stream_job_arrivals = stream_job_arrivals
+        self.task_duration_block_size = task_duration_block_size
 
         self.np_random = None
+        self.job_np_random = None
         self._init_executor_intervals(num_executors)
 
-        if not osp.isdir("data/tpch"):
+        # pre-drawn random integers, and position of the next one to use
+        self._block: list[int] = []
+        self._block_pos = 0
+
+        # (query num, query size) -> parsed query
+        self._shared_memory = None
+        if shared_dataset_name:
+            self._shared_memory, self.packed_dataset = attach_packed_dataset(
+                shared_dataset_name
+            )
+            parse_query = self._parse_packed_query
+        elif packed_dataset_path:
+            self.packed_dataset = load_packed_dataset(packed_dataset_path)
+            parse_query = self._parse_packed_query
+        else:
+            self.packed_dataset = None
+            parse_query = self._parse_query
+        self._load_parsed_query = lru_cache(maxsize=query_cache_size)(parse_query)
+
+        if not self.packed_dataset and not osp.isdir("data/tpch"):
             self._download_tpch_dataset()
 
     def reset(self, np_random: np.random.Generator):
         self.np_random = np_random
 
+        # streamed jobs get their own generator, so that sampling them in
+        # between the task durations doesn't perturb either sequence
+        if self.stream_job_arrivals:
+            self.job_np_random = np.random.default_rng(np_random.integers(2**63))
+        else:
+            self.job_np_random = np_random
+
+        self._block = []
+        self._block_pos = 0
+
+    def get_state(self):
+        return self._block, self._block_pos
+
+    def set_state(self, state):
+        # blocks are replaced rather than modified, so they can be shared
+        self._block, self._block_pos = state
+
     def job_sequence(self, max_time):
         """generates a sequence of job arrivals over time, which follow a
         Poisson process parameterized by `self.job_arrival_rate`
         """
         assert self.np_random
-        job_sequence = []
-
-        t = 0
-        job_idx = 0
-        while t < max_time and (
-            not self.job_arrival_cap or job_idx < self.job_arrival_cap
-        ):
-            job = self._sample_job(job_idx, t)
-            job_sequence.append((t, job))
-
-            # sample time in ms until next arrival
-            t += self.np_random.exponential(self.mean_interarrival_time)
-            job_idx += 1
-
-        return job_sequence
+        job_sequence = self._generate_job_sequence(max_time)
+        if self.stream_job_arrivals:
+            return job_sequence
+        return list(job_sequence)
 
     def task_duration(self, job, stage, task, executor):
         num_local_executors = len(job.local_executors)
@@ -78,32 +159,37 @@ class TPCHDataSampler(DataSampler):
         assert num_local_executors > 0
         assert self.np_random
 
-        data = stage.task_duration_data
+        if executor.is_idle:
+            situation = IDLE
+        elif executor.task.stage_id == task.stage_id:
+            situation = SAME_STAGE
+        else:
+            situation = OTHER_STAGE
 
         # sample an executor point in the data
-        executor_key = self._sample_executor_key(data, num_local_executors)
+        executor_key = self._sample_executor_key(num_local_executors)
 
-        if executor.is_idle:
-            # the executor was just sitting idly or moving between jobs, so it needs time to warm up
-            try:
-                return self._sample_task_duration(data, "fresh_durations", executor_key)
-            except (ValueError, KeyError):
-                return self._sample_task_duration(
-                    data, "first_wave", executor_key, warmup=True
-                )
+        entry = stage.duration_table[situation][executor_key]
+        if entry is None:
+            raise ValueError(f"no task durations recorded for stage {stage.id_}")
+        durations, warmup = entry
+
+        duration = float(durations[self._random_index(len(durations))])
+        if warmup:
+            duration += self.warmup_delay
+        return duration
 
-        if executor.task.stage_id == task.stage_id:
-            # the executor is continuing work on the same stage, which is relatively fast
-            try:
-                return self._sample_task_duration(data, "rest_wave", executor_key)
-            except (ValueError, KeyError):
-                pass
+    def _generate_job_sequence(self, max_time):
+        t = 0
+        job_idx = 0
+        while t < max_time and (
+            not self.job_arrival_cap or job_idx < self.job_arrival_cap
+        ):
+            yield t, self._sample_job(job_idx, t)
 
-        # the executor is new to this stage (or 'rest_wave' data was not available)
-        try:
-            return self._sample_task_duration(data, "first_wave", executor_key)
-        except (ValueError, KeyError):
-            return self._sample_task_duration(data, "fresh_durations", executor_key)
+            # sample time in ms until next arrival
+            t += self.job_np_random.exponential(self.mean_interarrival_time)
+            job_idx += 1
 
     @classmethod
     def _download_tpch_dataset(cls):
@@ -115,8 +201,8 @@ class TPCHDataSampler(DataSampler):
         print("Done.", flush=True)
 
     @classmethod
-    def _load_query(cls, query_num, query_size):
-        query_path = osp.join("data/tpch", str(query_size))
+    def _load_query(cls, query_num, query_size, tpch_dir="data/tpch"):
+        query_path = osp.join(tpch_dir, str(query_size))
 
         adj_matrix = np.load(
             osp.join(query_path, f"adj_mat_{query_num}.npy"), allow_pickle=True
@@ -174,12 +260,37 @@ class TPCHDataSampler(DataSampler):
         return np.mean(all_durations)
 
     def _sample_job(self, job_id, t_arrival):
-        query_num = 1 + self.np_random.integers(NUM_QUERIES)
-        query_size = self.np_random.choice(QUERY_SIZES)
-        adj_mat, task_duration_data = self._load_query(query_num, query_size)
+        query_num = 1 + self.job_np_random.integers(NUM_QUERIES)
+        query_size = self.job_np_random.choice(QUERY_SIZES)
+        template, stage_params = self._load_parsed_query(query_num, query_size)
 
-        num_stages = adj_mat.shape[0]
+        job = self._build_job(job_id, t_arrival, template, stage_params)
+        job.query_num = query_num
+        job.query_size = query_size
+        return job
+
+    def _build_job(self, job_id, t_arrival, template, stage_params):
         stages = []
+        for stage_id, (num_tasks, rough_duration, data, duration_table) in enumerate(
+            stage_params
+        ):
+            stage = Stage(stage_id, job_id, num_tasks, rough_duration)
+            stage.task_duration_data = data
+            stage.duration_table = duration_table
+            stages += [stage]
+
+        return Job(job_id, stages, template, t_arrival)
+
+    @classmethod
+    def _parse_query(cls, query_num, query_size, tpch_dir="data/tpch"):
+        """loads a query from disk and preprocesses it into its job template
+        and the parameters of each of its stages, which are shared by all the
+        jobs that are sampled from the query and must not be modified
+        """
+        adj_mat, task_duration_data = cls._load_query(query_num, query_size, tpch_dir)
+
+        num_stages = adj_mat.shape[0]
+        stage_params = []
         for stage_id in range(num_stages):
             data = task_duration_data[stage_id]
             e = next(iter(data["first_wave"]))
@@ -188,54 +299,135 @@ class TPCHDataSampler(DataSampler):
 
             # remove fresh duration from first wave duration
             # drag nearest neighbor first wave duration to empty spots
-            self._pre_process_task_duration(data)
+            cls._pre_process_task_duration(data)
+
+            stage_params += [
+                (
+                    num_tasks,
+                    cls._rough_task_duration(data),
+                    data,
+                    cls._resolve_duration_table(data),
+                )
+            ]
 
-            # generate a node
-            stage = Stage(stage_id, job_id, num_tasks, self._rough_task_duration(data))
-            stage.task_duration_data = data
-            stages += [stage]
+        # generate DAG, with edges in row-major order
+        edge_links = np.argwhere(adj_mat)
 
-        # generate DAG
-        dag = nx.from_numpy_array(adj_mat, create_using=nx.DiGraph)
-        for _, _, d in dag.edges(data=True):
-            d.clear()
+        return cls._make_template(edge_links, stage_params), stage_params
 
-        job = Job(job_id, stages, dag, t_arrival)
-        job.query_num = query_num
-        job.query_size = query_size
-        return job
+    def _parse_packed_query(self, query_num, query_size):
+        """same as `_parse_query()`, but reads the query from the packed
+        dataset, whose durations are views into the memory-mapped file
+        """
+        return self._parse_packed_template(template_id(query_num, query_size))
+
+    def _parse_packed_template(self, template_idx):
+        packed = self.packed_dataset
+        stage_start, stage_end = packed["template_stage_ptr"][
+            template_idx + np.arange(2)
+        ]
+        child_ptr = packed["stage_child_ptr"][stage_start : stage_end + 1]
+        edge_links = np.column_stack(
+            (
+                np.repeat(np.arange(stage_end - stage_start), np.diff(child_ptr)),
+                packed["child_ids"][child_ptr[0] : child_ptr[-1]],
+            )
+        )
 
-    def _sample_task_duration(self, data, wave, executor_key, warmup=False):
-        """raises an exception if `executor_key` is not found in the durations from `wave`"""
-        durations = data[wave][executor_key]
-        duration = self.np_random.choice(durations)
-        if warmup:
-            duration += self.warmup_delay
-        return duration
+        key_ptr = packed["stage_wave_key_ptr"]
+        duration_ptr = packed["key_duration_ptr"]
+        stage_params = []
+        for i in range(stage_start, stage_end):
+            data = {}
+            for w, wave in enumerate(WAVES):
+                data[wave] = {
+                    int(packed["executor_keys"][k]): packed["durations"][
+                        duration_ptr[k] : duration_ptr[k + 1]
+                    ]
+                    for k in range(key_ptr[3 * i + w], key_ptr[3 * i + w + 1])
+                }
+            num_tasks = int(packed["stage_num_tasks"][i])
+            rough_duration = float(packed["stage_rough_durations"][i])
+            stage_params += [
+                (num_tasks, rough_duration, data, self._resolve_duration_table(data))
+            ]
+
+        return self._make_template(edge_links, stage_params), stage_params
+
+    @classmethod
+    def _make_template(cls, edge_links, stage_params):
+        return JobTemplate(
+            edge_links,
+            [num_tasks for num_tasks, *_ in stage_params],
+            [rough_duration for _, rough_duration, *_ in stage_params],
+        )
 
-    def _sample_executor_key(self, data, num_local_executors):
-        left_exec, right_exec = self.executor_intervals[num_local_executors]
+    @classmethod
+    def _resolve_duration_table(cls, data):
+        """resolves the fallbacks among a stage's waves and executor keys ahead
+        of time, so that sampling a task duration is a single lookup. Returns
+        a table such that `table[situation][executor_key]` is the array of
+        durations to sample from and whether a warmup delay is added, or
+        `None` if there are none, for every executor key that can be sampled.
+        """
+        # more executors than number of tasks in the job
+        max_key = max(data["first_wave"])
+
+        table = []
+        for preferences in WAVE_PREFERENCES:
+            entries = {}
+            for key in set(data["first_wave"]) | {max_key}:
+                entries[key] = next(
+                    (
+                        (np.asarray(data[wave][key]), warmup)
+                        for wave, warmup in preferences
+                        if len(data[wave].get(key, ())) > 0
+                    ),
+                    None,
+                )
+            table += [
+                [
+                    entries[key] if key in entries else entries[max_key]
+                    for key in range(EXECUTOR_LEVELS[-1] + 1)
+                ]
+            ]
+        return table
 
-        executor_key = None
+    def _sample_executor_key(self, num_local_executors):
+        left_exec, right_exec = self._executor_key_intervals[num_local_executors]
 
         if left_exec == right_exec:
-            executor_key = left_exec
+            return left_exec
+
+        # faster than random.randint
+        if self.task_duration_block_size:
+            rand_pt = 1 + self._next_random_int() % (right_exec - left_exec)
         else:
-            # faster than random.randint
             rand_pt = 1 + int(self.np_random.random() * (right_exec - left_exec))
-            if rand_pt <= num_local_executors - left_exec:
-                executor_key = left_exec
-            else:
-                executor_key = right_exec
-
-        if executor_key not in data["first_wave"]:
-            # more executors than number of tasks in the job
-            executor_key = max(data["first_wave"])
-
-        return executor_key
+        if rand_pt <= num_local_executors - left_exec:
+            return left_exec
+        return right_exec
+
+    def _random_index(self, n):
+        """samples an index into an array of length `n`, consuming the same
+        random draws as `np_random.choice()` would, unless durations are drawn
+        in blocks
+        """
+        if self.task_duration_block_size:
+            return self._next_random_int() % n
+        return self.np_random.integers(n)
+
+    def _next_random_int(self):
+        if self._block_pos == len(self._block):
+            self._block = self.np_random.integers(
+                2**62, size=self.task_duration_block_size
+            ).tolist()
+            self._block_pos = 0
+        self._block_pos += 1
+        return self._block[self._block_pos - 1]
 
     def _init_executor_intervals(self, exec_cap):
-        exec_levels = [5, 10, 20, 40, 50, 60, 80, 100]
+        exec_levels = EXECUTOR_LEVELS
 
         intervals = np.zeros((exec_cap + 1, 2))
 
@@ -260,6 +452,7 @@ class TPCHDataSampler(DataSampler):
             intervals[exec_levels[-1] + 1 : exec_cap] = exec_levels[-1]
 
         self.executor_intervals = intervals
+        self._executor_key_intervals = intervals.astype(int).tolist()
 
 
 class MultiSet:
@@ -0,0 +1,297 @@
+"""Packed, memory-mappable format of the TPC-H dataset.
+
+The extracted dataset consists of a pair of pickled `.npy` files for each of
+the 22 queries at each of the 7 sizes. The packed format holds all of the
+parsed and preprocessed queries in a single file of flat arrays, so that it
+can be memory-mapped without unpickling anything, and shared through the OS
+page cache by all the processes that sample from it.
+
+The file starts with the magic bytes `TPCHPACK`, followed by the length of a
+JSON header as a little-endian uint64, and the header itself, which maps each
+array's name to its dtype, shape and byte offset in the file. The header may
+also hold arbitrary JSON metadata under the `METADATA_KEY` key, e.g. where the
+dataset was ingested from.
+
+The same bytes can instead be placed in a named block of shared memory via
+`share_packed_dataset()`, e.g. by a trainer on behalf of its rollout workers,
+which then attach read-only views to it by name via `attach_packed_dataset()`.
+
+The builder is run via `pack_tpch.py [--tpch-dir data/tpch] [--out data/tpch.packed]`
+"""
+
+import json
+import os.path as osp
+import pathlib
+from collections.abc import Iterable, Iterator
+from multiprocessing.shared_memory import SharedMemory
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+
+import numpy as np
+
+from ..utils import counts_to_ptr
+
+MAGIC = b"TPCHPACK"
+
+# arrays are aligned to this many bytes within the file
+ALIGNMENT = 64
+
+# key of the header entry that holds the dataset's metadata, if any
+METADATA_KEY = "__metadata__"
+
+# order of the waves in the duration offset tables
+WAVES = ["fresh_durations", "first_wave", "rest_wave"]
+
+# names and dtypes of the packed arrays. Queries are indexed by template id
+# (see `template_id()`), and stages are numbered consecutively across all the
+# templates.
+PACKED_ARRAYS = {
+    # CSR offsets of each template's stages
+    "template_stage_ptr": np.int64,
+    # stage index -> number of tasks, and mean task duration
+    "stage_num_tasks": np.int64,
+    "stage_rough_durations": np.float64,
+    # CSR adjacency lists, such that the children of stage `i`, in terms of
+    # stage ids local to its query, are
+    # `child_ids[stage_child_ptr[i]:stage_child_ptr[i+1]]`
+    "stage_child_ptr": np.int64,
+    "child_ids": np.int32,
+    # offset tables of the task duration samples. The executor levels of wave
+    # `w` of stage `i` are `executor_keys[k]` for `k` in the range
+    # `stage_wave_key_ptr[3*i+w]:stage_wave_key_ptr[3*i+w+1]`, and the
+    # durations that were recorded at that level are
+    # `durations[key_duration_ptr[k]:key_duration_ptr[k+1]]`
+    "stage_wave_key_ptr": np.int64,
+    "executor_keys": np.int32,
+    "key_duration_ptr": np.int64,
+    "durations": np.float32,
+}
+
+# arrays that only some packed datasets have
+OPTIONAL_PACKED_ARRAYS = {
+    # template id -> time that the template's job was submitted, for datasets
+    # that were ingested from logs
+    "template_submission_times": np.float64,
+}
+
+
+def template_id(query_num: int, query_size: str) -> int:
+    from .tpch import QUERY_SIZES
+
+    return (query_num - 1) * len(QUERY_SIZES) + QUERY_SIZES.index(query_size)
+
+
+def build_packed_dataset(tpch_dir: str, out_path: str) -> None:
+    """parses and preprocesses every query in the extracted dataset at
+    `tpch_dir`, and writes them to a packed file at `out_path`
+    """
+    write_packed_dataset(out_path, pack_templates(_parse_queries(tpch_dir)))
+
+
+def load_packed_dataset(path: str) -> dict[str, np.ndarray]:
+    """memory-maps the packed dataset at `path`, and returns its arrays, which
+    are read-only views into the mapping
+    """
+    buf = np.memmap(path, dtype=np.uint8, mode="r").view(np.ndarray)
+    return _read_packed(buf, path)
+
+
+def load_packed_metadata(path: str) -> dict:
+    """returns the metadata that was written along with the packed dataset at
+    `path`, which is empty if there was none
+    """
+    buf = np.memmap(path, dtype=np.uint8, mode="r").view(np.ndarray)
+    return _read_header(buf, path).get(METADATA_KEY, {})
+
+
+def share_packed_dataset(
+    packed_dataset_path: str | None = None, tpch_dir: str = "data/tpch"
+) -> SharedMemory:
+    """copies the packed dataset at `packed_dataset_path` into a new block of
+    shared memory, or packs the extracted dataset at `tpch_dir` into it if no
+    path is given. The caller owns the block, and must `close()` and
+    `unlink()` it once no process needs it anymore.
+    """
+    if packed_dataset_path:
+        with open(packed_dataset_path, "rb") as fp:
+            packed = fp.read()
+        shm = SharedMemory(create=True, size=len(packed))
+        shm.buf[: len(packed)] = packed
+        return shm
+
+    arrays, header_bytes, header, size = _layout(
+        pack_templates(_parse_queries(tpch_dir))
+    )
+    shm = SharedMemory(create=True, size=size)
+    buf = np.ndarray(size, dtype=np.uint8, buffer=shm.buf)
+    _fill_packed(buf, arrays, header_bytes, header)
+    del buf
+    return shm
+
+
+def attach_packed_dataset(name: str) -> tuple[SharedMemory, dict[str, np.ndarray]]:
+    """attaches to a packed dataset in the shared memory block named `name`,
+    and returns the block along with read-only views of its arrays. The block
+    must be kept referenced for as long as the views are in use.
+    """
+    shm = SharedMemory(name=name)
+    buf = np.ndarray(shm.size, dtype=np.uint8, buffer=shm.buf)
+    buf.flags.writeable = False
+    return shm, _read_packed(buf, name)
+
+
+def pack_templates(
+    templates: Iterable[tuple[np.ndarray, list[tuple]]],
+) -> dict[str, np.ndarray]:
+    """packs parsed job templates, each given by its edge links in row-major
+    order, and a list of the `(num_tasks, rough_duration, data, ...)` params
+    of its stages, where `data` maps each wave to the durations at each
+    executor key, into the arrays of a packed dataset
+    """
+    template_num_stages = []
+    stage_num_tasks = []
+    stage_rough_durations = []
+    child_counts = []
+    child_ids = []
+    key_counts = []
+    executor_keys = []
+    duration_counts = []
+    durations = []
+
+    for edge_links, stage_params in templates:
+        num_stages = len(stage_params)
+        template_num_stages += [num_stages]
+
+        # edge links are in row-major order, so they are already grouped by
+        # parent
+        child_counts += np.bincount(edge_links[:, 0], minlength=num_stages).tolist()
+        child_ids += edge_links[:, 1].tolist()
+
+        for num_tasks, rough_duration, data, *_ in stage_params:
+            stage_num_tasks += [num_tasks]
+            stage_rough_durations += [rough_duration]
+            for wave in WAVES:
+                key_counts += [len(data[wave])]
+                for executor_key, wave_durations in data[wave].items():
+                    executor_keys += [executor_key]
+                    duration_counts += [len(wave_durations)]
+                    durations += list(wave_durations)
+
+    return {
+        "template_stage_ptr": counts_to_ptr(template_num_stages),
+        "stage_num_tasks": np.array(stage_num_tasks),
+        "stage_rough_durations": np.array(stage_rough_durations),
+        "stage_child_ptr": counts_to_ptr(child_counts),
+        "child_ids": np.array(child_ids),
+        "stage_wave_key_ptr": counts_to_ptr(key_counts),
+        "executor_keys": np.array(executor_keys),
+        "key_duration_ptr": counts_to_ptr(duration_counts),
+        "durations": np.array(durations),
+    }
+
+
+def _parse_queries(tpch_dir: str) -> Iterator[tuple[np.ndarray, list[tuple]]]:
+    from .tpch import TPCHDataSampler, QUERY_SIZES, NUM_QUERIES
+
+    for query_num in range(1, NUM_QUERIES + 1):
+        for query_size in QUERY_SIZES:
+            template, stage_params = TPCHDataSampler._parse_query(
+                query_num, query_size, tpch_dir
+            )
+            yield template.edge_links, stage_params
+
+
+def _read_header(buf: np.ndarray, source: str) -> dict:
+    """returns the header of the packed dataset within the bytes `buf`"""
+    if buf[: len(MAGIC)].tobytes() != MAGIC:
+        raise ValueError(f"'{source}' is not a packed TPC-H dataset")
+    header_start = len(MAGIC) + 8
+    header_len = int(buf[len(MAGIC) : header_start].view("<u8")[0])
+    return json.loads(buf[header_start : header_start + header_len].tobytes())
+
+
+def _read_packed(buf: np.ndarray, source: str) -> dict[str, np.ndarray]:
+    """returns views of the packed arrays within the bytes `buf`"""
+    header = _read_header(buf, source)
+    header.pop(METADATA_KEY, None)
+
+    arrays = {}
+    for name, (dtype, shape, offset) in header.items():
+        dtype = np.dtype(dtype)
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        arrays[name] = buf[offset : offset + nbytes].view(dtype).reshape(shape)
+    return arrays
+
+
+def write_packed_dataset(
+    out_path: str, arrays: dict[str, np.ndarray], metadata: dict | None = None
+) -> None:
+    arrays, header_bytes, header, size = _layout(arrays, metadata)
+    buf = np.zeros(size, dtype=np.uint8)
+    _fill_packed(buf, arrays, header_bytes, header)
+
+    pathlib.Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    buf.tofile(out_path)
+
+
+def _fill_packed(
+    buf: np.ndarray, arrays: dict[str, np.ndarray], header_bytes: bytes, header: dict
+) -> None:
+    """writes the packed dataset into the zeroed bytes `buf`"""
+    header_start = len(MAGIC) + 8
+    buf[:header_start] = np.frombuffer(
+        MAGIC + np.array(len(header_bytes), dtype="<u8").tobytes(), dtype=np.uint8
+    )
+    buf[header_start : header_start + len(header_bytes)] = np.frombuffer(
+        header_bytes, dtype=np.uint8
+    )
+    for name, arr in arrays.items():
+        offset = header[name][2]
+        buf[offset : offset + arr.nbytes] = arr.view(np.uint8).ravel()
+
+
+def _layout(
+    arrays: dict[str, np.ndarray], metadata: dict | None = None
+) -> tuple[dict, bytes, dict, int]:
+    """returns the arrays in their packed dtypes, the encoded header and
+    header itself, and the total size of the packed dataset in bytes
+    """
+    dtypes = PACKED_ARRAYS | {
+        name: dtype for name, dtype in OPTIONAL_PACKED_ARRAYS.items() if name in arrays
+    }
+    arrays = {
+        name: np.ascontiguousarray(
+            arrays[name], dtype=np.dtype(dtype).newbyteorder("<")
+        )
+        for name, dtype in dtypes.items()
+    }
+
+    # the header's size depends on the offsets, so the data is placed after a
+    # generously sized header region
+    metadata_size = len(json.dumps(metadata)) if metadata else 0
+    header_size = 1024 + 128 * len(arrays) + metadata_size
+    header_region = ALIGNMENT * (1 + header_size // ALIGNMENT)
+    header = {METADATA_KEY: metadata} if metadata else {}
+    offset = header_region
+    for name, arr in arrays.items():
+        header[name] = (arr.dtype.str, arr.shape, offset)
+        offset += ALIGNMENT * -(-arr.nbytes // ALIGNMENT)
+
+    header_bytes = json.dumps(header).encode()
+    assert len(MAGIC) + 8 + len(header_bytes) <= header_region
+
+    return arrays, header_bytes, header, offset
+
+
+def main():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--tpch-dir", default="data/tpch")
+    parser.add_argument("--out", default="data/tpch.packed")
+    args = parser.parse_args()
+
+    if not osp.isdir(args.tpch_dir):
+        parser.error(f"no extracted dataset at '{args.tpch_dir}'")
+
+    build_packed_dataset(args.tpch_dir, args.out)
+    print(f"packed dataset written to {args.out}")
@@ -0,0 +1,293 @@
+"""Chunked columnar format of job traces, and a data sampler that streams them.
+
+A trace file starts with the magic bytes `SSTRACE1`, followed by any number of
+chunks, each of which holds the jobs that arrive in a contiguous range of
+time. A chunk starts with the length of a JSON header as a little-endian
+uint64, and the header itself, which maps the name of each of the chunk's
+arrays (see `TRACE_CHUNK_ARRAYS`) to its dtype and shape. The arrays follow the
+header back to back, in the order of `TRACE_CHUNK_ARRAYS`. Since the chunks
+are self-contained, traces can be written and read one chunk at a time, so
+neither needs more memory than a chunk, however long the trace is.
+
+Traces are converted from CSV via
+`convert_trace.py CSV_FILE TRACE_FILE [--chunk-size 10000]`, where the CSV has a
+header row, followed by one row per stage with the columns
+- `job_id`: any identifier of the stage's job. The rows of each job must be
+    consecutive, and jobs must appear in order of their arrival.
+- `arrival_time`: time that the job arrives, in ms since any point in time.
+    The simulation starts when the first job arrives.
+- `stage_id`: id of the stage, from 0 to the job's number of stages minus 1
+- `parent_ids`: space-separated ids of the stages that this stage depends on
+- `task_durations`: space-separated durations of the stage's tasks, in ms
+"""
+
+import csv
+import json
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+
+from .data_sampler import DataSampler
+from ..components import Job, JobTemplate, Stage
+from ..utils import counts_to_ptr, topological_generations
+
+MAGIC = b"SSTRACE1"
+
+# names and dtypes of the arrays that make up a chunk, in the order that they
+# are stored in
+TRACE_CHUNK_ARRAYS = {
+    # job index within the chunk -> arrival time
+    "job_arrival_times": np.float64,
+    # CSR offsets of each job's stages and edges, and of each stage's tasks,
+    # such that e.g. the stages of job `j` are `job_stage_ptr[j]:job_stage_ptr[j+1]`
+    "job_stage_ptr": np.int64,
+    "job_edge_ptr": np.int64,
+    "stage_task_ptr": np.int64,
+    # edge index -> (parent stage id, child stage id), local to each job
+    "edge_links": np.int32,
+    # task index -> duration
+    "task_durations": np.float64,
+}
+
+
+class TraceWriter:
+    """Writes jobs to a trace file, one chunk of `chunk_size` jobs at a time.
+    Jobs must be added in order of their arrival.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 10000) -> None:
+        self.chunk_size = chunk_size
+        self.fp = open(path, "wb")
+        self.fp.write(MAGIC)
+        self._last_arrival = -np.inf
+        self._clear_chunk()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def add_job(
+        self,
+        t_arrival: float,
+        edge_links: np.ndarray,
+        task_durations: list[np.ndarray],
+    ) -> None:
+        """adds a job, given its dependencies in terms of its stage ids, and
+        the durations of each of its stages' tasks
+        """
+        if t_arrival < self._last_arrival:
+            raise ValueError("jobs must be added in order of their arrival")
+        self._last_arrival = t_arrival
+
+        self.job_arrival_times += [t_arrival]
+        self.job_num_stages += [len(task_durations)]
+        self.edge_links += [np.asarray(edge_links).reshape(-1, 2)]
+        self.stage_num_tasks += [len(durations) for durations in task_durations]
+        self.task_durations += task_durations
+
+        if len(self.job_arrival_times) == self.chunk_size:
+            self._write_chunk()
+
+    def close(self) -> None:
+        if self.job_arrival_times:
+            self._write_chunk()
+        self.fp.close()
+
+    # internal methods
+
+    def _clear_chunk(self) -> None:
+        self.job_arrival_times: list[float] = []
+        self.job_num_stages: list[int] = []
+        self.edge_links: list[np.ndarray] = []
+        self.stage_num_tasks: list[int] = []
+        self.task_durations: list[np.ndarray] = []
+
+    def _write_chunk(self) -> None:
+        arrays = {
+            "job_arrival_times": self.job_arrival_times,
+            "job_stage_ptr": counts_to_ptr(self.job_num_stages),
+            "job_edge_ptr": counts_to_ptr([len(edges) for edges in self.edge_links]),
+            "stage_task_ptr": counts_to_ptr(self.stage_num_tasks),
+            "edge_links": np.concatenate(self.edge_links),
+            "task_durations": np.concatenate(self.task_durations),
+        }
+        arrays = {
+            name: np.ascontiguousarray(
+                arrays[name], dtype=np.dtype(dtype).newbyteorder("<")
+            )
+            for name, dtype in TRACE_CHUNK_ARRAYS.items()
+        }
+
+        header = json.dumps(
+            {name: (arr.dtype.str, arr.shape) for name, arr in arrays.items()}
+        ).encode()
+        self.fp.write(np.array(len(header), dtype="<u8").tobytes())
+        self.fp.write(header)
+        for arr in arrays.values():
+            self.fp.write(arr.tobytes())
+
+        self._clear_chunk()
+
+
+def read_trace_chunks(path: str) -> Iterator[dict[str, np.ndarray]]:
+    """reads the chunks of the trace file at `path` one at a time"""
+    with open(path, "rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a trace file")
+
+        while header_len := fp.read(8):
+            header = json.loads(fp.read(int(np.frombuffer(header_len, dtype="<u8")[0])))
+            chunk = {}
+            for name, (dtype, shape) in header.items():
+                dtype = np.dtype(dtype)
+                nbytes = dtype.itemsize * int(np.prod(shape))
+                chunk[name] = np.frombuffer(fp.read(nbytes), dtype=dtype).reshape(shape)
+            yield chunk
+
+
+class TraceDataSampler(DataSampler):
+    """Streams the jobs of a trace file, as the simulation reaches their
+    arrival. Only the chunk that the next job belongs to is held by the
+    sampler, and `Job` objects are built just in time, so the sampler's memory
+    doesn't grow with the length of the trace. Every episode sees the same job
+    sequence, and each task takes its duration from the trace, regardless of
+    which executor runs it.
+    """
+
+    finite = True
+
+    def __init__(
+        self, trace_path: str, job_arrival_cap: int | None = None, **kwargs: Any
+    ):
+        """
+        trace_path (str): path of the trace file to stream, as converted by
+            `convert_trace.py`
+        job_arrival_cap: (optional int): limit on the number of jobs that
+            arrive throughout the simulation. If set to `None`, then all the
+            jobs in the trace arrive, subject to the episode's time limit, if
+            any. Without a time limit, the episode ends once every job in the
+            trace has completed.
+        """
+        self.trace_path = trace_path
+        self.job_arrival_cap = job_arrival_cap
+        self.np_random = None
+
+    def job_sequence(self, max_time):
+        job_id = 0
+        t_start = None
+        for chunk in read_trace_chunks(self.trace_path):
+            for i, t_arrival in enumerate(chunk["job_arrival_times"].tolist()):
+                # the simulation starts when the first job arrives
+                if t_start is None:
+                    t_start = t_arrival
+                t_arrival -= t_start
+
+                if t_arrival >= max_time or job_id == self.job_arrival_cap:
+                    return
+                yield t_arrival, self._build_job(chunk, i, job_id, t_arrival)
+                job_id += 1
+
+    def task_duration(self, job, stage, task, executor):
+        return float(stage.task_durations[task.id_])
+
+    def _build_job(self, chunk, i, job_id, t_arrival):
+        stage_start, stage_end = chunk["job_stage_ptr"][i : i + 2]
+        edge_start, edge_end = chunk["job_edge_ptr"][i : i + 2]
+        task_ptr = chunk["stage_task_ptr"][stage_start : stage_end + 1]
+
+        # the durations of each stage's tasks are views into the chunk
+        task_durations = [
+            chunk["task_durations"][task_ptr[j] : task_ptr[j + 1]]
+            for j in range(stage_end - stage_start)
+        ]
+        num_tasks = np.diff(task_ptr).tolist()
+        rough_durations = [float(durations.mean()) for durations in task_durations]
+
+        template = JobTemplate(
+            chunk["edge_links"][edge_start:edge_end].astype(int),
+            num_tasks,
+            rough_durations,
+        )
+
+        stages = []
+        for stage_id, durations in enumerate(task_durations):
+            stage = Stage(
+                stage_id, job_id, num_tasks[stage_id], rough_durations[stage_id]
+            )
+            stage.task_durations = durations
+            stages += [stage]
+
+        return Job(job_id, stages, template, t_arrival)
+
+
+def convert_csv(csv_path: str, trace_path: str, chunk_size: int = 10000) -> int:
+    """converts the CSV trace at `csv_path` (see the module's docstring) into
+    a trace file at `trace_path`, reading and writing it one job at a time.
+    Returns the number of converted jobs.
+    """
+    num_jobs = 0
+    with open(csv_path, newline="") as fp, TraceWriter(
+        trace_path, chunk_size
+    ) as writer:
+        rows = []
+        for row in csv.DictReader(fp):
+            if rows and row["job_id"] != rows[0]["job_id"]:
+                writer.add_job(*_parse_job_rows(rows))
+                num_jobs += 1
+                rows = []
+            rows += [row]
+        if rows:
+            writer.add_job(*_parse_job_rows(rows))
+            num_jobs += 1
+    return num_jobs
+
+
+def _parse_job_rows(rows):
+    rows = sorted(rows, key=lambda row: int(row["stage_id"]))
+    job_id = rows[0]["job_id"]
+    if [int(row["stage_id"]) for row in rows] != list(range(len(rows))):
+        raise ValueError(f"stage ids of job '{job_id}' are not 0 to {len(rows) - 1}")
+
+    edge_links = np.array(
+        [
+            (int(parent_id), stage_id)
+            for stage_id, row in enumerate(rows)
+            for parent_id in row["parent_ids"].split()
+        ],
+        dtype=int,
+    ).reshape(-1, 2)
+
+    if ((edge_links < 0) | (edge_links >= len(rows))).any():
+        raise ValueError(f"job '{job_id}' has a parent id that is not a stage id")
+
+    # edges are sorted in row-major order, as jobs expect
+    edge_links = np.unique(edge_links, axis=0)
+
+    # stages that are never peeled off by the topological sort are on a cycle
+    if (topological_generations(edge_links, len(rows)) == -1).any():
+        raise ValueError(f"job '{job_id}' has a cyclic dependency")
+
+    task_durations = [
+        np.array(row["task_durations"].split(), dtype=float) for row in rows
+    ]
+    if not all(durations.size for durations in task_durations):
+        raise ValueError(f"job '{job_id}' has a stage without any tasks")
+
+    return float(rows[0]["arrival_time"]), edge_links, task_durations
+
+
+def main():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("csv_file")
+    parser.add_argument("trace_file")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    num_jobs = convert_csv(args.csv_file, args.trace_file, args.chunk_size)
+    print(f"{num_jobs} jobs written to {args.trace_file}")
@@ -0,0 +1,74 @@
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+
+class Instrumentation:
+    """Per-phase timers and throughput counters of a `SparkSchedSimEnv`.
+
+    Phases are timed by wrapping the env's methods on the instance, so an env
+    that isn't instrumented pays nothing. Phases may nest, e.g. the event
+    handlers run within `resume_simulation`. The statistics accumulate across
+    episodes until `reset()` is called, so that steady-state throughput can be
+    measured over many episodes.
+    """
+
+    def __init__(self) -> None:
+        # phase name -> total time in seconds, and number of calls
+        self.times: defaultdict[str, float] = defaultdict(float)
+        self.calls: defaultdict[str, int] = defaultdict(int)
+
+        # counter name -> count
+        self.counts: defaultdict[str, int] = defaultdict(int)
+
+    def reset(self) -> None:
+        self.times.clear()
+        self.calls.clear()
+        self.counts.clear()
+
+    def timed(self, phase: str, fn: Callable, counter: str | None = None) -> Callable:
+        """returns a version of `fn` whose calls are timed under `phase`, and
+        optionally counted under `counter`
+        """
+        times, calls, counts = self.times, self.calls, self.counts
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if counter:
+                counts[counter] += 1
+            t_start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                times[phase] += time.perf_counter() - t_start
+                calls[phase] += 1
+
+        return wrapper
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.counts[counter] += n
+
+    def stats(self) -> dict[str, Any]:
+        """returns the total time and number of calls of each phase, the
+        counters, and the rates of events and decisions per second of time
+        spent inside the env, i.e. in `reset()` and stepping
+        """
+        env_time = self.times.get("reset", 0.0) + self.times.get("step", 0.0)
+        rates = {
+            f"{counter}_per_sec": count / env_time if env_time else 0.0
+            for counter, count in self.counts.items()
+        }
+        return {
+            "phases": {
+                phase: {
+                    "time": self.times[phase],
+                    "calls": self.calls[phase],
+                    "mean_time": self.times[phase] / self.calls[phase],
+                }
+                for phase in self.times
+            },
+            "counts": dict(self.counts),
+            "rates": rates,
+        }
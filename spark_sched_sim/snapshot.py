@@ -0,0 +1,58 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from .components import Job, Stage, Task
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """State of a `SparkSchedSimEnv` at a point in an episode, as captured by
+    `env.snapshot()`.
+
+    Everything that doesn't change during an episode, such as the jobs' stage
+    structure, dependency arrays and task duration data, is shared with the
+    environment rather than copied. Only the mutable parts of the simulation
+    are captured, in the form of array copies for the array-backed tables, and
+    small tuples for the remaining objects.
+    """
+
+    # the episode's jobs, whose structure is shared with the env. Jobs that
+    # get sampled after the snapshot is taken are added to it, and are kept
+    # upon a restore.
+    jobs: dict[int, Job]
+
+    # simulation time, id of the next job whose arrival is to be scheduled,
+    # and state of the env's random number generator and data sampler
+    wall_time: float
+    next_job_id: int
+    rng_state: dict[str, Any]
+    data_sampler_state: Any
+
+    # job id -> captured state, for every job that has arrived but not completed
+    job_states: dict[int, tuple]
+
+    # captured state of each executor, and of the task that it is or was last
+    # executing along with that task's executor id and start/end times
+    executor_states: list[tuple]
+    task_states: list[tuple[Task, int | None, float, float]]
+
+    # number of entries in the executor history, if it's being recorded. The
+    # history is append-only, so entries that were recorded since the
+    # snapshot was taken are simply dropped.
+    executor_history_size: int
+
+    # captured states of the env's components
+    event_queue_state: tuple
+    exec_tracker_state: tuple
+    stage_table_state: tuple
+    active_graph_state: tuple
+
+    # the env's own bookkeeping
+    active_job_ids: list[int]
+    completed_job_ids: set[int]
+    ready_stage_ids: dict[int, list[int]]
+    saturated_job_ids: set[int]
+    schedulable_stages: list[Stage]
+    selected_stages: set[Stage]
+    job_duration_buff: deque[float]
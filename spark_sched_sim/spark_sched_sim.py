@@ -1,5 +1,7 @@
 from bisect import bisect_left, bisect_right
+import math
 from collections import deque
+from itertools import islice
 from collections.abc import Iterable, Callable
 from typing import Any
 
@@ -8,10 +10,25 @@ from gymnasium import Env
 import gymnasium.spaces as sp
 
 from .components import Job, Stage, Task, Executor
-from .components.executor_tracker import ExecutorTracker, PoolKey, COMMON_POOL_KEY
-from .components.event import Event, EventQueue
+from .components.executor_tracker import (
+    make_executor_tracker,
+    PoolKey,
+    COMMON_POOL_KEY,
+)
+from .components.event import (
+    make_event_queue,
+    Event,
+    JobArrival,
+    TaskFinished,
+    ExecutorReady,
+)
+from .components.executor_history import ExecutorHistory
+from .components.stage_table import StageTable, NUM_NODE_FEATURES
+from .components.active_graph import ActiveGraph
 from .data_samplers import make_data_sampler, DataSampler
-from .utils import subgraph
+from .snapshot import Snapshot
+from .instrumentation import Instrumentation
+from .utils import grow
 from . import metrics
 
 try:
@@ -22,7 +39,6 @@ except ImportError:
     PYGAME_AVAILABLE = False
 
 
-NUM_NODE_FEATURES = 3
 RENDER_FPS = 30
 
 
@@ -54,23 +70,62 @@ class SparkSchedSimEnv(Env):
         if self.render_mode == "human" and not PYGAME_AVAILABLE:
             raise ValueError("pygame is unavailable")
 
+        # whether to record the executors' moves between jobs, which is needed
+        # for rendering. Defaults to `True` only if rendering.
+        self.record_executor_history: bool = env_cfg.get(
+            "record_executor_history", self.render_mode == "human"
+        )
+
+        if self.render_mode == "human" and not self.record_executor_history:
+            raise ValueError("rendering requires `record_executor_history`")
+
+        # whether to keep the dynamic bounds of the observation and action
+        # spaces up to date with every observation. If disabled, then `step()`
+        # validates actions with the same checks as `trusted_step()` instead
+        # of against the action space.
+        self.update_spaces: bool = env_cfg.get("update_spaces", True)
+
         self.data_sampler: DataSampler = make_data_sampler(env_cfg)
 
         # tracks the current time from the start of the simulation in ms
         self.wall_time: float = 0
 
-        self.event_queue = EventQueue()
+        # name of the class of the event queue; either 'EventQueue' (default),
+        # a binary heap, or 'ExecutorEventQueue', which keeps the next event
+        # of each executor in a tournament tree and job arrivals in a sorted
+        # stream
+        self.event_queue = make_event_queue(env_cfg)
 
         self.jobs: dict[int, Job] = {}
 
-        self.exec_tracker = ExecutorTracker(self.num_executors)
+        # offset of each sampled job's stages among the global stage indices.
+        # The buffer grows as jobs are sampled and is reused across episodes,
+        # so only the first `len(self.jobs) + 1` entries are valid.
+        self.all_job_ptr = np.zeros(128, dtype=int)
+
+        # per-stage state of all the stages in the episode, which observations
+        # are built from
+        self.stage_table = StageTable()
 
-        self.event_handler_switch: dict[Event.Type, Callable[..., None]] = {
-            Event.Type.JOB_ARRIVAL: self._handle_job_arrival,
-            Event.Type.EXECUTOR_READY: self._handle_executor_arrival,
-            Event.Type.TASK_FINISHED: self._handle_task_completion,
+        # the active stages and the dependencies among them, which make up the
+        # graph of each observation
+        self.active_graph = ActiveGraph()
+
+        # name of the class that maintains the executor assignments; either
+        # 'ExecutorTracker' (default) or 'ArrayExecutorTracker', which stores
+        # all of its bookkeeping in flat arrays indexed by dense pool ids
+        self.exec_tracker = make_executor_tracker(env_cfg)
+
+        self.event_handler_switch: dict[type, Callable[..., None]] = {
+            JobArrival: self._handle_job_arrival,
+            ExecutorReady: self._handle_executor_arrival,
+            TaskFinished: self._handle_task_completion,
         }
 
+        self.executor_history: ExecutorHistory | None = None
+        if self.record_executor_history:
+            self.executor_history = ExecutorHistory(self.num_executors)
+
         self.renderer: Renderer | None = None
 
         if self.render_mode == "human":
@@ -82,6 +137,14 @@ class SparkSchedSimEnv(Env):
 
         self.job_duration_buff: deque[float] = deque(maxlen=200)
 
+        # if set, then the time spent in each phase of the simulation is
+        # measured, along with counts of the events, decisions and scanned
+        # stages, which are reported by `stats()`
+        self.instrumentation: Instrumentation | None = None
+        if env_cfg.get("instrument", False):
+            self.instrumentation = Instrumentation()
+            self._instrument()
+
         self.action_space = sp.Dict(
             {
                 # stage selection
@@ -134,7 +197,11 @@ class SparkSchedSimEnv(Env):
 
         time_limit = options.get("time_limit", np.inf)
 
-        if time_limit is np.inf and not self.job_arrival_cap:
+        if (
+            time_limit is np.inf
+            and not self.job_arrival_cap
+            and not self.data_sampler.finite
+        ):
             raise ValueError("must either have a limit on job arrivals or time.")
 
         # simulation wall time in ms
@@ -144,28 +211,38 @@ class SparkSchedSimEnv(Env):
 
         self.event_queue.reset()
 
-        self.jobs.clear()
+        # a new dict for every episode, which snapshots use to tell episodes
+        # apart. Jobs are added as they get sampled from the job sequence.
+        self.jobs = {}
 
-        job_sequence = self.data_sampler.job_sequence(time_limit)
-        assert next(iter(job_sequence))[0] == 0, "first job must arrive at t=0"
+        # the job sequence is consumed lazily, one job ahead of the simulation,
+        # so that generators can sample jobs as simulated time advances
+        self._job_iter = iter(self.data_sampler.job_sequence(time_limit))
 
-        for t, job in job_sequence:
-            self.event_queue.push(t, Event(Event.Type.JOB_ARRIVAL, data={"job": job}))
-            self.jobs[job.id_] = job
-
-        self.job_arrival_cap = len(self.jobs.keys())
-        self.observation_space["source_job_idx"].n = self.job_arrival_cap + 1
-        if self.renderer:
-            self.renderer.num_total_jobs = self.job_arrival_cap
+        # id of the next job whose arrival is to be pushed onto the queue
+        self._next_job_id = 0
 
         self.executors = [Executor(i) for i in range(self.num_executors)]
+        if self.executor_history:
+            self.executor_history.reset()
         self.exec_tracker.reset()
 
-        # a fast way of obtaining the edge links for an observation is to
-        # start out with all of them in a big array, and then to induce a
-        # subgraph based on the current set of active nodes
-        self._reset_edge_links()
-        self.num_total_stages = self.all_job_ptr[-1]
+        # the job pointers and the stage table grow as jobs are sampled
+        self.num_total_stages = 0
+        self.stage_table.reset()
+        self.active_graph.reset()
+
+        self._push_next_job_arrival()
+        assert self.event_queue.top()[0] == 0, "first job must arrive at t=0"
+
+        # index of ready stages, which is updated incrementally whenever a
+        # stage's executor demand crosses zero (see `_update_stage_demand()`)
+        # instead of rescanning all the active stages upon every event.
+        # job id -> sorted ids of the job's ready stages. Only jobs that have
+        # at least one ready stage are included.
+        self._ready_stage_ids: dict[int, list[int]] = {}
+        # jobs whose executor supply has reached the total number of executors
+        self._saturated_job_ids: set[int] = set()
 
         # must be ordered
         self.active_job_ids: list[int] = []
@@ -177,53 +254,194 @@ class SparkSchedSimEnv(Env):
         # until the next round
         self.selected_stages: set[Stage] = set()
 
-        # (index of an active stage) -> (stage object)
-        # used to trace an action to its corresponding stage
-        self.stage_selection_map: dict[int, Stage] = {}
-
         self._load_initial_jobs()
 
         return self._observe(), self.info
 
     def step(self, action: dict) -> tuple[dict, float, bool, bool, dict]:
-        self._take_action(action)
+        if self.update_spaces and not self.action_space.contains(action):
+            raise ValueError("invalid action: does not belong to the action space")
+
+        return self.trusted_step(int(action["stage_idx"]), int(action["num_exec"]))
+
+    def trusted_step(
+        self, stage_idx: int, num_exec: int
+    ) -> tuple[dict, float, bool, bool, dict]:
+        """fast path of `step()` for trusted callers, such as the vectorized
+        env, which takes the action as a plain pair and validates it with
+        integer comparisons only, instead of checking it against the action
+        space
+        """
+        if not -1 <= stage_idx < len(self.schedulable_stages):
+            raise ValueError("invalid action: stage is not currently schedulable")
+
+        if not 1 <= num_exec <= self.num_executors:
+            raise ValueError("invalid action: number of executors out of range")
+
+        self._take_action(stage_idx, num_exec)
 
         if self.exec_tracker.num_committable_execs() and self.schedulable_stages:
             # there are still scheduling decisions to be made, so consult the agent again
             return self._observe(), 0, False, False, self.info
 
-        # commitment round has completed, now schedule the free executors
-        self._commit_remaining_executors()
-        self._fulfill_commitments_from_source()
-        self.exec_tracker.clear_executor_source()
-        self.selected_stages.clear()
+        return self._finish_round()
+
+    def step_round(
+        self, actions: Iterable[tuple[int, int]]
+    ) -> tuple[dict, float, bool, bool, dict]:
+        """submits a whole scheduling round at once, as an ordered list of
+        commitments `(stage_idx, num_exec)`, where the stage indices refer to
+        the schedulable stages of the current observation.
+
+        The commitments are applied in order. Ones whose stage is no longer
+        schedulable due to the earlier commitments are skipped, and the number
+        of executors of each one is truncated to the number of executors that
+        remain committable. A stage index of -1 ends the round early. Any
+        executors that are left uncommitted are committed to the common pool,
+        and then the simulation resumes until the next scheduling round. If any
+        of the commitments is invalid, then a `ValueError` is raised before
+        any of them are applied.
+        """
+        actions = list(actions)
+        schedulable_stages = self.schedulable_stages
 
-        # save old state attributes for computing reward
-        wall_time_old = self.wall_time
-        active_job_ids_old = self.active_job_ids.copy()
+        # the whole round is validated before any of it is applied, so that an
+        # invalid round leaves the env untouched
+        for stage_idx, num_exec in actions:
+            if not -1 <= stage_idx < len(schedulable_stages):
+                raise ValueError("invalid action: stage is not currently schedulable")
 
-        # step through timeline until next scheduling event
-        self._resume_simulation()
+            if num_exec < 1:
+                raise ValueError("invalid action: must commit at least one executor")
 
-        job_time = self._compute_jobtime(wall_time_old, active_job_ids_old)
-        reward = -job_time
-        terminated = self.all_jobs_complete
+        for stage_idx, num_exec in actions:
+            num_committable_execs = self.exec_tracker.num_committable_execs()
+            if stage_idx == -1 or not num_committable_execs:
+                break
 
-        if not terminated:
-            assert (
-                self.exec_tracker.num_committable_execs() and self.schedulable_stages
-            ), "[step]"
+            try:
+                stage_idx = self.schedulable_stages.index(schedulable_stages[stage_idx])
+            except ValueError:
+                continue
 
-        if self.render_mode == "human":
-            self._render_frame()
+            self._take_action(stage_idx, min(num_exec, num_committable_execs))
 
-        # if the episode isn't done, then start a new scheduling round at the current executor source
-        return self._observe(), reward, terminated, False, self.info
+        return self._finish_round()
 
     def close(self) -> None:
         if self.renderer:
             self.renderer.close()
 
+    def snapshot(self) -> Snapshot:
+        """captures the current state of the simulation, which can be returned
+        to any number of times via `restore()`, as long as the env has not been
+        reset since. Continuing the episode from here yields the same outcomes
+        as continuing it from a restore of this snapshot.
+        """
+        executor_tasks = [
+            executor.task for executor in self.executors if executor.task is not None
+        ]
+
+        return Snapshot(
+            jobs=self.jobs,
+            wall_time=self.wall_time,
+            next_job_id=self._next_job_id,
+            rng_state=self.np_random.bit_generator.state,
+            data_sampler_state=self.data_sampler.get_state(),
+            job_states={
+                job_id: self.jobs[job_id].get_state() for job_id in self.active_job_ids
+            },
+            executor_states=[executor.get_state() for executor in self.executors],
+            task_states=[
+                (task, task.executor_id, task.t_accepted, task.t_completed)
+                for task in executor_tasks
+            ],
+            executor_history_size=(
+                self.executor_history.size if self.executor_history else 0
+            ),
+            event_queue_state=self.event_queue.get_state(),
+            exec_tracker_state=self.exec_tracker.get_state(),
+            stage_table_state=self.stage_table.get_state(self.num_total_stages),
+            active_graph_state=self.active_graph.get_state(),
+            active_job_ids=self.active_job_ids.copy(),
+            completed_job_ids=self.completed_job_ids.copy(),
+            ready_stage_ids={
+                job_id: stage_ids.copy()
+                for job_id, stage_ids in self._ready_stage_ids.items()
+            },
+            saturated_job_ids=self._saturated_job_ids.copy(),
+            schedulable_stages=self.schedulable_stages.copy(),
+            selected_stages=self.selected_stages.copy(),
+            job_duration_buff=self.job_duration_buff.copy(),
+        )
+
+    def restore(self, snapshot: Snapshot) -> tuple[dict, dict]:
+        """returns the simulation to the state captured by `snapshot`, and
+        returns the observation and info at that state
+        """
+        if snapshot.jobs is not self.jobs:
+            raise ValueError("snapshot was not taken during the current episode")
+
+        # jobs that arrived after the snapshot was taken are returned to their
+        # initial state, and the remaining ones that have not completed are
+        # returned to their captured state
+        arrived_job_ids = set(snapshot.active_job_ids) | snapshot.completed_job_ids
+        for job_id in self.active_job_ids + list(self.completed_job_ids):
+            if job_id not in arrived_job_ids:
+                self.jobs[job_id].reset_state()
+        for job_id, job_state in snapshot.job_states.items():
+            self.jobs[job_id].set_state(job_state)
+
+        # local executors are rebuilt from the executors' jobs
+        for executor in self.executors:
+            if executor.job_id is not None:
+                self.jobs[executor.job_id].local_executors.discard(executor.id_)
+        for executor, executor_state in zip(self.executors, snapshot.executor_states):
+            executor.set_state(executor_state)
+            if executor.job_id is not None:
+                self.jobs[executor.job_id].local_executors.add(executor.id_)
+
+        for task, *task_state in snapshot.task_states:
+            task.executor_id, task.t_accepted, task.t_completed = task_state
+
+        if self.executor_history:
+            self.executor_history.truncate(snapshot.executor_history_size)
+
+        self.wall_time = snapshot.wall_time
+        self.np_random.bit_generator.state = snapshot.rng_state
+        self.data_sampler.set_state(snapshot.data_sampler_state)
+        self.event_queue.set_state(snapshot.event_queue_state)
+        self.exec_tracker.set_state(snapshot.exec_tracker_state)
+        self.stage_table.set_state(snapshot.stage_table_state)
+        self.active_graph.set_state(snapshot.active_graph_state)
+
+        # jobs that were sampled since the snapshot was taken are kept, and
+        # arrive again in the same order
+        self._next_job_id = snapshot.next_job_id
+        self.stage_table.extend(self.num_total_stages)
+
+        self.active_job_ids = snapshot.active_job_ids.copy()
+        self.completed_job_ids = snapshot.completed_job_ids.copy()
+        self._ready_stage_ids = {
+            job_id: stage_ids.copy()
+            for job_id, stage_ids in snapshot.ready_stage_ids.items()
+        }
+        self._saturated_job_ids = snapshot.saturated_job_ids.copy()
+        self.schedulable_stages = snapshot.schedulable_stages.copy()
+        self.selected_stages = snapshot.selected_stages.copy()
+        self.job_duration_buff = snapshot.job_duration_buff.copy()
+
+        return self._observe(), self.info
+
+    def stats(self) -> dict[str, Any]:
+        """returns the statistics that were collected since the env was created
+        (see `Instrumentation.stats()`), if it was created with `instrument`
+        enabled
+        """
+        if not self.instrumentation:
+            raise ValueError("instrumentation was not enabled in `env_cfg`")
+        return self.instrumentation.stats()
+
     @property
     def all_jobs_complete(self) -> bool:
         return self.num_completed_jobs == len(self.jobs.keys())
@@ -246,16 +464,105 @@ class SparkSchedSimEnv(Env):
 
     # internal methods
 
-    def _reset_edge_links(self) -> None:
-        edge_links = []
-        job_ptr = [0]
-        for job in self.jobs.values():
-            base_stage_idx = job_ptr[-1]
-            edges = np.vstack(job.dag.edges)
-            edge_links += [base_stage_idx + edges]
-            job_ptr += [base_stage_idx + job.num_stages]
-        self.all_edge_links = np.vstack(edge_links)
-        self.all_job_ptr = np.array(job_ptr)
+    def _add_job(self, job: Job) -> None:
+        """assigns global stage indices to a newly sampled job's stages"""
+        assert job.id_ == len(self.jobs), "job ids must follow the arrival order"
+        self.jobs[job.id_] = job
+
+        if len(self.jobs) + 1 > self.all_job_ptr.size:
+            self.all_job_ptr = grow(self.all_job_ptr, len(self.jobs) + 1)
+
+        self.num_total_stages += job.num_stages
+        self.all_job_ptr[job.id_ + 1] = self.num_total_stages
+        self.stage_table.extend(self.num_total_stages)
+
+        if self.update_spaces:
+            self.observation_space["source_job_idx"].n = len(self.jobs) + 1
+        if self.renderer:
+            self.renderer.num_total_jobs = self.job_arrival_cap or len(self.jobs)
+
+    def _push_next_job_arrival(self) -> None:
+        """pushes the arrival of the next job in the sequence onto the event
+        queue, sampling the job first unless it was already sampled, e.g.
+        before a snapshot was restored
+        """
+        if self._next_job_id == len(self.jobs):
+            try:
+                _, job = next(self._job_iter)
+            except StopIteration:
+                return
+            self._add_job(job)
+
+        job = self.jobs[self._next_job_id]
+        self.event_queue.push(job.t_arrival, JobArrival(job))
+        self._next_job_id += 1
+
+    def _instrument(self) -> None:
+        """shadows the methods of each phase with timed versions"""
+        instrumentation = self.instrumentation
+        assert instrumentation, "[_instrument]"
+        timed = instrumentation.timed
+
+        self.reset = timed("reset", self.reset)
+        self.trusted_step = timed("step", self.trusted_step)
+        self.step_round = timed("step", self.step_round)
+        self._take_action = timed("take_action", self._take_action, "decisions")
+        self._resume_simulation = timed("resume_simulation", self._resume_simulation)
+        self._observe = timed("observe", self._observe)
+        self._compute_jobtime = timed("compute_reward", self._compute_jobtime)
+
+        for event_cls, handler in self.event_handler_switch.items():
+            self.event_handler_switch[event_cls] = timed(
+                f"handle_{event_cls.__name__}", handler, "events"
+            )
+        self._handle_job_arrival = self.event_handler_switch[JobArrival]
+
+        find_schedulable_stages = self._find_schedulable_stages
+
+        def count_scanned_stages(job_ids=None, source_job_id=None):
+            ready_stage_ids = self._ready_stage_ids
+            instrumentation.count(
+                "stages_scanned",
+                sum(
+                    len(ready_stage_ids.get(job_id, ()))
+                    for job_id in (job_ids or ready_stage_ids)
+                ),
+            )
+            return find_schedulable_stages(job_ids, source_job_id)
+
+        self._find_schedulable_stages = count_scanned_stages
+
+    def _finish_round(self) -> tuple[dict, float, bool, bool, dict]:
+        """completes the current scheduling round, and resumes the simulation
+        until the next one
+        """
+        # commitment round has completed, now schedule the free executors
+        self._commit_remaining_executors()
+        self._fulfill_commitments_from_source()
+        self.exec_tracker.clear_executor_source()
+        self.selected_stages.clear()
+
+        # the step's job time is accumulated as the wall time advances
+        self._step_start_time = self.wall_time
+        self._step_discount = 1.0
+        self._step_job_time = 0.0
+
+        # step through timeline until next scheduling event
+        self._resume_simulation()
+
+        reward = -self._compute_jobtime()
+        terminated = self.all_jobs_complete
+
+        if not terminated:
+            assert (
+                self.exec_tracker.num_committable_execs() and self.schedulable_stages
+            ), "[_finish_round]"
+
+        if self.render_mode == "human":
+            self._render_frame()
+
+        # if the episode isn't done, then start a new scheduling round at the current executor source
+        return self._observe(), reward, terminated, False, self.info
 
     def _load_initial_jobs(self) -> None:
         while q_top := self.event_queue.top():
@@ -266,30 +573,19 @@ class SparkSchedSimEnv(Env):
 
             self.event_queue.pop()
 
-            job = event.data["job"]
-
-            self._handle_job_arrival(job)
+            assert type(event) is JobArrival, "[_load_initial_jobs]"
+            self._handle_job_arrival(event.job)
 
         self.schedulable_stages = self._find_schedulable_stages()
 
-    def _take_action(self, action: dict) -> None:
-        if not self.action_space.contains(action):
-            raise ValueError("invalid action: does not belong to the action space")
-
-        if action["stage_idx"] == -1:
+    def _take_action(self, stage_idx: int, num_executors: int) -> None:
+        if stage_idx == -1:
             # no stage has been selected
             self._commit_remaining_executors()
             return
 
-        stage = self.stage_selection_map[action["stage_idx"]]
-
-        if not stage in self.schedulable_stages:
-            raise ValueError("invalid action: stage is not currently schedulable")
-
-        num_executors = action["num_exec"]
-
-        if not num_executors:
-            raise ValueError("invalid action: must commit at least one executor")
+        # stage indices in actions follow the order of the schedulable stages
+        stage = self.schedulable_stages[stage_idx]
 
         if num_executors > self.exec_tracker.num_committable_execs():
             raise ValueError("invalid action: too many executors requested")
@@ -298,6 +594,8 @@ class SparkSchedSimEnv(Env):
         # or available
         num_executors = self._adjust_num_executors(num_executors, stage)
         self.exec_tracker.add_commitment(num_executors, stage.pool_key)
+        self._update_stage_demand(stage)
+        self._update_job_saturation(stage.job_id)
 
         # mark stage as selected so that it doesn't get selected again during
         # this scheduling round
@@ -315,7 +613,7 @@ class SparkSchedSimEnv(Env):
         )
 
     def _handle_event(self, event: Event) -> None:
-        self.event_handler_switch[event.type](**event.data)
+        self.event_handler_switch[type(event)](*event)
 
     def _resume_simulation(self) -> None:
         """resumes the simulation until either there are new scheduling
@@ -324,7 +622,8 @@ class SparkSchedSimEnv(Env):
         schedulable_stages: list[Stage] = []
 
         while q_top := self.event_queue.pop():
-            self.wall_time, event = q_top
+            wall_time, event = q_top
+            self._advance_wall_time(wall_time)
 
             self._handle_event(event)
 
@@ -343,47 +642,37 @@ class SparkSchedSimEnv(Env):
         self.schedulable_stages = schedulable_stages
 
     def _observe(self) -> dict[str, Any]:
-        self.stage_selection_map.clear()
+        table = self.stage_table
+        active_stage_idx = self.active_graph.stage_idx
 
-        nodes: list[tuple[int, float, bool]] = []
-        dag_ptr: list[int] = [0]
-        active_stage_mask = np.zeros(self.num_total_stages, dtype=bool)
-        exec_supplies: list[int] = []
-        source_job_idx = len(self.active_job_ids)
-
-        for i, stage in enumerate(self.schedulable_stages):
-            self.stage_selection_map[i] = stage
-            stage.is_schedulable = True
-
-        for i, job_id in enumerate(self.active_job_ids):
-            job = self.jobs[job_id]
-
-            if job_id == self.exec_tracker.source_job_id():
-                source_job_idx = i
-
-            exec_supplies += [self.exec_tracker.exec_supply(job_id)]
-
-            for stage in job.active_stages:
-                nodes += [
-                    (
-                        stage.num_remaining_tasks,
-                        stage.most_recent_duration,
-                        stage.is_schedulable,
-                    )
-                ]
-                stage.is_schedulable = False
-
-                active_stage_mask[self.all_job_ptr[job_id] + stage.id_] = 1
+        # the schedulable flags are only raised while the nodes are gathered
+        schedulable_stage_idx = [
+            self.all_job_ptr[stage.job_id] + stage.id_
+            for stage in self.schedulable_stages
+        ]
+        table.schedulable[schedulable_stage_idx] = 1
+        nodes = table.features[active_stage_idx]
+        table.schedulable[schedulable_stage_idx] = 0
+
+        # active stages are ordered by job, so each job's first active stage is
+        # found by searching for the job's offset
+        dag_ptr = np.append(
+            np.searchsorted(active_stage_idx, self.all_job_ptr[self.active_job_ids]),
+            active_stage_idx.size,
+        )
 
-            dag_ptr += [len(nodes)]
+        exec_supplies = [
+            self.exec_tracker.exec_supply(job_id) for job_id in self.active_job_ids
+        ]
 
         try:
-            nodes_stacked = np.vstack(nodes).astype(np.float32)
+            source_job_idx = self.active_job_ids.index(
+                self.exec_tracker.source_job_id()
+            )
         except ValueError:
-            # there are no active stages
-            nodes_stacked = np.zeros((0, NUM_NODE_FEATURES), dtype=np.float32)
+            source_job_idx = len(self.active_job_ids)
 
-        edge_links = subgraph(self.all_edge_links, active_stage_mask)
+        edge_links = self.active_graph.relabelled_edge_links()
 
         # not using edge data, so this array is always zeros
         edges = np.zeros(len(edge_links), dtype=int)
@@ -391,24 +680,29 @@ class SparkSchedSimEnv(Env):
         num_committable_execs = self.exec_tracker.num_committable_execs()
 
         obs = {
-            "dag_batch": sp.GraphInstance(nodes_stacked, edges, edge_links),
+            "dag_batch": sp.GraphInstance(nodes, edges, edge_links),
             "dag_ptr": dag_ptr,
             "num_committable_execs": num_committable_execs,
             "source_job_idx": source_job_idx,
             "exec_supplies": exec_supplies,
         }
 
-        # update stage action space to reflect the current number of active
-        # stages
-        self.observation_space["dag_ptr"].feature_space.n = len(nodes) + 1
-        self.action_space["stage_idx"].n = len(nodes) + 1
+        if self.update_spaces:
+            # update stage action space to reflect the current number of active
+            # stages
+            self.observation_space["dag_ptr"].feature_space.n = len(nodes) + 1
+            self.action_space["stage_idx"].n = len(nodes) + 1
 
         return obs
 
     def _render_frame(self) -> None:
-        assert self.renderer, "[_render_frame]"
+        assert self.renderer, "[_render_frame],1"
 
-        executor_histories = (executor.history for executor in self.executors)
+        assert self.executor_history, "[_render_frame],2"
+        executor_histories = (
+            self.executor_history.executor_history(executor_id)
+            for executor_id in range(self.num_executors)
+        )
         job_completion_times = (
             self.jobs[job_id].t_completed for job_id in self.completed_job_ids
         )
@@ -426,10 +720,16 @@ class SparkSchedSimEnv(Env):
     # event handlers
 
     def _handle_job_arrival(self, job: Job) -> None:
+        self._push_next_job_arrival()
+
         self.active_job_ids += [job.id_]
         self.exec_tracker.add_job_pool(job.pool_key)
         for stage in job.stages:
             self.exec_tracker.add_stage_pool(stage.pool_key)
+        base_stage_idx = self.all_job_ptr[job.id_]
+        self.stage_table.add_job(base_stage_idx, job.stages)
+        self.active_graph.add_job(base_stage_idx, job.num_stages, job.edge_links)
+        self._index_job_stages(job)
 
         if self.exec_tracker.common_pool_has_executors():
             # if there are any executors that don't belong to any job, then
@@ -442,8 +742,11 @@ class SparkSchedSimEnv(Env):
         job = self.jobs[stage.job_id]
 
         job.attach_executor(executor)
-        executor.add_history(self.wall_time, job.id_)
+        if self.executor_history:
+            self.executor_history.record(self.wall_time, executor.id_, job.id_)
 
+        # the stage's demand is updated once the executor is put to use (see
+        # `_move_executor_to_stage()`)
         self.exec_tracker.record_executor_arrival(stage.pool_key)
         self.exec_tracker.move_executor_to_pool(executor.id_, job.pool_key)
 
@@ -507,7 +810,7 @@ class SparkSchedSimEnv(Env):
         job_ids: Iterable[int] | None = None,
         source_job_id: int | None = None,
     ) -> list[Stage]:
-        """An stage is schedulable if it is ready (see `_is_stage_ready()`),
+        """An stage is schedulable if it is ready (see `_update_stage_readiness()`),
         it hasn't been selected in the current scheduling round, and its job
         is not saturated with executors (i.e. can accept more executors).
 
@@ -516,43 +819,110 @@ class SparkSchedSimEnv(Env):
         searched.
         """
         if not job_ids:
-            job_ids = self.active_job_ids
+            # only jobs with ready stages need to be searched, in order
+            job_ids = self._ready_job_ids()
 
         if not source_job_id:
             source_job_id = self.exec_tracker.source_job_id()
 
-        # filter out saturated jobs. The source job is never considered saturated, because it
-        # is not gaining any new executors during scheduling
-        job_ids = [
-            job_id
-            for job_id in job_ids
-            if job_id == source_job_id
-            or self.exec_tracker.exec_supply(job_id) < self.num_executors
-        ]
+        schedulable_stages: list[Stage] = []
+        for job_id in job_ids:
+            ready_stage_ids = self._ready_stage_ids.get(job_id)
+            if not ready_stage_ids:
+                continue
 
-        schedulable_stages = [
-            stage
-            for job_id in job_ids
-            for stage in self.jobs[job_id].active_stages
-            if stage not in self.selected_stages and self._is_stage_ready(stage)
-        ]
+            # filter out saturated jobs. The source job is never considered saturated, because it
+            # is not gaining any new executors during scheduling
+            if job_id != source_job_id and job_id in self._saturated_job_ids:
+                continue
+
+            stages = self.jobs[job_id].stages
+            schedulable_stages += [
+                stages[stage_id]
+                for stage_id in ready_stage_ids
+                if stages[stage_id] not in self.selected_stages
+            ]
 
         return schedulable_stages
 
-    def _is_stage_ready(self, stage: Stage) -> bool:
+    def _index_job_stages(self, job: Job) -> None:
+        """adds the stages of a newly arrived job to the ready stage index"""
+        base_stage_idx = self.all_job_ptr[job.id_]
+        for stage in job.stages:
+            stage_idx = base_stage_idx + stage.id_
+            self.stage_table.saturated[stage_idx] = self._is_stage_saturated(stage)
+
+        for stage in job.stages:
+            self.stage_table.num_unsaturated_parents[base_stage_idx + stage.id_] = sum(
+                not self.stage_table.saturated[base_stage_idx + parent_stage.id_]
+                for parent_stage in job.get_parent_stages(stage)
+            )
+            self._update_stage_readiness(stage)
+
+    def _update_stage_demand(self, stage: Stage) -> None:
+        """must be called whenever the executor demand of `stage` may have
+        changed. If the stage's saturation flipped, then the readiness of the
+        stage and of its children is updated.
+        """
+        stage_idx = self.all_job_ptr[stage.job_id] + stage.id_
+        saturated = self._is_stage_saturated(stage)
+        if saturated == self.stage_table.saturated[stage_idx]:
+            return
+
+        self.stage_table.saturated[stage_idx] = saturated
+        self._update_stage_readiness(stage)
+
+        job = self.jobs[stage.job_id]
+        delta = -1 if saturated else 1
+        for child_stage in job.get_children_stages(stage):
+            child_stage_idx = self.all_job_ptr[stage.job_id] + child_stage.id_
+            self.stage_table.num_unsaturated_parents[child_stage_idx] += delta
+            self._update_stage_readiness(child_stage)
+
+    def _update_stage_readiness(self, stage: Stage) -> None:
         """a stage is ready if
         - it is unsaturated, and
         - all of its parent stages are saturated
         """
-        if self._is_stage_saturated(stage):
-            return False
+        stage_idx = self.all_job_ptr[stage.job_id] + stage.id_
+        is_ready = (
+            not self.stage_table.saturated[stage_idx]
+            and self.stage_table.num_unsaturated_parents[stage_idx] == 0
+        )
 
-        job = self.jobs[stage.job_id]
-        for parent_stage in job.get_parent_stages(stage):
-            if not self._is_stage_saturated(parent_stage):
-                return False
+        ready_stage_ids = self._ready_stage_ids.get(stage.job_id)
+        if ready_stage_ids is None:
+            if is_ready:
+                self._ready_stage_ids[stage.job_id] = [stage.id_]
+            return
 
-        return True
+        # jobs only have a handful of ready stages at a time, so keeping them
+        # sorted is cheaper than sorting them upon every search
+        i = bisect_left(ready_stage_ids, stage.id_)
+        is_indexed = i < len(ready_stage_ids) and ready_stage_ids[i] == stage.id_
+        if is_ready and not is_indexed:
+            ready_stage_ids.insert(i, stage.id_)
+        elif not is_ready and is_indexed:
+            del ready_stage_ids[i]
+            if not ready_stage_ids:
+                self._ready_stage_ids.pop(stage.job_id)
+
+    def _ready_job_ids(self) -> list[int]:
+        """returns the ids of the jobs that have ready stages, in order of
+        arrival
+        """
+        return [
+            job_id for job_id in self.active_job_ids if job_id in self._ready_stage_ids
+        ]
+
+    def _update_job_saturation(self, job_id: int) -> None:
+        """must be called whenever the executor supply of a job may have
+        changed
+        """
+        if self.exec_tracker.exec_supply(job_id) < self.num_executors:
+            self._saturated_job_ids.discard(job_id)
+        else:
+            self._saturated_job_ids.add(job_id)
 
     def _adjust_num_executors(self, num_executors: int, stage: Stage) -> int:
         """truncates the numer of executor assigned to `stage` to the stage's
@@ -592,6 +962,7 @@ class SparkSchedSimEnv(Env):
         job = self.jobs[stage.job_id]
 
         task = stage.launch_next_task()
+        self._update_stage_demand(stage)
         if stage.num_remaining_tasks == 0:
             # stage just became saturated
             job.saturated_stage_count += 1
@@ -606,13 +977,11 @@ class SparkSchedSimEnv(Env):
         task.t_accepted = self.wall_time
         stage.most_recent_duration = task_duration
 
-        self.event_queue.push(
-            self.wall_time + task_duration,
-            Event(
-                type=Event.Type.TASK_FINISHED,
-                data={"stage": stage, "task": task},
-            ),
-        )
+        stage_idx = self.all_job_ptr[stage.job_id] + stage.id_
+        self.stage_table.num_remaining_tasks[stage_idx] = stage.num_remaining_tasks
+        self.stage_table.most_recent_duration[stage_idx] = task_duration
+
+        self.event_queue.push(self.wall_time + task_duration, TaskFinished(stage, task))
 
     def _send_executor(self, executor: Executor, stage: Stage) -> None:
         """sends a `executor` to `stage`, assuming that the executor is
@@ -623,17 +992,16 @@ class SparkSchedSimEnv(Env):
         assert not executor.is_at_job(stage.job_id), "[_send_executor],3"
 
         self.exec_tracker.move_executor_to_pool(executor.id_, stage.pool_key, send=True)
+        self._update_stage_demand(stage)
+        self._update_job_saturation(stage.job_id)
 
         if executor.job_id is not None:
+            self._update_job_saturation(executor.job_id)
             old_job = self.jobs[executor.job_id]
             old_job.detach_executor(executor)
 
         self.event_queue.push(
-            self.wall_time + self.moving_delay,
-            Event(
-                type=Event.Type.EXECUTOR_READY,
-                data={"executor": executor, "stage": stage},
-            ),
+            self.wall_time + self.moving_delay, ExecutorReady(executor, stage)
         )
 
     def _handle_released_executor(
@@ -676,6 +1044,9 @@ class SparkSchedSimEnv(Env):
     def _process_stage_completion(self, stage: Stage) -> bool:
         """performs some bookkeeping when a stage completes"""
         job = self.jobs[stage.job_id]
+        stage_idx = self.all_job_ptr[stage.job_id] + stage.id_
+        self.stage_table.active[stage_idx] = False
+        self.active_graph.remove_stage(stage_idx)
         frontier_changed = job.record_stage_completion(stage)
         return frontier_changed
 
@@ -693,6 +1064,7 @@ class SparkSchedSimEnv(Env):
 
         self.active_job_ids.remove(job.id_)
         self.completed_job_ids.add(job.id_)
+        self._saturated_job_ids.discard(job.id_)
         job.t_completed = self.wall_time
         self.job_duration_buff.append(job.t_completed - job.t_arrival)
 
@@ -708,39 +1080,44 @@ class SparkSchedSimEnv(Env):
         assert job_id is not None and stage_id is not None, "[_fulfill_commitment]"
         stage = self.jobs[job_id].stages[stage_id]
         executor = self.executors[executor_id]
+        self._update_job_saturation(job_id)
 
         self._move_executor_to_stage(executor, stage)
 
-    def _get_idle_source_executors(self, pool_key: PoolKey | None = None) -> set[int]:
+    def _get_idle_source_executors(self, pool_key: PoolKey | None = None) -> list[int]:
+        """returns the ids of the idle executors at `pool_key`, or at the source
+        pool if not given, in increasing order, so that which executors get
+        picked doesn't depend on how the executor tracker orders its pools
+        """
         if not pool_key:
-            executor_ids = self.exec_tracker.get_source_pool()
+            executor_ids = self.exec_tracker.iter_source_pool()
         else:
-            executor_ids = self.exec_tracker.get_pool(pool_key)
+            executor_ids = self.exec_tracker.iter_pool(pool_key)
 
-        free_executor_ids = set(
-            (
-                executor_id
-                for executor_id in executor_ids
-                if not self.executors[executor_id].is_executing
-            )
-        )
+        executors = self.executors
+        free_executor_ids = [
+            executor_id
+            for executor_id in executor_ids
+            if not executors[executor_id].is_executing
+        ]
+        free_executor_ids.sort()
 
         return free_executor_ids
 
     def _fulfill_commitments_from_source(self) -> None:
         # only consider the idle executors
-        idle_executor_ids = self._get_idle_source_executors()
+        idle_executor_ids = iter(self._get_idle_source_executors())
         commitments = self.exec_tracker.get_source_commitments()
 
         for dst_pool_key, num_executors in commitments.items():
             assert dst_pool_key, "[_fulfill_commitments_from_source],1"
             assert num_executors, "[_fulfill_commitments_from_source],2"
-            while num_executors and idle_executor_ids:
-                executor_id = idle_executor_ids.pop()
+            for executor_id in islice(idle_executor_ids, num_executors):
                 self._fulfill_commitment(executor_id, dst_pool_key)
-                num_executors -= 1
 
-        assert not idle_executor_ids, "[_fulfill_commitments_from_source],2"
+        assert (
+            next(idle_executor_ids, None) is None
+        ), "[_fulfill_commitments_from_source],2"
 
     def _move_idle_executors(
         self,
@@ -759,7 +1136,7 @@ class SparkSchedSimEnv(Env):
             return  # no-op
 
         if executor_ids is None:
-            executor_ids = list(self._get_idle_source_executors(src_pool_key))
+            executor_ids = self._get_idle_source_executors(src_pool_key)
         assert executor_ids, "[_move_idle_executors],2"
 
         job_id, stage_id = src_pool_key
@@ -779,7 +1156,8 @@ class SparkSchedSimEnv(Env):
                 executor = self.executors[executor_id]
                 job = self.jobs[job_id]
                 job.detach_executor(executor)
-                executor.add_history(self.wall_time, -1)
+                if self.executor_history:
+                    self.executor_history.record(self.wall_time, executor_id, -1)
 
     def _try_backup_schedule(self, executor: Executor) -> None:
         """If a executor arrives to a stage that no longer needs any executors,
@@ -797,6 +1175,12 @@ class SparkSchedSimEnv(Env):
         self._move_idle_executors(exec_location, [executor.id_])
 
     def _move_executor_to_stage(self, executor: Executor, stage: Stage) -> None:
+        """moves `executor` to `stage`, or elsewhere if the stage doesn't need
+        it. If the executor was committed or moving to the stage, then the
+        change in the stage's demand is only indexed here (see
+        `_update_stage_demand()`), since starting a task or sending the
+        executor cancels it out in most cases.
+        """
         if stage.num_remaining_tasks == 0:
             # stage is saturated, so this executor is not needed there anymore
             self._try_backup_schedule(executor)
@@ -812,6 +1196,7 @@ class SparkSchedSimEnv(Env):
             # job pool
             executor.task = None
             self.exec_tracker.move_executor_to_pool(executor.id_, stage.job_pool_key)
+            self._update_stage_demand(stage)
             return
 
         # stage's dependencies are satisfied, so start working on it.
@@ -831,7 +1216,7 @@ class SparkSchedSimEnv(Env):
 
         # now, try searching all other jobs
         other_job_ids = [
-            job_id for job_id in self.active_job_ids if not executor.is_at_job(job_id)
+            job_id for job_id in self._ready_job_ids() if not executor.is_at_job(job_id)
         ]
 
         other_stages = self._find_schedulable_stages(
@@ -844,31 +1229,29 @@ class SparkSchedSimEnv(Env):
         # out of luck
         return None
 
-    def _compute_jobtime(
-        self, wall_time_step: float, active_job_ids_step: list[int]
-    ) -> float:
-        duration = self.wall_time - wall_time_step
-        if duration == 0.0:
-            return 0.0
-
-        # include jobs that completed and arrived during the most recent simulation run
-        all_job_ids = set(active_job_ids_step + self.active_job_ids)
-
-        job_time = 0.0
-        for job_id in all_job_ids:
-            job = self.jobs[job_id]
-            start = max(job.t_arrival, wall_time_step)
-            end = min(job.t_completed, self.wall_time)
-
-            if self.beta == 0.0:
-                job_time += end - start
-            else:
-                # continuously discounted job-time
-                job_time += np.exp(
-                    -self.beta * 1e-3 * (start - wall_time_step)
-                ) - np.exp(-self.beta * 1e-3 * (end - wall_time_step))
+    def _advance_wall_time(self, wall_time: float) -> None:
+        """advances the wall time to `wall_time`, and adds the integral of the
+        number of active jobs over the elapsed time to the step's job time
+        """
+        if wall_time == self.wall_time:
+            return
 
-        if self.beta > 0.0:
-            job_time /= self.beta
+        num_active_jobs = len(self.active_job_ids)
 
-        return job_time
+        if self.beta == 0.0:
+            self._step_job_time += num_active_jobs * (wall_time - self.wall_time)
+        else:
+            # continuously discounted from the start of the step
+            discount = math.exp(-self.beta * 1e-3 * (wall_time - self._step_start_time))
+            self._step_job_time += num_active_jobs * (self._step_discount - discount)
+            self._step_discount = discount
+
+        self.wall_time = wall_time
+
+    def _compute_jobtime(self) -> float:
+        """returns the job time accumulated during the most recent simulation
+        run, which also counts jobs that arrived and completed during the run
+        """
+        if self.beta > 0.0:
+            return self._step_job_time / self.beta
+        return self._step_job_time
@@ -20,3 +20,51 @@ def subgraph(edge_links: ndarray, node_mask: ndarray):
     edge_links = node_idx[edge_links]
 
     return edge_links
+
+
+def topological_generations(edge_links: ndarray, num_nodes: int) -> ndarray:
+    """
+    Numpy version of networkx's `topological_generations`, which returns
+    each node's generation rather than the nodes of each generation
+    Args:
+        edge_links: array of edges of shape (num_edges, 2) of a dag
+        num_nodes: number of nodes in the dag
+    """
+    src, dst = edge_links[:, 0], edge_links[:, 1]
+    generations = np.full(num_nodes, -1)
+    in_degrees = np.bincount(dst, minlength=num_nodes)
+
+    # peel off the nodes without remaining dependencies, one generation at
+    # a time
+    frontier = in_degrees == 0
+    generation = 0
+    while frontier.any():
+        generations[frontier] = generation
+        in_degrees -= np.bincount(dst[frontier[src]], minlength=num_nodes)
+        frontier = (in_degrees == 0) & (generations == -1)
+        generation += 1
+
+    return generations
+
+
+def grow(arr, min_size: int, fill_value=0):
+    """returns a copy of `arr`, which is either a list or an array, that is
+    extended along its first axis to at least `min_size`, and at least double
+    its size, with the new entries set to `fill_value`
+    """
+    size = max(min_size, 2 * len(arr))
+    if isinstance(arr, list):
+        return arr + [fill_value] * (size - len(arr))
+
+    new_arr = np.full((size, *arr.shape[1:]), fill_value, arr.dtype)
+    new_arr[: len(arr)] = arr
+    return new_arr
+
+
+def counts_to_ptr(counts) -> ndarray:
+    """returns the CSR-style pointer array of the segments whose sizes are
+    given by `counts`, i.e. their cumulative sum starting from 0
+    """
+    ptr = np.zeros(len(counts) + 1, dtype=int)
+    np.cumsum(counts, out=ptr[1:])
+    return ptr
@@ -0,0 +1,186 @@
+from typing import Any
+
+import numpy as np
+from numpy import ndarray
+
+from .spark_sched_sim import SparkSchedSimEnv
+from .components.stage_table import NUM_NODE_FEATURES
+
+
+class SparkSchedSimVecEnv:
+    """Steps `num_envs` instances of `SparkSchedSimEnv` behind a single call,
+    in the same process.
+
+    Episodes that terminate are automatically reset, and the observations of
+    all the environments are concatenated into one graph batch, so that a
+    policy can score every environment in a single forward pass. The batch is
+    ptr-indexed, i.e. the nodes, edges and jobs of environment `i` are given by
+    the ranges `node_ptr[i]:node_ptr[i+1]`, `edge_ptr[i]:edge_ptr[i+1]` and
+    `job_ptr[i]:job_ptr[i+1]` respectively.
+
+    NOTE: the arrays of a batched observation are views into buffers that are
+    reused across calls, so they are overwritten by the next call to `reset()`
+    or `step()`. Copy them if they need to outlive the step.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        env_cfg: dict[str, Any],
+        node_capacity: int = 1024,
+        edge_capacity: int = 1024,
+        job_capacity: int = 128,
+    ) -> None:
+        self.num_envs = num_envs
+
+        # the environments are only ever stepped through the trusted path, so
+        # they don't need to keep their spaces up to date
+        env_cfg = env_cfg | {"update_spaces": False}
+        self.envs = [SparkSchedSimEnv(env_cfg) for _ in range(num_envs)]
+
+        # options that every episode is reset with, including the automatic
+        # resets. Set by `reset()`.
+        self.reset_options: dict[str, Any] | None = None
+
+        # offsets of each environment's nodes, edges and jobs in the batch
+        self.node_ptr = np.zeros(num_envs + 1, dtype=int)
+        self.edge_ptr = np.zeros(num_envs + 1, dtype=int)
+        self.job_ptr = np.zeros(num_envs + 1, dtype=int)
+
+        # per-environment scalars
+        self.num_committable_execs = np.zeros(num_envs, dtype=int)
+        self.source_job_idx = np.zeros(num_envs, dtype=int)
+        self.rewards = np.zeros(num_envs)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+
+        self._allocate(node_capacity, edge_capacity, job_capacity)
+
+    def reset(
+        self, seed: int | None = None, options: dict[str, Any] | None = None
+    ) -> tuple[dict[str, ndarray], list[dict]]:
+        """resets all the environments. If `seed` is provided, then environment
+        `i` is seeded with `seed + i`.
+        """
+        self.reset_options = options
+
+        obsns, infos = [], []
+        for i, env in enumerate(self.envs):
+            env_seed = seed + i if seed is not None else None
+            obs, info = env.reset(seed=env_seed, options=self.reset_options)
+            obsns += [obs]
+            infos += [info]
+
+        return self._batch(obsns), infos
+
+    def step(
+        self, actions: list[dict]
+    ) -> tuple[dict[str, ndarray], ndarray, ndarray, ndarray, list[dict]]:
+        """steps each environment with its own action, where stage indices are
+        local to that environment's observation. An environment whose episode
+        terminates is reset immediately, so its returned observation is the
+        first one of the new episode. In that case, the info of the finished
+        episode's last step is provided under `info['final_info']`.
+        """
+        assert len(actions) == self.num_envs, "need exactly one action per env"
+
+        obsns, infos = [], []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs, reward, terminated, truncated, info = env.trusted_step(
+                action["stage_idx"], action["num_exec"]
+            )
+
+            if terminated or truncated:
+                final_info = info
+                obs, info = env.reset(options=self.reset_options)
+                info["final_info"] = final_info
+
+            self.rewards[i] = reward
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            obsns += [obs]
+            infos += [info]
+
+        return self._batch(obsns), self.rewards, self.terminated, self.truncated, infos
+
+    def close(self) -> None:
+        for env in self.envs:
+            env.close()
+
+    # internal methods
+
+    def _batch(self, obsns: list[dict]) -> dict[str, ndarray]:
+        """concatenates the environments' observations into the buffers"""
+        node_ptr, edge_ptr, job_ptr = self.node_ptr, self.edge_ptr, self.job_ptr
+
+        for i, obs in enumerate(obsns):
+            dag_batch = obs["dag_batch"]
+            node_ptr[i + 1] = node_ptr[i] + dag_batch.nodes.shape[0]
+            edge_ptr[i + 1] = edge_ptr[i] + dag_batch.edge_links.shape[0]
+            job_ptr[i + 1] = job_ptr[i] + len(obs["exec_supplies"])
+            self.num_committable_execs[i] = obs["num_committable_execs"]
+            self.source_job_idx[i] = obs["source_job_idx"]
+
+        num_nodes, num_edges, num_jobs = node_ptr[-1], edge_ptr[-1], job_ptr[-1]
+        if (
+            num_nodes > self._nodes.shape[0]
+            or num_edges > self._edge_links.shape[0]
+            or num_jobs >= self._dag_ptr.size
+        ):
+            # buffers at least double in size, so that reallocations are rare
+            self._allocate(
+                max(num_nodes, 2 * self._nodes.shape[0]),
+                max(num_edges, 2 * self._edge_links.shape[0]),
+                max(num_jobs + 1, 2 * self._dag_ptr.size),
+            )
+
+        for i, obs in enumerate(obsns):
+            dag_batch = obs["dag_batch"]
+            self._nodes[node_ptr[i] : node_ptr[i + 1]] = dag_batch.nodes
+
+            # edge links are relabeled from local to batch node indices
+            np.add(
+                dag_batch.edge_links,
+                node_ptr[i],
+                out=self._edge_links[edge_ptr[i] : edge_ptr[i + 1]],
+            )
+
+            # the last entry of each job pointer is the start of the next
+            # environment's job pointer, so it can be dropped
+            np.add(
+                obs["dag_ptr"][:-1],
+                node_ptr[i],
+                out=self._dag_ptr[job_ptr[i] : job_ptr[i + 1]],
+            )
+
+            self._exec_supplies[job_ptr[i] : job_ptr[i + 1]] = obs["exec_supplies"]
+
+        self._dag_ptr[num_jobs] = num_nodes
+
+        return {
+            # shape: (total num active stages) x (num node features)
+            "nodes": self._nodes[:num_nodes],
+            # shape: (total num edges) x 2, in terms of batch node indices
+            "edge_links": self._edge_links[:num_edges],
+            # length: total num active jobs + 1. `dag_ptr[job_ptr[i] + j]` is
+            # the batch index of the first stage of job `j` in environment `i`
+            "dag_ptr": self._dag_ptr[: num_jobs + 1],
+            # length: total num active jobs
+            "exec_supplies": self._exec_supplies[:num_jobs],
+            # length: num envs + 1
+            "node_ptr": node_ptr,
+            "edge_ptr": edge_ptr,
+            "job_ptr": job_ptr,
+            # length: num envs. Source job indices are local to each env, and
+            # equal to its number of active jobs if the source is the common pool
+            "num_committable_execs": self.num_committable_execs,
+            "source_job_idx": self.source_job_idx,
+        }
+
+    def _allocate(
+        self, node_capacity: int, edge_capacity: int, job_capacity: int
+    ) -> None:
+        self._nodes = np.zeros((node_capacity, NUM_NODE_FEATURES), dtype=np.float32)
+        self._edge_links = np.zeros((edge_capacity, 2), dtype=int)
+        self._dag_ptr = np.zeros(job_capacity, dtype=int)
+        self._exec_supplies = np.zeros(job_capacity, dtype=int)
@@ -0,0 +1,69 @@
+import pytest
+
+# config of the tests that run whole episodes, which override individual
+# entries as needed, e.g. `env_cfg | {"job_arrival_cap": 20}`
+ENV_CFG = {
+    "num_executors": 10,
+    "job_arrival_cap": 10,
+    "moving_delay": 2000.0,
+    "job_arrival_rate": 4.0e-5,
+    "warmup_delay": 1000.0,
+    "data_sampler_cls": "TPCHDataSampler",
+}
+
+
+def first_stage_action(obs):
+    """commits all the committable executors to the first schedulable stage"""
+    return {"stage_idx": 0, "num_exec": obs["num_committable_execs"]}
+
+
+def make_random_policy(rng):
+    """returns a policy that selects a uniformly random schedulable stage and
+    number of executors, using `rng`
+    """
+
+    def policy(obs):
+        num_schedulable_stages = int(obs["dag_batch"].nodes[:, 2].sum())
+        return {
+            "stage_idx": int(rng.integers(num_schedulable_stages)),
+            "num_exec": int(rng.integers(1, obs["num_committable_execs"] + 1)),
+        }
+
+    return policy
+
+
+def run_episode(env, obs, policy=first_stage_action, step=None):
+    """steps through the rest of the episode from `obs`, selecting actions with
+    `policy` and submitting them via `step` (`env.step` by default), and
+    returns everything that was observed along the way
+    """
+    step = step or env.step
+    trajectory = []
+    terminated = False
+    while not terminated:
+        obs, reward, terminated, _, info = step(policy(obs))
+        trajectory += [
+            (
+                obs["dag_batch"].nodes.tolist(),
+                obs["dag_batch"].edge_links.tolist(),
+                obs["exec_supplies"],
+                reward,
+                info,
+            )
+        ]
+    return trajectory
+
+
+@pytest.fixture
+def env_cfg():
+    return ENV_CFG.copy()
+
+
+@pytest.fixture
+def rollout():
+    return run_episode
+
+
+@pytest.fixture
+def random_policy():
+    return make_random_policy
@@ -0,0 +1,22 @@
+import numpy as np
+
+from spark_sched_sim.components.active_graph import ActiveGraph
+from spark_sched_sim.utils import subgraph
+
+
+def test_matches_subgraph_of_all_edges():
+    # two jobs with three stages each, laid out one after the other
+    job_edge_links = np.array([[0, 1], [0, 2], [1, 2]])
+    all_edge_links = np.vstack([job_edge_links, 3 + job_edge_links])
+    active = np.ones(6, dtype=bool)
+
+    graph = ActiveGraph()
+    graph.add_job(0, 3, job_edge_links)
+    graph.add_job(3, 3, job_edge_links)
+
+    for stage_idx in [0, 4, 1, 3]:
+        active[stage_idx] = False
+        graph.remove_stage(stage_idx)
+
+        assert (graph.stage_idx == active.nonzero()[0]).all()
+        assert (graph.relabelled_edge_links() == subgraph(all_edge_links, active)).all()
@@ -0,0 +1,143 @@
+import json
+import os
+
+import pytest
+
+from spark_sched_sim import SparkSchedSimEnv
+from spark_sched_sim.data_samplers import EventLogDataSampler, TPCHDataSampler
+from spark_sched_sim.data_samplers.event_log import (
+    _is_stale,
+    ingest_event_logs,
+    parse_event_log,
+)
+
+
+def job_start(job_id, t, stage_parents):
+    return {
+        "Event": "SparkListenerJobStart",
+        "Job ID": job_id,
+        "Submission Time": t,
+        "Stage Infos": [
+            {"Stage ID": stage_id, "Number of Tasks": 2, "Parent IDs": parent_ids}
+            for stage_id, parent_ids in stage_parents.items()
+        ],
+    }
+
+
+def task_end(stage_id, executor_id, t_launch, t_finish, reason="Success"):
+    return {
+        "Event": "SparkListenerTaskEnd",
+        "Stage ID": stage_id,
+        "Task End Reason": {"Reason": reason},
+        "Task Info": {
+            "Executor ID": executor_id,
+            "Launch Time": t_launch,
+            "Finish Time": t_finish,
+            "Failed": reason != "Success",
+        },
+    }
+
+
+def job_end(job_id, result="JobSucceeded"):
+    return {
+        "Event": "SparkListenerJobEnd",
+        "Job ID": job_id,
+        "Job Result": {"Result": result},
+    }
+
+
+EVENTS = [
+    {"Event": "SparkListenerLogStart", "Spark Version": "3.5.0"},
+    {"Event": "SparkListenerExecutorAdded", "Executor ID": "1"},
+    {"Event": "SparkListenerExecutorAdded", "Executor ID": "2"},
+    job_start(0, 1000, {0: [], 1: [0]}),
+    task_end(0, "1", 1000, 1500),
+    task_end(0, "2", 1000, 1600),
+    task_end(0, "1", 1500, 1900),
+    task_end(1, "1", 2000, 2300),
+    task_end(1, "2", 2000, 2100),
+    task_end(1, "2", 2100, 2200, reason="ExecutorLostFailure"),
+    job_end(0),
+    # stages 0 and 1 are reused from job 0, so they're skipped
+    job_start(1, 5000, {0: [], 1: [0], 2: [1]}),
+    task_end(2, "1", 5000, 5700),
+    job_end(1),
+    job_start(2, 6000, {3: []}),
+    task_end(3, "1", 6000, 6100),
+    job_end(2, result="JobFailed"),
+]
+
+
+def write_event_log(tmp_path, name="app-0001"):
+    path = tmp_path / name
+    path.write_text("".join(json.dumps(event) + "\n" for event in EVENTS))
+    return str(path)
+
+
+def test_jobs_are_reconstructed(tmp_path):
+    jobs = list(parse_event_log(write_event_log(tmp_path)))
+    assert [t_submitted for t_submitted, *_ in jobs] == [1000.0, 5000.0]
+
+    _, edge_links, stage_params = jobs[0]
+    assert edge_links.tolist() == [[0, 1]]
+    (_, _, stage_0), (_, _, stage_1) = stage_params
+    assert stage_0["fresh_durations"] == {5: [500.0, 600.0]}
+    assert stage_0["rest_wave"] == {5: [400.0]}
+    assert stage_0["first_wave"] == {5: [500.0, 600.0]}
+    assert stage_1["first_wave"] == {5: [300.0, 100.0]}
+
+    _, edge_links, stage_params = jobs[1]
+    assert edge_links.shape == (0, 2) and len(stage_params) == 1
+
+
+def test_ingested_jobs_are_replayed(tmp_path, env_cfg, rollout):
+    event_log_path = write_event_log(tmp_path)
+    env = SparkSchedSimEnv(
+        env_cfg
+        | {
+            "num_executors": 4,
+            "job_arrival_cap": 2,
+            "data_sampler_cls": "EventLogDataSampler",
+            "event_log_paths": [event_log_path],
+            "replay_arrivals": True,
+        }
+    )
+    assert (tmp_path / "app-0001.packed").exists()
+
+    obs, _ = env.reset(seed=0)
+    rollout(env, obs)
+
+    assert [job.t_arrival for job in env.jobs.values()] == [0.0, 4000.0]
+    assert [job.num_stages for job in env.jobs.values()] == [2, 1]
+    assert env.num_completed_jobs == 2
+
+
+def test_stale_datasets_are_detected(tmp_path):
+    log_path = write_event_log(tmp_path)
+    other_log_path = write_event_log(tmp_path, "app-0002")
+    packed_path = str(tmp_path / "logs.packed")
+    assert _is_stale(packed_path, [log_path])
+
+    ingest_event_logs([log_path], packed_path)
+    assert not _is_stale(packed_path, [log_path])
+    assert _is_stale(packed_path, [log_path, other_log_path])
+    assert _is_stale(packed_path, [other_log_path])
+
+    # an appended log is stale even if its modification time is restored
+    stat = os.stat(log_path)
+    with open(log_path, "a") as fp:
+        fp.write("\n")
+    os.utime(log_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert _is_stale(packed_path, [log_path])
+
+
+def test_missing_dataset_is_rejected(tmp_path, monkeypatch, env_cfg):
+    def download_tpch_dataset(cls):
+        pytest.fail("the TPC-H dataset must not be downloaded")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        TPCHDataSampler, "_download_tpch_dataset", classmethod(download_tpch_dataset)
+    )
+    with pytest.raises(ValueError):
+        EventLogDataSampler(**env_cfg)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from spark_sched_sim.components import Stage
+from spark_sched_sim.components.event import (
+    EventQueue,
+    ExecutorEventQueue,
+    JobArrival,
+    TaskFinished,
+)
+
+
+def make_tasks(num_executors):
+    """returns one task per executor, with the task's id equal to the executor's"""
+    stage = Stage(0, 0, num_executors, 0.0)
+    tasks = [stage.get_task(i) for i in range(num_executors)]
+    for task in tasks:
+        task.executor_id = task.id_
+    return tasks
+
+
+def test_executor_event_queue_matches_heap():
+    rng = np.random.default_rng(0)
+    num_executors = 70
+    queues = [EventQueue(), ExecutorEventQueue(capacity=4)]
+    tasks = make_tasks(num_executors)
+
+    for queue in queues:
+        queue.reset()
+
+    def push(t, event):
+        for queue in queues:
+            queue.push(t, event)
+
+    # coarse times, so that there are many ties
+    for t in np.sort(rng.integers(0, 50, 20)):
+        push(float(t), JobArrival(None))
+    for task in tasks:
+        push(float(rng.integers(0, 50)), TaskFinished(None, task))
+
+    popped = 0
+    while queues[0]:
+        assert queues[0].top() == queues[1].top()
+        t, event = queues[0].pop()
+        assert queues[1].pop() == (t, event)
+        popped += 1
+
+        if type(event) is TaskFinished and rng.random() < 0.8:
+            push(t + float(rng.integers(0, 10)), event)
+        if rng.random() < 0.05:
+            push(t + float(rng.integers(0, 10)), JobArrival(None))
+
+    assert not queues[1]
+    assert queues[1].pop() is None
+    assert popped > num_executors
@@ -0,0 +1,15 @@
+from spark_sched_sim.components.executor_history import ExecutorHistory
+
+
+def test_executor_history_after_truncate():
+    history = ExecutorHistory(num_executors=2, capacity=1)
+    history.record(1.0, 0, 3)
+    history.record(2.0, 1, 4)
+    history.record(3.0, 0, -1)
+    assert history.executor_history(0) == [[1.0, -1], [3.0, 3], [None, -1]]
+    assert history.executor_history(1) == [[2.0, -1], [None, 4]]
+
+    history.truncate(2)
+    history.record(5.0, 1, -1)
+    assert history.executor_history(0) == [[1.0, -1], [None, 3]]
+    assert history.executor_history(1) == [[2.0, -1], [5.0, 4], [None, -1]]
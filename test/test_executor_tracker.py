@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from spark_sched_sim import SparkSchedSimEnv
+from spark_sched_sim.components.executor_tracker import (
+    ExecutorTracker,
+    ArrayExecutorTracker,
+    COMMON_POOL_KEY,
+)
+
+NUM_EXECUTORS = 6
+
+
+def assert_same_state(trackers, pool_keys, job_ids):
+    a, b = trackers
+    assert a.get_source() == b.get_source()
+    assert a.source_job_id() == b.source_job_id()
+    assert a.num_committable_execs() == b.num_committable_execs()
+    assert a.common_pool_has_executors() == b.common_pool_has_executors()
+    assert a.get_source_commitments() == b.get_source_commitments()
+    if a.get_source() is not None:
+        for tracker in trackers:
+            assert set(tracker.iter_source_pool()) == tracker.get_source_pool()
+    for pool_key in pool_keys:
+        assert a.get_pool(pool_key) == b.get_pool(pool_key)
+        for tracker in trackers:
+            assert set(tracker.iter_pool(pool_key)) == tracker.get_pool(pool_key)
+        assert a.pool_size(pool_key) == b.pool_size(pool_key)
+        assert a.peek_commitment(pool_key) == b.peek_commitment(pool_key)
+        if pool_key[1] is not None:
+            assert a.num_executors_moving_to_stage(
+                pool_key
+            ) == b.num_executors_moving_to_stage(pool_key)
+            assert a.num_commitments_to_stage(pool_key) == b.num_commitments_to_stage(
+                pool_key
+            )
+    for job_id in job_ids:
+        assert a.exec_supply(job_id) == b.exec_supply(job_id)
+    for executor_id in range(NUM_EXECUTORS):
+        assert a.executor_location(executor_id) == b.executor_location(executor_id)
+
+
+def test_array_tracker_matches_dict_tracker():
+    trackers = [ExecutorTracker(NUM_EXECUTORS), ArrayExecutorTracker(NUM_EXECUTORS)]
+    stage_keys = [(0, 0), (0, 1), (1, 0)]
+    pool_keys = [COMMON_POOL_KEY, (0, None), (1, None)] + stage_keys
+
+    def apply(method, *args):
+        results = [getattr(tracker, method)(*args) for tracker in trackers]
+        assert results[0] == results[1]
+        assert_same_state(trackers, pool_keys, [0, 1])
+
+    for tracker in trackers:
+        tracker.reset()
+        for job_id in [0, 1]:
+            tracker.add_job_pool((job_id, None))
+        for stage_key in stage_keys:
+            tracker.add_stage_pool(stage_key)
+    assert_same_state(trackers, pool_keys, [0, 1])
+
+    # commitment round at the common pool
+    apply("update_executor_source", COMMON_POOL_KEY)
+    apply("add_commitment", 3, (0, 0))
+    apply("add_commitment", 2, (1, 0))
+    apply("add_commitment", 1, COMMON_POOL_KEY)
+
+    # fulfill the commitments by sending executors to their stages
+    for executor_id, dst_pool_key in zip(range(5), 3 * [(0, 0)] + 2 * [(1, 0)]):
+        apply("remove_commitment", executor_id, dst_pool_key)
+        apply("move_executor_to_pool", executor_id, dst_pool_key, True)
+    apply("clear_executor_source")
+
+    # executors arrive at their jobs, then start working on their stages
+    for executor_id, stage_key in zip(range(5), 3 * [(0, 0)] + 2 * [(1, 0)]):
+        apply("record_executor_arrival", stage_key)
+        apply("move_executor_to_pool", executor_id, (stage_key[0], None))
+        apply("move_executor_to_pool", executor_id, stage_key)
+
+    # stage (0, 0) releases its executors to stage (0, 1) and to job 1
+    apply("update_executor_source", (0, 0))
+    apply("add_commitment", 2, (0, 1))
+    apply("add_commitment", 1, (1, 0))
+    apply("remove_commitment", 0, (0, 1))
+    apply("move_executor_to_pool", 0, (0, 1))
+    apply("remove_commitment", 1, (1, 0))
+    apply("move_executor_to_pool", 1, (1, 0), True)
+
+    # executors return to the common pool
+    apply("move_executor_to_pool", 3, (1, None))
+    apply("move_executor_to_pool", 3, COMMON_POOL_KEY)
+
+
+def test_array_tracker_grows():
+    tracker = ArrayExecutorTracker(NUM_EXECUTORS, pool_capacity=4, job_capacity=2)
+    tracker.reset()
+    for job_id in range(10):
+        tracker.add_job_pool((job_id, None))
+        for stage_id in range(3):
+            tracker.add_stage_pool((job_id, stage_id))
+
+    tracker.update_executor_source(COMMON_POOL_KEY)
+    tracker.add_commitment(NUM_EXECUTORS, (9, 2))
+    assert tracker.exec_supply(9) == NUM_EXECUTORS
+    assert tracker.num_commitments_to_stage((9, 2)) == NUM_EXECUTORS
+
+    with pytest.raises(ValueError):
+        tracker.add_stage_pool((9, 2))
+
+
+def test_array_tracker_episode_matches_dict_tracker(env_cfg, rollout, random_policy):
+    trajectories = []
+    for exec_tracker_cls in ["ExecutorTracker", "ArrayExecutorTracker"]:
+        env = SparkSchedSimEnv(
+            env_cfg
+            | {
+                "num_executors": 50,
+                "job_arrival_cap": 30,
+                "exec_tracker_cls": exec_tracker_cls,
+            }
+        )
+        obs, _ = env.reset(seed=42)
+        trajectories += [rollout(env, obs, random_policy(np.random.default_rng(0)))]
+
+    assert trajectories[0] == trajectories[1]
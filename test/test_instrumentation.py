@@ -0,0 +1,20 @@
+from spark_sched_sim import SparkSchedSimEnv
+
+
+def test_stats_count_every_decision_and_event(env_cfg, rollout):
+    env = SparkSchedSimEnv(env_cfg | {"instrument": True})
+    obs, _ = env.reset(seed=42)
+    num_steps = len(rollout(env, obs))
+
+    stats = env.stats()
+    phases = stats["phases"]
+    assert stats["counts"]["decisions"] == num_steps
+    assert phases["step"]["calls"] == num_steps
+    assert phases["handle_JobArrival"]["calls"] == env_cfg["job_arrival_cap"]
+    assert stats["counts"]["events"] == sum(
+        phases[f"handle_{event}"]["calls"]
+        for event in ["JobArrival", "TaskFinished", "ExecutorReady"]
+    )
+
+    env.instrumentation.reset()
+    assert not env.stats()["counts"]
@@ -0,0 +1,50 @@
+import networkx as nx
+import numpy as np
+
+from spark_sched_sim.components import JobTemplate
+from spark_sched_sim.data_samplers import TPCHDataSampler
+from spark_sched_sim.utils import topological_generations
+
+
+def test_template_structure():
+    # 0 -> 1 -> 3, 0 -> 2 -> 3, 4 is isolated
+    edge_links = np.array([[0, 1], [0, 2], [1, 3], [2, 3]])
+    template = JobTemplate(edge_links, [1] * 5, [1.0, 5.0, 2.0, 1.0, 3.0])
+
+    assert template.source_ids.tolist() == [0, 4]
+    assert template.generations.tolist() == [0, 1, 1, 2, 0]
+    assert template.critical_path_durations.tolist() == [7.0, 6.0, 3.0, 1.0, 3.0]
+
+
+def test_generations_match_networkx():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        adj_mat = np.triu(rng.random((20, 20)) < 0.15, 1)
+        perm = rng.permutation(20)
+        edge_links = np.argwhere(adj_mat[np.ix_(perm, perm)])
+
+        dag = nx.DiGraph()
+        dag.add_nodes_from(range(20))
+        dag.add_edges_from(edge_links.tolist())
+        generations = np.zeros(20, dtype=int)
+        for generation, nodes in enumerate(nx.topological_generations(dag)):
+            generations[nodes] = generation
+
+        assert (topological_generations(edge_links, 20) == generations).all()
+
+
+def test_jobs_share_templates():
+    sampler = TPCHDataSampler(
+        job_arrival_rate=4.0e-5,
+        job_arrival_cap=200,
+        num_executors=10,
+        warmup_delay=1000.0,
+    )
+    sampler.reset(np.random.default_rng(0))
+    jobs = [job for _, job in sampler.job_sequence(np.inf)]
+
+    templates = {}
+    for job in jobs:
+        template = templates.setdefault((job.query_num, job.query_size), job.template)
+        assert job.template is template
+    assert len(templates) < len(jobs)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from spark_sched_sim import SparkSchedSimEnv
+
+
+def rescan_schedulable_stages(env, job_ids=None, source_job_id=None):
+    """finds the schedulable stages by checking every active stage, as the
+    env did before it maintained an index of ready stages
+    """
+    job_ids = job_ids or env.active_job_ids
+    source_job_id = source_job_id or env.exec_tracker.source_job_id()
+
+    def is_saturated(stage):
+        return env._get_executor_demand(stage) <= 0
+
+    schedulable_stages = []
+    for job_id in job_ids:
+        job = env.jobs[job_id]
+        if (
+            job_id != source_job_id
+            and env.exec_tracker.exec_supply(job_id) >= env.num_executors
+        ):
+            continue
+        schedulable_stages += [
+            stage
+            for stage in job.active_stages
+            if stage not in env.selected_stages
+            and not is_saturated(stage)
+            and all(is_saturated(parent) for parent in job.get_parent_stages(stage))
+        ]
+    return schedulable_stages
+
+
+def test_ready_stage_index_matches_rescan(env_cfg, rollout, random_policy):
+    env_cfg |= {"num_executors": 50, "job_arrival_cap": 30}
+    env = SparkSchedSimEnv(env_cfg)
+    obs, _ = env.reset(seed=0)
+
+    find_schedulable_stages = env._find_schedulable_stages
+    num_searches = 0
+
+    def checked_find_schedulable_stages(job_ids=None, source_job_id=None):
+        nonlocal num_searches
+        job_ids = list(job_ids) if job_ids else None
+        schedulable_stages = find_schedulable_stages(job_ids, source_job_id)
+        assert schedulable_stages == rescan_schedulable_stages(
+            env, job_ids, source_job_id
+        )
+        num_searches += 1
+        return schedulable_stages
+
+    env._find_schedulable_stages = checked_find_schedulable_stages
+    rollout(env, obs, random_policy(np.random.default_rng(0)))
+    assert num_searches > 0
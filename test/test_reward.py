@@ -0,0 +1,12 @@
+import numpy as np
+
+from spark_sched_sim import SparkSchedSimEnv
+
+
+def test_rewards_sum_to_total_job_time(env_cfg, rollout):
+    env = SparkSchedSimEnv(env_cfg | {"job_arrival_cap": 20})
+    obs, _ = env.reset(seed=42)
+    total_reward = sum(reward for *_, reward, _ in rollout(env, obs))
+
+    job_durations = [job.t_completed - job.t_arrival for job in env.jobs.values()]
+    assert np.isclose(-total_reward, sum(job_durations))
@@ -0,0 +1,39 @@
+import numpy as np
+
+from spark_sched_sim import SparkSchedSimEnv
+
+
+def test_restore_reproduces_episode(env_cfg, rollout, random_policy):
+    env = SparkSchedSimEnv(env_cfg)
+    obs, _ = env.reset(seed=42)
+
+    # take some steps before taking the snapshot
+    for _ in range(20):
+        obs, *_ = env.step({"stage_idx": 0, "num_exec": obs["num_committable_execs"]})
+    snapshot = env.snapshot()
+
+    trajectory = rollout(env, obs, random_policy(np.random.default_rng(1)))
+
+    # diverge from the snapshot, then restore it a couple of times
+    rng = np.random.default_rng(0)
+    for _ in range(2):
+        obs, _ = env.restore(snapshot)
+        rollout(env, obs, random_policy(rng))
+        obs, _ = env.restore(snapshot)
+        policy = random_policy(np.random.default_rng(1))
+        assert rollout(env, obs, policy) == trajectory
+
+
+def test_snapshots_leave_episode_unchanged(env_cfg, rollout, random_policy):
+    env = SparkSchedSimEnv(env_cfg | {"num_executors": 50, "job_arrival_cap": 30})
+    obs, _ = env.reset(seed=42)
+    trajectory = rollout(env, obs, random_policy(np.random.default_rng(0)))
+
+    policy = random_policy(np.random.default_rng(0))
+
+    def snapshotting_policy(obs):
+        env.snapshot()
+        return policy(obs)
+
+    obs, _ = env.reset(seed=42)
+    assert rollout(env, obs, snapshotting_policy) == trajectory
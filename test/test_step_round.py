@@ -0,0 +1,83 @@
+import pytest
+
+from spark_sched_sim import SparkSchedSimEnv
+
+
+def test_round_matches_individual_steps(env_cfg, rollout):
+    env = SparkSchedSimEnv(env_cfg | {"job_arrival_cap": 20})
+
+    # every round commits as many executors as possible to the first
+    # schedulable stage, and the rest to the common pool
+    def policy(obs):
+        stage_idx = -1 if env.selected_stages else 0
+        return {"stage_idx": stage_idx, "num_exec": obs["num_committable_execs"]}
+
+    round_closed = []
+
+    def step(action):
+        result = env.step(action)
+        round_closed.append(not env.selected_stages)
+        return result
+
+    obs, _ = env.reset(seed=42)
+    trajectory = rollout(env, obs, policy, step)
+    trajectory = [
+        observed for observed, closed in zip(trajectory, round_closed) if closed
+    ]
+
+    obs, _ = env.reset(seed=42)
+    round_trajectory = rollout(
+        env, obs, lambda obs: [(0, obs["num_committable_execs"])], env.step_round
+    )
+
+    assert round_trajectory == trajectory
+
+
+def start_busy_round(env):
+    """advances `env` to a round with at least two schedulable stages and
+    two committable executors
+    """
+    obs, _ = env.reset(seed=42)
+    while len(env.schedulable_stages) < 2 or obs["num_committable_execs"] < 2:
+        obs, *_ = env.step_round([(0, 1)])
+    return obs
+
+
+def test_round_commitments(env_cfg, rollout):
+    env = SparkSchedSimEnv(env_cfg)
+    obs = start_busy_round(env)
+    snapshot = env.snapshot()
+    num_execs = obs["num_committable_execs"]
+
+    def outcome(actions):
+        env.restore(snapshot)
+        obs, *_ = env.step_round(actions)
+        return rollout(env, obs)
+
+    # already selected stages are skipped
+    assert outcome([(0, 1), (0, 1)]) == outcome([(0, 1)])
+
+    # commitments are truncated to the remaining committable executors
+    assert outcome([(0, 1), (1, num_execs)]) == outcome([(0, 1), (1, num_execs - 1)])
+
+    # -1 ends the round early
+    assert outcome([(0, 1), (-1, 1), (1, 1)]) == outcome([(0, 1)])
+
+
+def test_invalid_round_is_not_applied(env_cfg, rollout):
+    env = SparkSchedSimEnv(env_cfg)
+    start_busy_round(env)
+    snapshot = env.snapshot()
+
+    invalid_stage_idx = len(env.schedulable_stages)
+    with pytest.raises(ValueError):
+        env.step_round([(0, 1), (invalid_stage_idx, 1)])
+    with pytest.raises(ValueError):
+        env.step_round([(0, 1), (1, 0)])
+
+    obs, *_ = env.step_round([(0, 1)])
+    trajectory = rollout(env, obs)
+
+    env.restore(snapshot)
+    obs, *_ = env.step_round([(0, 1)])
+    assert rollout(env, obs) == trajectory
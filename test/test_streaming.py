@@ -0,0 +1,19 @@
+from spark_sched_sim import SparkSchedSimEnv
+
+
+def test_jobs_are_sampled_as_they_arrive(env_cfg, rollout):
+    env = SparkSchedSimEnv(
+        env_cfg | {"job_arrival_cap": 20, "stream_job_arrivals": True}
+    )
+
+    def policy(obs):
+        # at most one job is sampled ahead of the simulation
+        num_arrived_jobs = env.num_active_jobs + env.num_completed_jobs
+        assert len(env.jobs) <= num_arrived_jobs + 1
+        return {"stage_idx": 0, "num_exec": obs["num_committable_execs"]}
+
+    obs, _ = env.reset(seed=42)
+    rollout(env, obs, policy)
+
+    assert env.num_completed_jobs == 20
+    assert env.all_job_ptr[len(env.jobs)] == env.num_total_stages
@@ -0,0 +1,52 @@
+import networkx as nx
+import numpy as np
+
+from spark_sched_sim import SparkSchedSimEnv
+from spark_sched_sim.data_samplers import SyntheticDataSampler
+from spark_sched_sim.data_samplers.synthetic import DAG_FAMILIES
+
+SYNTHETIC_CFG = {
+    "data_sampler_cls": "SyntheticDataSampler",
+    "num_stages": (1, 40),
+    "num_tasks": (1, 10),
+}
+
+
+def test_dags_are_valid(env_cfg):
+    for family in DAG_FAMILIES:
+        sampler = SyntheticDataSampler(
+            **env_cfg | SYNTHETIC_CFG | {"dag_families": [family]}
+        )
+        sampler.reset(np.random.default_rng(0))
+        for _, job in sampler.job_sequence(np.inf):
+            edge_links = job.edge_links
+            assert nx.is_directed_acyclic_graph(job.dag)
+            assert (edge_links[:, 0] < edge_links[:, 1]).all()
+            assert (np.unique(edge_links, axis=0) == edge_links).all()
+            for stage in job.stages:
+                assert stage.task_durations.size == stage.num_tasks
+
+
+def test_episode_completes(env_cfg, rollout):
+    env = SparkSchedSimEnv(env_cfg | SYNTHETIC_CFG)
+    obs, _ = env.reset(seed=0)
+    rollout(env, obs)
+
+    assert env.num_completed_jobs == env_cfg["job_arrival_cap"]
+
+
+def test_layered_edges_grow_linearly(env_cfg):
+    num_stages = 2000
+    sampler = SyntheticDataSampler(
+        **env_cfg
+        | SYNTHETIC_CFG
+        | {
+            "dag_families": ["layered"],
+            "num_stages": (num_stages, num_stages),
+            "layered_extra_parents": 2.0,
+        }
+    )
+    sampler.reset(np.random.default_rng(0))
+    for _, job in sampler.job_sequence(np.inf):
+        # one parent in the previous layer, and two more on average
+        assert len(job.edge_links) < 4 * num_stages
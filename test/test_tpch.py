@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from spark_sched_sim.data_samplers import TPCHDataSampler
+from spark_sched_sim.data_samplers.tpch import IDLE, SAME_STAGE, OTHER_STAGE
+from spark_sched_sim.data_samplers.tpch_packed import (
+    build_packed_dataset,
+    share_packed_dataset,
+)
+
+SAMPLER_CFG = {
+    "job_arrival_rate": 4.0e-5,
+    "job_arrival_cap": 50,
+    "num_executors": 10,
+    "warmup_delay": 1000.0,
+}
+
+
+def sample_jobs(sampler):
+    sampler.reset(np.random.default_rng(0))
+    return [job for _, job in sampler.job_sequence(np.inf)]
+
+
+def test_cached_queries_match_loaded_queries():
+    uncached_jobs = sample_jobs(TPCHDataSampler(**SAMPLER_CFG, query_cache_size=0))
+
+    sampler = TPCHDataSampler(**SAMPLER_CFG, query_cache_size=4)
+    for _ in range(2):
+        jobs = sample_jobs(sampler)
+        for job, uncached_job in zip(jobs, uncached_jobs):
+            assert (job.edge_links == uncached_job.edge_links).all()
+            for stage, uncached_stage in zip(job.stages, uncached_job.stages):
+                assert stage.num_tasks == uncached_stage.num_tasks
+                assert stage.rough_task_duration == uncached_stage.rough_task_duration
+
+    assert sampler._load_parsed_query.cache_info().currsize <= 4
+
+
+def test_packed_dataset_matches_extracted_dataset(tmp_path):
+    packed_path = str(tmp_path / "tpch.packed")
+    build_packed_dataset("data/tpch", packed_path)
+
+    jobs = sample_jobs(TPCHDataSampler(**SAMPLER_CFG))
+    packed_jobs = sample_jobs(
+        TPCHDataSampler(**SAMPLER_CFG, packed_dataset_path=packed_path)
+    )
+    for job, packed_job in zip(jobs, packed_jobs):
+        assert (job.edge_links == packed_job.edge_links).all()
+        for stage, packed_stage in zip(job.stages, packed_job.stages):
+            assert stage.num_tasks == packed_stage.num_tasks
+            data, packed_data = (
+                stage.task_duration_data,
+                packed_stage.task_duration_data,
+            )
+            for wave, durations in data.items():
+                assert durations.keys() == packed_data[wave].keys()
+                for executor_key, wave_durations in durations.items():
+                    assert wave_durations == packed_data[wave][executor_key].tolist()
+
+
+def test_duration_table_resolves_wave_fallbacks():
+    data = {
+        "fresh_durations": {5: [1.0], 10: []},
+        "first_wave": {5: [2.0], 10: [3.0]},
+        "rest_wave": {5: [4.0]},
+    }
+    table = TPCHDataSampler._resolve_duration_table(data)
+
+    def resolved(situation, executor_key):
+        durations, warmup = table[situation][executor_key]
+        return durations.tolist(), warmup
+
+    assert resolved(IDLE, 5) == ([1.0], False)
+    assert resolved(IDLE, 10) == ([3.0], True)
+    assert resolved(SAME_STAGE, 5) == ([4.0], False)
+    assert resolved(SAME_STAGE, 10) == ([3.0], False)
+    assert resolved(OTHER_STAGE, 5) == ([2.0], False)
+
+    # executor keys beyond the recorded ones fall back to the largest one
+    assert resolved(OTHER_STAGE, 100) == ([3.0], False)
+
+
+def test_block_sampled_durations_are_reproducible():
+    durations = []
+    for _ in range(2):
+        sampler = TPCHDataSampler(**SAMPLER_CFG, task_duration_block_size=16)
+        job = sample_jobs(sampler)[0]
+        job.local_executors = {0, 1, 2}
+        executor = SimpleNamespace(is_idle=True, task=None)
+        durations += [
+            [
+                sampler.task_duration(job, stage, None, executor)
+                for stage in job.stages
+                for _ in range(stage.num_tasks)
+            ]
+        ]
+
+    assert durations[0] == durations[1]
+
+
+def test_shared_dataset_matches_extracted_dataset():
+    shm = share_packed_dataset(tpch_dir="data/tpch")
+    try:
+        sampler = TPCHDataSampler(**SAMPLER_CFG, shared_dataset_name=shm.name)
+        jobs = sample_jobs(TPCHDataSampler(**SAMPLER_CFG))
+        for job, shared_job in zip(jobs, sample_jobs(sampler)):
+            assert (job.edge_links == shared_job.edge_links).all()
+            for stage, shared_stage in zip(job.stages, shared_job.stages):
+                assert stage.num_tasks == shared_stage.num_tasks
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from spark_sched_sim import SparkSchedSimEnv
+from spark_sched_sim.data_samplers.trace import convert_csv, read_trace_chunks
+
+TRACE_CSV = """job_id,arrival_time,stage_id,parent_ids,task_durations
+a,5000,0,,100 200
+a,5000,1,0,300
+a,5000,2,0 1,400 500 600
+b,9000,0,,700
+c,12000,1,0,800 900
+c,12000,0,,1000
+"""
+
+
+def test_converted_trace_is_streamed(tmp_path, env_cfg, rollout):
+    csv_path = tmp_path / "trace.csv"
+    csv_path.write_text(TRACE_CSV)
+    trace_path = str(tmp_path / "trace.bin")
+    assert convert_csv(csv_path, trace_path, chunk_size=2) == 3
+    assert len(list(read_trace_chunks(trace_path))) == 2
+
+    env = SparkSchedSimEnv(
+        env_cfg
+        | {
+            "num_executors": 4,
+            "job_arrival_cap": 3,
+            "data_sampler_cls": "TraceDataSampler",
+            "trace_path": trace_path,
+        }
+    )
+    obs, _ = env.reset(seed=0)
+    rollout(env, obs)
+
+    jobs = env.jobs
+    assert [job.t_arrival for job in jobs.values()] == [0.0, 4000.0, 7000.0]
+    assert jobs[0].edge_links.tolist() == [[0, 1], [0, 2], [1, 2]]
+    assert jobs[2].edge_links.tolist() == [[0, 1]]
+    assert jobs[2].stages[0].task_durations.tolist() == [1000.0]
+    assert np.isclose(jobs[0].stages[2].rough_task_duration, 500.0)
+    assert env.num_completed_jobs == 3
+
+
+def test_trace_runs_to_its_end(tmp_path, env_cfg, rollout):
+    csv_path = tmp_path / "trace.csv"
+    csv_path.write_text(TRACE_CSV)
+    trace_path = str(tmp_path / "trace.bin")
+    convert_csv(csv_path, trace_path)
+
+    env = SparkSchedSimEnv(
+        env_cfg
+        | {
+            "num_executors": 4,
+            "job_arrival_cap": None,
+            "data_sampler_cls": "TraceDataSampler",
+            "trace_path": trace_path,
+        }
+    )
+    obs, _ = env.reset(seed=0)
+    rollout(env, obs)
+
+    assert env.num_completed_jobs == 3
+
+
+# parents of stages 0, 1 and 2: a self-loop, and the cycle 0 -> 1 -> 2 -> 0
+@pytest.mark.parametrize("parent_ids", [("", "0", "2"), ("2", "0", "1")])
+def test_cyclic_jobs_are_rejected(tmp_path, parent_ids):
+    csv_path = tmp_path / "trace.csv"
+    csv_path.write_text(
+        "job_id,arrival_time,stage_id,parent_ids,task_durations\n"
+        + "".join(f"a,0,{i},{ids},100\n" for i, ids in enumerate(parent_ids))
+    )
+    with pytest.raises(ValueError, match="cyclic"):
+        convert_csv(csv_path, str(tmp_path / "trace.bin"))
@@ -0,0 +1,53 @@
+import numpy as np
+
+from spark_sched_sim import SparkSchedSimEnv, SparkSchedSimVecEnv
+
+NUM_ENVS = 3
+NUM_STEPS = 300
+
+
+def first_stage_action(nodes, num_committable_execs):
+    stage_idx = 0 if nodes[:, 2].any() else -1
+    return {"stage_idx": stage_idx, "num_exec": num_committable_execs}
+
+
+def test_vec_env_matches_single_envs(env_cfg):
+    env_cfg |= {"job_arrival_cap": 5}
+    vec_env = SparkSchedSimVecEnv(NUM_ENVS, env_cfg, node_capacity=1, edge_capacity=1)
+    envs = [SparkSchedSimEnv(env_cfg) for _ in range(NUM_ENVS)]
+
+    batch, _ = vec_env.reset(seed=42)
+    obsns = [env.reset(seed=42 + i)[0] for i, env in enumerate(envs)]
+
+    for _ in range(NUM_STEPS):
+        node_ptr, edge_ptr, job_ptr = (
+            batch[k] for k in ["node_ptr", "edge_ptr", "job_ptr"]
+        )
+        for i, obs in enumerate(obsns):
+            nodes = batch["nodes"][node_ptr[i] : node_ptr[i + 1]]
+            edge_links = batch["edge_links"][edge_ptr[i] : edge_ptr[i + 1]]
+            dag_ptr = batch["dag_ptr"][job_ptr[i] : job_ptr[i + 1] + 1]
+            assert np.array_equal(nodes, obs["dag_batch"].nodes)
+            assert np.array_equal(edge_links - node_ptr[i], obs["dag_batch"].edge_links)
+            assert np.array_equal(dag_ptr - node_ptr[i], obs["dag_ptr"])
+            assert batch["source_job_idx"][i] == obs["source_job_idx"]
+
+        actions = [
+            first_stage_action(obs["dag_batch"].nodes, obs["num_committable_execs"])
+            for obs in obsns
+        ]
+        batch, rewards, terminated, _, _ = vec_env.step(actions)
+
+        for i, env in enumerate(envs):
+            obs, reward, term, _, _ = env.step(actions[i])
+            assert rewards[i] == reward and terminated[i] == term
+            obsns[i] = env.reset()[0] if term else obs
+
+
+def test_step_without_space_updates(env_cfg, rollout):
+    trajectories = []
+    for update_spaces in [True, False]:
+        env = SparkSchedSimEnv(env_cfg | {"update_spaces": update_spaces})
+        obs, _ = env.reset(seed=42)
+        trajectories += [rollout(env, obs)]
+    assert trajectories[0] == trajectories[1]
@@ -15,6 +15,8 @@ import multiprocessing as mp
 # from torch.utils.tensorboard import SummaryWriter
 
 from schedulers import make_scheduler, TrainableScheduler
+from spark_sched_sim.data_samplers import TPCHDataSampler
+from spark_sched_sim.data_samplers.tpch_packed import share_packed_dataset
 from .rollout_worker import RolloutWorkerSync, RolloutWorkerAsync, RolloutBuffer
 from .utils import Baseline, ReturnsCalculator
 
@@ -62,6 +64,17 @@ class Trainer(ABC):
 
         self.rollout_duration: float | None = train_cfg.get("rollout_duration")
 
+        # if true, then the dataset is loaded once into shared memory, which all
+        # the rollout workers attach to instead of loading their own copies
+        self.share_dataset: bool = train_cfg.get("share_dataset", True)
+
+        # set up by `_setup`, and released by `_cleanup`, which must also handle
+        # `_setup` failing partway
+        self.shared_dataset = None
+        self.summary_writer = None
+        self.procs: list[mp.Process] = []
+        self.conns: list = []
+
         assert ("reward_buff_cap" in train_cfg) ^ (
             "beta_discount" in train_cfg
         ), "must provide exactly one of `reward_buff_cap` and `beta_discount` in config"
@@ -90,73 +103,74 @@ class Trainer(ABC):
             updated, and
         - new model parameters are scattered to the rollout workers
         """
-        self._setup()
-
-        # every n'th iteration, save the best model from the past n iterations,
-        # where `n = self.model_save_freq`
-        best_state = None
-
         exception: Exception | None = None
 
-        print("Beginning training.\n", flush=True)
+        try:
+            self._setup()
 
-        for i in range(self.num_iterations):
-            state_dict = deepcopy(self.scheduler.state_dict())
+            # every n'th iteration, save the best model from the past n iterations,
+            # where `n = self.model_save_freq`
+            best_state = None
 
-            # # move params to GPU for learning
-            self.scheduler.to(self.device, non_blocking=True)
+            print("Beginning training.\n", flush=True)
 
-            # scatter
-            for conn in self.conns:
-                conn.send({"state_dict": state_dict})
+            for i in range(self.num_iterations):
+                state_dict = deepcopy(self.scheduler.state_dict())
 
-            # gather
-            results = []
-            for j, conn in enumerate(self.conns):
-                res = conn.recv()
-                if isinstance(res, Exception):
-                    print(f"An exception occured in process {j}", flush=True)
-                    exception = res
-                    break
-                results += [res]
+                # # move params to GPU for learning
+                self.scheduler.to(self.device, non_blocking=True)
 
-            if exception:
-                break
+                # scatter
+                for conn in self.conns:
+                    conn.send({"state_dict": state_dict})
 
-            rollout_buffers, rollout_stats_list = zip(
-                *[(res["rollout_buffer"], res["stats"]) for res in results if res]
-            )
+                # gather
+                results = []
+                for j, conn in enumerate(self.conns):
+                    res = conn.recv()
+                    if isinstance(res, Exception):
+                        print(f"An exception occured in process {j}", flush=True)
+                        exception = res
+                        break
+                    results += [res]
 
-            # update parameters
-            learning_stats = self.train_on_rollouts(rollout_buffers)
+                if exception:
+                    break
 
-            # return params to CPU before scattering updated state dict to the rollout workers
-            self.scheduler.to("cpu", non_blocking=True)
+                rollout_buffers, rollout_stats_list = zip(
+                    *[(res["rollout_buffer"], res["stats"]) for res in results if res]
+                )
 
-            avg_num_jobs = self.return_calc.avg_num_jobs or np.mean(
-                [stats["avg_num_jobs"] for stats in rollout_stats_list]
-            )
+                # update parameters
+                learning_stats = self.train_on_rollouts(rollout_buffers)
+
+                # return params to CPU before scattering updated state dict to the rollout workers
+                self.scheduler.to("cpu", non_blocking=True)
 
-            # check if model is the current best
-            if not best_state or avg_num_jobs < best_state["avg_num_jobs"]:
-                best_state = self._capture_state(
-                    i, avg_num_jobs, state_dict, rollout_stats_list
+                avg_num_jobs = self.return_calc.avg_num_jobs or np.mean(
+                    [stats["avg_num_jobs"] for stats in rollout_stats_list]
                 )
 
-            if (i + 1) % self.checkpointing_freq == 0:
-                self._checkpoint(i, best_state)
-                best_state = None
+                # check if model is the current best
+                if not best_state or avg_num_jobs < best_state["avg_num_jobs"]:
+                    best_state = self._capture_state(
+                        i, avg_num_jobs, state_dict, rollout_stats_list
+                    )
 
-            if self.use_tensorboard:
-                ep_lens = [len(buff) for buff in rollout_buffers if buff]
-                self._write_stats(i, learning_stats, rollout_stats_list, ep_lens)
+                if (i + 1) % self.checkpointing_freq == 0:
+                    self._checkpoint(i, best_state)
+                    best_state = None
 
-            print(
-                f"Iteration {i+1} complete. Avg. # jobs: " f"{avg_num_jobs:.3f}",
-                flush=True,
-            )
+                if self.use_tensorboard:
+                    ep_lens = [len(buff) for buff in rollout_buffers if buff]
+                    self._write_stats(i, learning_stats, rollout_stats_list, ep_lens)
 
-        self._cleanup()
+                print(
+                    f"Iteration {i+1} complete. Avg. # jobs: " f"{avg_num_jobs:.3f}",
+                    flush=True,
+                )
+        finally:
+            self._cleanup()
 
         if exception:
             raise exception
@@ -231,12 +245,19 @@ class Trainer(ABC):
 
         self.scheduler.train()
 
+        self._share_dataset()
+
         self._start_rollout_workers()
 
     def _cleanup(self) -> None:
         self._terminate_rollout_workers()
 
-        if self.use_tensorboard:
+        if self.shared_dataset:
+            self.shared_dataset.close()
+            self.shared_dataset.unlink()
+            self.shared_dataset = None
+
+        if self.summary_writer:
             self.summary_writer.close()
 
         print("\nTraining complete.", flush=True)
@@ -261,6 +282,25 @@ class Trainer(ABC):
         with open(osp.join(dir, "state.json"), "w") as fp:
             json.dump(best_state, fp)
 
+    def _share_dataset(self) -> None:
+        self.shared_dataset = None
+        self.worker_env_cfg = self.env_cfg
+
+        if (
+            not self.share_dataset
+            or self.env_cfg["data_sampler_cls"] != "TPCHDataSampler"
+        ):
+            return
+
+        packed_dataset_path = self.env_cfg.get("packed_dataset_path")
+        if not packed_dataset_path and not osp.isdir("data/tpch"):
+            TPCHDataSampler._download_tpch_dataset()
+
+        self.shared_dataset = share_packed_dataset(packed_dataset_path)
+        self.worker_env_cfg = self.env_cfg | {
+            "shared_dataset_name": self.shared_dataset.name
+        }
+
     def _start_rollout_workers(self) -> None:
         self.procs = []
         self.conns = []
@@ -280,7 +320,7 @@ class Trainer(ABC):
                 args=(
                     rank,
                     conn_sub,
-                    self.env_cfg,
+                    self.worker_env_cfg,
                     self.scheduler_cfg,
                     self.stdout_dir,
                     int(base_seed),
@@ -289,19 +329,26 @@ class Trainer(ABC):
                 ),
             )
 
-            self.procs += [proc]
             proc.start()
+            self.procs += [proc]
 
         for proc in self.procs:
             proc.join(5)
 
     def _terminate_rollout_workers(self) -> None:
         for conn in self.conns:
-            conn.send(None)
+            try:
+                conn.send(None)
+            except (BrokenPipeError, ConnectionResetError):
+                # the worker has already exited
+                pass
 
         for proc in self.procs:
             proc.join()
 
+        self.procs = []
+        self.conns = []
+
     def _write_stats(
         self,
         epoch: int,